@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+OCR 流水线分阶段基准测试
+
+在合成文本图像上分别测量解码、缩放、检测、裁剪、方向分类、识别、结果格式化、
+JSON 序列化各阶段的耗时。--stub 使用桩模型，无需模型权重即可测量非推理阶段。
+结果保存为 JSON 基线，compare 子命令对比两次结果并标出性能回退。
+
+用法:
+    python benchmark.py run -o baseline.json --stub
+    python benchmark.py compare baseline.json current.json --threshold 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# 默认测试矩阵：分辨率（宽x高）与每张图像的文本行数；
+# 6000x4500 超过默认 max_image_size (4096)，使 resize 阶段实际执行缩放
+DEFAULT_RESOLUTIONS = ['640x480', '1280x960', '2480x3508', '4000x3000', '6000x4500']
+DEFAULT_DENSITIES = [5, 20, 60]
+STAGES = ['decode', 'resize', 'doc', 'det', 'crop', 'cls', 'rec', 'format', 'json']
+
+def generate_text_image(width, height, lines, seed=0):
+    """
+    生成白底黑字的合成文本图像
+
+    Returns:
+        (PIL 图像, 各文本行的四点框列表)
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    rng = random.Random(seed)
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    line_height = height / (lines + 1)
+    font_size = int(min(max(line_height * 0.6, 10), 64))
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow < 10.1 只有固定大小的位图字体
+        font = ImageFont.load_default()
+    charset = string.ascii_letters + string.digits
+    boxes = []
+    margin = width // 20
+    for i in range(lines):
+        y = int(line_height * (i + 0.5))
+        words = [''.join(rng.choice(charset) for _ in range(rng.randint(3, 10)))
+                 for _ in range(rng.randint(2, 12))]
+        text = ' '.join(words)
+        left, top, right, bottom = draw.textbbox((margin, y), text, font=font)
+        right = min(right, width - 1)
+        draw.text((margin, y), text, fill='black', font=font)
+        boxes.append([[left, top], [right, top], [right, bottom], [left, bottom]])
+    return image, boxes
+
+class StubTextDetection:
+    """检测桩：直接返回合成图像中已知的文本行位置（按输入尺寸缩放）"""
+
+    def __init__(self, boxes, orig_size):
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+        self.orig_size = orig_size
+
+    def predict(self, images, batch_size=1, **kwargs):
+        results = []
+        for image in images:
+            h, w = image.shape[:2]
+            scale = np.array([w / self.orig_size[0], h / self.orig_size[1]], dtype=np.float32)
+            results.append({'dt_polys': list((self.boxes * scale).astype(np.int32)),
+                            'dt_scores': [0.99] * len(self.boxes)})
+        return results
+
+class StubOrientation:
+    """方向分类桩：全部判定为正向"""
+
+    def predict(self, crops, batch_size=1, **kwargs):
+        return [{'class_ids': [0], 'scores': [0.99], 'label_names': ['0']} for _ in crops]
+
+class StubUnwarping:
+    """文档矫正桩：原样返回输入图像"""
+
+    def predict(self, images, batch_size=1, **kwargs):
+        return [{'doctr_img': image} for image in images]
+
+class StubTextRecognition:
+    """识别桩：按文本行宽高比返回等长的占位文本"""
+
+    def predict(self, crops, batch_size=1, **kwargs):
+        results = []
+        for crop in crops:
+            h, w = crop.shape[:2]
+            results.append({'rec_text': 'x' * max(1, w // max(h, 1)), 'rec_score': 0.99})
+        return results
+
+def _build_stub_pipeline(boxes, orig_size, lang):
+    from paddleocr_service import OCRPipeline, SubModel
+    det = SubModel('det:stub@cpu', 'det', 'stub', 'cpu', StubTextDetection(boxes, orig_size))
+    rec = SubModel('rec:stub@cpu', 'rec', 'stub', 'cpu', StubTextRecognition())
+    cls = SubModel('cls:stub@cpu', 'cls', 'stub', 'cpu', StubOrientation())
+    doc_ori = SubModel('doc_ori:stub@cpu', 'doc_ori', 'stub', 'cpu', StubOrientation())
+    unwarp = SubModel('unwarp:stub@cpu', 'unwarp', 'stub', 'cpu', StubUnwarping())
+    return OCRPipeline(det, rec, {'cls': lambda: cls, 'doc_ori': lambda: doc_ori, 'unwarp': lambda: unwarp},
+                       lang)
+
+def _timed(func, repeat, warmup=1):
+    """多次执行并返回 (最后一次结果, 耗时列表，单位毫秒)"""
+    result = None
+    for _ in range(warmup):
+        result = func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, timings
+
+def _summarize(timings):
+    timings = sorted(timings)
+    return {
+        'median_ms': timings[len(timings) // 2],
+        'p90_ms': timings[min(int(len(timings) * 0.9), len(timings) - 1)],
+        'min_ms': timings[0],
+    }
+
+def bench_scenario(image_path, pipeline, ocr_config, options, lang, repeat):
+    """测量单张图像在各阶段的耗时"""
+    from paddleocr_service import crop_text_line, decode_image, format_ocr_result, resize_to_limit
+    stats = {}
+    decoded, timings = _timed(lambda: decode_image(image_path, ocr_config), repeat)
+    stats['decode'] = _summarize(timings)
+    image, timings = _timed(lambda: resize_to_limit(decoded, ocr_config['max_image_size']), repeat)
+    stats['resize'] = _summarize(timings)
+    if options.get('use_doc_orientation_classify') or options.get('use_doc_unwarping'):
+        image, timings = _timed(lambda: pipeline.preprocess([image], options)[0], repeat)
+        stats['doc'] = _summarize(timings)
+    all_polys, timings = _timed(lambda: pipeline.detect([image], options), repeat)
+    stats['det'] = _summarize(timings)
+    polys = all_polys[0]
+    crops, timings = _timed(lambda: [crop_text_line(image, poly) for poly in polys], repeat)
+    stats['crop'] = _summarize(timings)
+    if crops and options.get('use_textline_orientation'):
+        _, timings = _timed(lambda: pipeline.classify_orientation(list(crops), options), repeat)
+        stats['cls'] = _summarize(timings)
+    recognized, timings = _timed(lambda: pipeline.recognize(crops, options) if crops else [], repeat)
+    stats['rec'] = _summarize(timings)
+    result = {'rec_texts': [t for t, _ in recognized], 'rec_scores': [s for _, s in recognized],
+              'rec_polys': [p.astype(np.int32) for p in polys]}
+    formatted, timings = _timed(lambda: format_ocr_result(result, lang), repeat)
+    stats['format'] = _summarize(timings)
+    # 与 Flask jsonify 默认行为一致：ensure_ascii 与 sort_keys
+    payload = {'success': True, 'timestamp': datetime.now().isoformat(), 'data': formatted}
+    _, timings = _timed(lambda: json.dumps(payload, ensure_ascii=True, sort_keys=True), repeat)
+    stats['json'] = _summarize(timings)
+    return stats, {'lines': len(polys), 'processed_size': [image.shape[1], image.shape[0]]}
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent).stdout.strip() or None
+    except OSError:
+        return None
+
+def run(args):
+    sys.path.insert(0, str(Path(__file__).parent))
+    from paddleocr_service import OCRServiceConfig, OCRModelManager, parse_pipeline_options
+    service_config = OCRServiceConfig(args.config)
+    config = service_config.config
+    # 关闭跨请求批处理，识别阶段只测量模型本身
+    service_config._deep_update(config, {'performance': {'rec_batching': {'enabled': False}}})
+    ocr_config = config['ocr']
+    lang = args.lang or ocr_config['default_lang']
+    options = parse_pipeline_options(None, ocr_config)
+    manager = None if args.stub else OCRModelManager(config)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for resolution in args.resolutions.split(','):
+            width, height = (int(v) for v in resolution.lower().split('x'))
+            for density in (int(d) for d in args.densities.split(',')):
+                name = f"{width}x{height}-{density}lines-{args.format}"
+                image, boxes = generate_text_image(width, height, density, seed=args.seed)
+                image_path = os.path.join(temp_dir, f"{name}.{args.format}")
+                save_kwargs = {'quality': 90} if args.format == 'jpg' else {}
+                image.save(image_path, **save_kwargs)
+                pipeline = (_build_stub_pipeline(boxes, (width, height), lang) if args.stub
+                            else manager.get_model(lang))
+                stats, info = bench_scenario(image_path, pipeline, ocr_config, options, lang, args.repeat)
+                info['file_size'] = os.path.getsize(image_path)
+                results[name] = {'info': info, 'stages': stats}
+                summary = ', '.join(f"{stage} {stats[stage]['median_ms']:.2f}" for stage in STAGES if stage in stats)
+                print(f"{name}: {summary} (ms)")
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stub': args.stub,
+            'lang': lang,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+    return 0
+
+def compare_reports(baseline, current, threshold=0.1, min_delta_ms=0.05):
+    """
+    对比两次基准结果的各阶段中位耗时
+
+    Returns:
+        行列表 (场景, 阶段, 基线 ms, 当前 ms, 比值, 是否回退)
+    """
+    rows = []
+    for name, entry in current['results'].items():
+        base_entry = baseline['results'].get(name)
+        if base_entry is None:
+            continue
+        for stage in STAGES:
+            if stage not in entry['stages'] or stage not in base_entry['stages']:
+                continue
+            base = base_entry['stages'][stage]['median_ms']
+            now = entry['stages'][stage]['median_ms']
+            ratio = now / base if base > 0 else float('inf')
+            # 变化量过小的阶段受计时噪声影响大，不判定回退
+            regressed = ratio > 1 + threshold and now - base > min_delta_ms
+            rows.append((name, stage, base, now, ratio, regressed))
+    return rows
+
+def compare(args):
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+    if baseline['meta'].get('stub') != current['meta'].get('stub'):
+        print("警告: 两次结果的模型模式（桩模型/真实模型）不同")
+    rows = compare_reports(baseline, current, args.threshold, args.min_delta_ms)
+    regressions = [row for row in rows if row[5]]
+    print(f"{'场景':<32}{'阶段':<8}{'基线ms':>10}{'当前ms':>10}{'比值':>8}")
+    for name, stage, base, now, ratio, regressed in rows:
+        if args.only_regressions and not regressed:
+            continue
+        flag = '  <-- 回退' if regressed else ''
+        print(f"{name:<32}{stage:<8}{base:>10.3f}{now:>10.3f}{ratio:>8.2f}{flag}")
+    print(f"共 {len(rows)} 项，回退 {len(regressions)} 项（阈值 {args.threshold:.0%}）")
+    return 1 if regressions else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='benchmark.py', description='OCR 流水线分阶段基准测试')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='运行基准测试并保存结果')
+    run_parser.add_argument('-o', '--output', default='benchmark_results.json', help='结果文件')
+    run_parser.add_argument('--stub', action='store_true', help='使用桩模型，不加载模型权重')
+    run_parser.add_argument('--resolutions', default=','.join(DEFAULT_RESOLUTIONS), help='分辨率列表，如 640x480,1280x960')
+    run_parser.add_argument('--densities', default=','.join(map(str, DEFAULT_DENSITIES)), help='每张图像的文本行数列表')
+    run_parser.add_argument('--format', choices=['jpg', 'png'], default='jpg', help='合成图像的编码格式')
+    run_parser.add_argument('--repeat', type=int, default=20, help='每个阶段的重复次数')
+    run_parser.add_argument('--seed', type=int, default=0, help='合成文本的随机种子')
+    run_parser.add_argument('--lang', default=None, help='识别语言，默认取配置 default_lang')
+    run_parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+
+    compare_parser = subparsers.add_parser('compare', help='对比两次结果并标出回退')
+    compare_parser.add_argument('baseline', help='基线结果文件')
+    compare_parser.add_argument('current', help='当前结果文件')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='中位耗时增加超过该比例视为回退')
+    compare_parser.add_argument('--min-delta-ms', type=float, default=0.05, help='绝对增加量低于该值时不视为回退')
+    compare_parser.add_argument('--only-regressions', action='store_true', help='只显示回退项')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    return compare(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+PaddleOCR 服务 Python 异步客户端
+
+基于 aiohttp，提供连接池复用、并发上限控制、429/503 自动重试（遵循 Retry-After）
+以及批量识别的流式结果返回。
+"""
+
+import os
+import time
+import mimetypes
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+import aiohttp
+
+from paddleocr_client import (
+    build_json_body, build_upload_body, extract_text_only, get_text_with_confidence,
+    preshrink_image
+)
+
+logger = logging.getLogger(__name__)
+
+# 需要重试的 HTTP 状态码：限流与服务暂不可用
+RETRY_STATUS_CODES = (429, 503)
+
+class AsyncPaddleOCRClient:
+    """PaddleOCR 服务异步客户端"""
+
+    def __init__(self, base_url: str = "http://localhost:8000", timeout: int = 60,
+                 max_concurrency: int = 8, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 pool_size: Optional[int] = None, compress_min_size: Optional[int] = 1024,
+                 api_key: Optional[str] = None):
+        """
+        初始化客户端
+
+        Args:
+            base_url: 服务地址
+            timeout: 单次请求超时时间（秒）
+            max_concurrency: 同时在途的最大请求数
+            max_retries: 429/503 或连接错误时的最大重试次数
+            backoff_base: 指数退避的基础等待时间（秒）
+            backoff_max: 单次退避的最长等待时间（秒）
+            pool_size: 连接池大小，默认与 max_concurrency 相同
+            compress_min_size: 请求体超过该字节数时 gzip 压缩上传，None 表示不压缩
+            api_key: 服务启用多租户时的 API Key，以 X-API-Key 请求头发送
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size or max_concurrency
+        self.compress_min_size = compress_min_size
+        self.api_key = api_key
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._processing_profile: Optional[Dict] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """延迟创建会话，复用 keep-alive 连接"""
+        if self._semaphore is None:
+            # 在事件循环内创建，兼容旧版本 Python 的循环绑定
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            headers = {'User-Agent': 'PaddleOCR-Python-AsyncClient/1.0.0'}
+            if self.api_key:
+                headers['X-API-Key'] = self.api_key
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=headers
+            )
+        return self._session
+
+    async def close(self):
+        """关闭会话与连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """计算重试等待时间：优先使用 Retry-After，否则指数退避加随机抖动"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delay, 0.0), self.backoff_max)
+                except (TypeError, ValueError):
+                    pass
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay, self.backoff_max) * (0.5 + random.random() / 2)
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict:
+        """发送请求并返回 JSON，429/503 与连接错误时按退避策略重试"""
+        session = await self._get_session()
+        url = f"{self.base_url}{path}"
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    async with session.request(method, url, **kwargs) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                            logger.warning(f"服务返回 {response.status}，{delay:.2f} 秒后重试 ({attempt + 1}/{self.max_retries})")
+                            await asyncio.sleep(delay)
+                            continue
+                        response.raise_for_status()
+                        return await response.json()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._retry_delay(attempt, None)
+                    logger.warning(f"请求失败: {e}，{delay:.2f} 秒后重试 ({attempt + 1}/{self.max_retries})")
+                    await asyncio.sleep(delay)
+        raise RuntimeError("重试次数已用尽")
+
+    async def check_health(self) -> bool:
+        """检查服务健康状态"""
+        try:
+            session = await self._get_session()
+            async with session.get(f"{self.base_url}/api/v1/health",
+                                   timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return response.status == 200
+        except Exception as e:
+            logger.error(f"健康检查失败: {e}")
+            return False
+
+    async def get_info(self) -> Dict:
+        """获取服务信息"""
+        return await self._request('GET', '/api/v1/info')
+
+    async def get_processing_profile(self) -> Dict:
+        """获取服务端处理分辨率与建议编码（缓存）"""
+        if self._processing_profile is None:
+            info = await self.get_info()
+            self._processing_profile = info.get('data', {}).get('processing') or {}
+        return self._processing_profile
+
+    async def ocr_from_bytes(self, content: bytes, filename: str = 'image.jpg',
+                             lang: Union[str, List[str]] = "ch",
+                             content_type: str = 'image/*', **options) -> Dict:
+        """
+        从内存中的图片数据识别文字
+
+        Args:
+            content: 图片二进制内容
+            filename: 上传文件名
+            lang: 语言代码，多个语言可传列表
+            options: 流水线参数，如 use_textline_orientation、det_limit_side_len
+        """
+        fields = {'lang': lang if isinstance(lang, str) else ','.join(lang)}
+        fields.update({k: str(v).lower() if isinstance(v, bool) else str(v)
+                       for k, v in options.items()})
+        if content_type == 'image/*':
+            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        body, headers = build_upload_body(fields, filename, content, content_type,
+                                          self.compress_min_size)
+        return await self._request('POST', '/api/v1/ocr/file', data=body, headers=headers)
+
+    async def ocr_from_file(self, file_path: str, lang: Union[str, List[str]] = "ch",
+                            preshrink: bool = False, **options) -> Dict:
+        """
+        从文件识别文字，文件读取与预缩小在线程池中进行以免阻塞事件循环
+
+        Args:
+            preshrink: 上传前按服务端处理分辨率在本地缩小并重新编码
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"文件不存在: {file_path}")
+        loop = asyncio.get_running_loop()
+        if preshrink:
+            profile = await self.get_processing_profile()
+            shrunk = await loop.run_in_executor(None, preshrink_image, file_path, profile)
+            if shrunk is not None:
+                options.update(orig_width=shrunk['orig_width'], orig_height=shrunk['orig_height'])
+                return await self.ocr_from_bytes(shrunk['content'], shrunk['filename'], lang,
+                                                 content_type=shrunk['content_type'], **options)
+        with open(file_path, 'rb') as f:
+            content = await loop.run_in_executor(None, f.read)
+        return await self.ocr_from_bytes(content, os.path.basename(file_path), lang, **options)
+
+    async def ocr_from_url(self, image_url: str, lang: Union[str, List[str]] = "ch",
+                           **options) -> Dict:
+        """从 URL 识别文字"""
+        payload = {'url': image_url, 'lang': lang}
+        payload.update(options)
+        body, headers = build_json_body(payload, self.compress_min_size)
+        return await self._request('POST', '/api/v1/ocr/url', data=body, headers=headers)
+
+    async def ocr_source(self, source: str, lang: Union[str, List[str]] = "ch", **options) -> Dict:
+        """按来源类型识别：http(s) 开头视为 URL，否则视为本地文件"""
+        if source.startswith(('http://', 'https://')):
+            return await self.ocr_from_url(source, lang, **options)
+        return await self.ocr_from_file(source, lang, **options)
+
+    async def ocr_many(self, sources: Iterable[str], lang: Union[str, List[str]] = "ch",
+                       return_exceptions: bool = True,
+                       **options) -> AsyncIterator[Tuple[str, Union[Dict, Exception]]]:
+        """
+        批量识别文件或 URL，按完成顺序逐个产出 (来源, 结果)
+
+        来源按需读取，在途任务数保持在并发上限的两倍以内，适合处理很长的列表。
+
+        Args:
+            return_exceptions: 为 True 时失败项产出异常对象，否则直接抛出
+        """
+        source_iter = iter(sources)
+        pending = {}
+
+        def schedule():
+            for source in source_iter:
+                task = asyncio.ensure_future(self.ocr_source(source, lang, **options))
+                pending[task] = source
+                if len(pending) >= self.max_concurrency * 2:
+                    break
+
+        schedule()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = pending.pop(task)
+                    try:
+                        yield source, task.result()
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        yield source, e
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+            # 等待取消完成，避免任务在会话关闭后仍在运行或被销毁时仍处于挂起状态
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    def extract_text_only(ocr_result: Dict) -> List[str]:
+        """从 OCR 结果中提取纯文本"""
+        return extract_text_only(ocr_result)
+
+    @staticmethod
+    def get_text_with_confidence(ocr_result: Dict) -> List[Dict]:
+        """获取带置信度的文本结果"""
+        return get_text_with_confidence(ocr_result)
+
+async def quick_ocr_many(sources: Iterable[str], lang: str = "ch",
+                         base_url: str = "http://localhost:8000",
+                         max_concurrency: int = 8) -> Dict[str, str]:
+    """并发识别多张图片，返回 {来源: 文本}"""
+    results = {}
+    async with AsyncPaddleOCRClient(base_url, max_concurrency=max_concurrency) as client:
+        async for source, result in client.ocr_many(sources, lang):
+            if isinstance(result, Exception):
+                logger.error(f"识别失败 {source}: {result}")
+                continue
+            results[source] = '\n'.join(extract_text_only(result))
+    return results
+
+if __name__ == "__main__":
+    import sys
+
+    async def main(paths):
+        async with AsyncPaddleOCRClient() as client:
+            if not await client.check_health():
+                print("服务未运行或不可访问")
+                return
+            async for source, result in client.ocr_many(paths):
+                if isinstance(result, Exception):
+                    print(f"{source}: 失败 {result}")
+                else:
+                    print(f"{source}: {' '.join(client.extract_text_only(result))}")
+
+    asyncio.run(main(sys.argv[1:]))
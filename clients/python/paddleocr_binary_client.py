@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+PaddleOCR 二进制接口 Python 客户端
+
+长度前缀的二进制协议（服务端 server.binary），省去 HTTP、multipart/JSON 解析与服务端临时文件，
+适合内网高频调用。支持已编码的图像字节与 numpy 原始像素，可单次调用，也可在同一连接上流水线批量识别。
+"""
+
+import json
+import socket
+import struct
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from paddleocr_client import extract_text_only, get_text_with_confidence
+
+# 帧格式与服务端一致，整数均为网络字节序
+LENGTH = struct.Struct('!I')
+REQUEST = struct.Struct('!QBBI')
+RESPONSE = struct.Struct('!QBI')
+METHOD_OCR = 1
+METHOD_PING = 2
+PAYLOAD_ENCODED = 0
+PAYLOAD_PIXELS = 1
+PAYLOAD_SHM = 2
+STATUS_OK = 0
+STATUS_BAD_REQUEST = 1
+STATUS_ERROR = 2
+STATUS_RATE_LIMITED = 3
+
+class SharedImage(NamedTuple):
+    """调用方持有的共享内存段中的图像（仅 LocalPaddleOCRClient 支持），只发送段名不复制"""
+    shm: Union[str, shared_memory.SharedMemory]
+    shape: Tuple[int, ...]
+    dtype: str = 'uint8'
+    offset: int = 0
+
+ImageInput = Union[str, bytes, bytearray, memoryview, np.ndarray, SharedImage]
+
+class BinaryOCRError(Exception):
+    """服务端返回的错误"""
+
+    def __init__(self, status: int, error: str, error_type: str, retry_after: Optional[float] = None):
+        super().__init__(f"[{error_type}] {error}")
+        self.status = status
+        self.error = error
+        self.error_type = error_type
+        # 限流时服务端建议的重试等待秒数
+        self.retry_after = retry_after
+
+def unpack_ocr_lines(data: memoryview) -> List[Dict]:
+    """解析按列打包的识别结果，返回与 REST 接口 details 相同结构的列表"""
+    count = LENGTH.unpack_from(data)[0]
+    offset = LENGTH.size
+    scores = np.frombuffer(data, dtype='>f4', count=count, offset=offset)
+    offset += 4 * count
+    point_counts = np.frombuffer(data, dtype='>u2', count=count, offset=offset)
+    offset += 2 * count
+    total = int(point_counts.sum()) * 2
+    coords = np.frombuffer(data, dtype='>i4', count=total, offset=offset).reshape(-1, 2)
+    offset += 4 * total
+    lengths = np.frombuffer(data, dtype='>u4', count=count, offset=offset)
+    offset += 4 * count
+    details, point = [], 0
+    for i in range(count):
+        end = offset + int(lengths[i])
+        details.append({
+            'text': bytes(data[offset:end]).decode('utf-8'),
+            'confidence': float(scores[i]),
+            'bbox': coords[point:point + point_counts[i]].tolist(),
+        })
+        offset = end
+        point += int(point_counts[i])
+    return details
+
+def decode_response(body: bytes) -> Tuple[int, Union[Dict, BinaryOCRError]]:
+    """解析响应帧体，返回 (请求号, 结果或异常)，结果格式同 REST 接口的响应"""
+    request_id, status, meta_len = RESPONSE.unpack_from(body)
+    view = memoryview(body)[RESPONSE.size:]
+    meta = json.loads(bytes(view[:meta_len]))
+    if status != STATUS_OK:
+        return request_id, BinaryOCRError(status, meta.get('error', ''), meta.get('error_type', 'Unknown'),
+                                          meta.get('retry_after'))
+    if 'word_count' not in meta:
+        # ping 等不含识别结果的响应
+        return request_id, meta
+    details = unpack_ocr_lines(view[meta_len:])
+    for key, field in (('line_langs', 'lang'), ('line_candidates', 'candidates')):
+        for detail, value in zip(details, meta.pop(key, None) or []):
+            detail[field] = value
+    meta['details'] = details
+    meta['text'] = ' '.join(detail['text'] for detail in details)
+    return request_id, {'success': True, 'timestamp': meta.get('timestamp'), 'data': meta}
+
+def build_payload(image: ImageInput, color: str = 'bgr') -> Tuple[int, Dict, Union[bytes, memoryview]]:
+    """
+    根据输入类型构造载荷
+
+    Returns:
+        (载荷类型, 附加元数据, 载荷)，ndarray 以 memoryview 发送，不复制
+    """
+    if isinstance(image, np.ndarray):
+        pixels = np.ascontiguousarray(image)
+        return PAYLOAD_PIXELS, {'shape': list(pixels.shape), 'dtype': str(pixels.dtype), 'color': color}, memoryview(pixels).cast('B')
+    if isinstance(image, str):
+        with open(image, 'rb') as f:
+            return PAYLOAD_ENCODED, {}, f.read()
+    return PAYLOAD_ENCODED, {}, image
+
+class BinaryPaddleOCRClient:
+    """
+    PaddleOCR 二进制接口客户端
+
+    单个连接上的请求由锁串行化；多线程并发调用请各自创建客户端，或使用 ocr_stream 流水线。
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 8500, timeout: Optional[float] = 60.0,
+                 api_key: Optional[str] = None):
+        """
+        初始化客户端
+
+        Args:
+            host: 服务地址
+            port: 二进制接口端口（server.binary.port）
+            timeout: 套接字超时时间（秒），None 表示不超时
+            api_key: 服务启用多租户时的 API Key，随每个请求的元数据发送
+        """
+        self.host = host
+        self.api_key = api_key
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def connect(self):
+        """建立连接，首次调用时自动进行"""
+        if self._sock is None:
+            self._sock = self._open_socket()
+            self._reader = self._sock.makefile('rb')
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = self._reader = None
+
+    def close(self):
+        """关闭连接"""
+        self._disconnect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _send(self, method: int, kind: int = PAYLOAD_ENCODED, meta: Optional[Dict] = None,
+              payload: Union[bytes, memoryview] = b'') -> int:
+        self.connect()
+        self._next_id += 1
+        meta_bytes = json.dumps(meta or {}, ensure_ascii=False).encode('utf-8')
+        head = REQUEST.pack(self._next_id, method, kind, len(meta_bytes)) + meta_bytes
+        self._sock.sendall(LENGTH.pack(len(head) + len(payload)) + head)
+        if len(payload):
+            self._sock.sendall(payload)
+        return self._next_id
+
+    def _recv(self) -> Tuple[int, Union[Dict, BinaryOCRError]]:
+        head = self._reader.read(LENGTH.size)
+        if len(head) < LENGTH.size:
+            raise ConnectionError("服务端关闭了连接")
+        length = LENGTH.unpack(head)[0]
+        body = self._reader.read(length)
+        if len(body) < length:
+            raise ConnectionError("响应不完整")
+        return decode_response(body)
+
+    def _call(self, method: int, kind: int = PAYLOAD_ENCODED, meta: Optional[Dict] = None,
+              payload: Union[bytes, memoryview] = b'') -> Dict:
+        """发送请求并等待响应，调用方需持有 self._lock"""
+        try:
+            self._send(method, kind, meta, payload)
+            _, result = self._recv()
+        except (OSError, ConnectionError):
+            # 连接状态未知，丢弃后下次调用重连
+            self._disconnect()
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _prepare(self, image: ImageInput, color: str):
+        """
+        构造载荷
+
+        Returns:
+            (载荷类型, 附加元数据, 载荷, 收到响应后的释放函数或 None)
+        """
+        return build_payload(image, color) + (None,)
+
+    def ping(self) -> Dict:
+        """检查服务状态"""
+        with self._lock:
+            return self._call(METHOD_PING)
+
+    def _request_meta(self, lang: Union[str, List[str]], options: Dict) -> Dict:
+        meta = {'lang': lang}
+        if self.api_key:
+            meta['api_key'] = self.api_key
+        meta.update(options)
+        return meta
+
+    def ocr(self, image: ImageInput, lang: Union[str, List[str]] = "ch", color: str = 'bgr',
+            **options) -> Dict:
+        """
+        识别一张图像
+
+        Args:
+            image: 图片文件路径、已编码的图像字节，或 uint8 的 numpy 数组（H×W 或 H×W×3/4）
+            lang: 语言代码，多个语言可传列表
+            color: ndarray 输入的通道顺序，bgr（OpenCV）或 rgb（PIL）
+            options: 流水线参数，如 use_textline_orientation、det_limit_side_len
+
+        Returns:
+            与 REST 接口相同结构的结果 {'success', 'data': {'details', ...}}
+        """
+        meta = self._request_meta(lang, options)
+        with self._lock:
+            kind, extra, payload, release = self._prepare(image, color)
+            meta.update(extra)
+            try:
+                return self._call(METHOD_OCR, kind, meta, payload)
+            finally:
+                if release is not None:
+                    release()
+
+    def ocr_stream(self, images: Iterable[ImageInput], lang: Union[str, List[str]] = "ch",
+                   window: int = 8, return_exceptions: bool = True, color: str = 'bgr',
+                   **options) -> Iterator[Tuple[int, Union[Dict, Exception]]]:
+        """
+        在同一连接上流水线识别多张图像，按完成顺序产出 (输入序号, 结果)
+
+        Args:
+            window: 最多同时在途的请求数，不宜超过服务端 server.binary.max_in_flight
+            return_exceptions: 为 True 时失败项产出异常对象，否则直接抛出
+        """
+        base_meta = self._request_meta(lang, options)
+        source = iter(enumerate(images))
+        pending = {}
+        with self._lock:
+            try:
+                while True:
+                    while len(pending) < window:
+                        item = next(source, None)
+                        if item is None:
+                            break
+                        index, image = item
+                        kind, extra, payload, release = self._prepare(image, color)
+                        pending[self._send(METHOD_OCR, kind, dict(base_meta, **extra), payload)] = (index, release)
+                    if not pending:
+                        return
+                    request_id, result = self._recv()
+                    index, release = pending.pop(request_id)
+                    if release is not None:
+                        release()
+                    if isinstance(result, Exception) and not return_exceptions:
+                        raise result
+                    yield index, result
+            except BaseException:
+                # 提前结束或出错时连接上可能还有未读取的响应，直接关闭
+                if pending:
+                    self._disconnect()
+                raise
+
+    @staticmethod
+    def extract_text_only(ocr_result: Dict) -> List[str]:
+        """从 OCR 结果中提取纯文本"""
+        return extract_text_only(ocr_result)
+
+    @staticmethod
+    def get_text_with_confidence(ocr_result: Dict) -> List[Dict]:
+        """获取带置信度的文本结果"""
+        return get_text_with_confidence(ocr_result)
+
+class LocalPaddleOCRClient(BinaryPaddleOCRClient):
+    """
+    同机客户端：经 Unix 域套接字（服务端 server.binary.unix_socket）通信，图像经共享内存传递
+
+    只发送段名、形状与类型，服务端直接在段上识别，无需编码、上传与解码。图像按以下方式传入：
+
+    - SharedImage：调用方自己的共享内存段，原样发送段名，不复制
+    - frame_buffer() 分配的数组，或位于 register_segment() 登记的段内的 C 连续数组：按偏移发送，不复制
+    - 其他 numpy 数组：先复制一次到客户端的暂存段；暂存段在多次调用间复用，
+      流水线时每个在途请求占用一个，close() 时删除
+    """
+
+    def __init__(self, path: str = "/tmp/paddleocr.sock", timeout: Optional[float] = 60.0,
+                 api_key: Optional[str] = None):
+        super().__init__(timeout=timeout, api_key=api_key)
+        self.path = path
+        self._segments = []
+        self._free = []
+        # 可免复制识别的段及其映射起始地址
+        self._registered = []
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        return sock
+
+    def _acquire_segment(self, size: int) -> shared_memory.SharedMemory:
+        """取一个空闲且足够大的段，没有时新建"""
+        for i, segment in enumerate(self._free):
+            if segment.size >= size:
+                return self._free.pop(i)
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._segments.append(segment)
+        return segment
+
+    def register_segment(self, segment: shared_memory.SharedMemory):
+        """登记调用方的共享内存段，位于其中的数组识别时不再复制；段的生命周期仍由调用方管理"""
+        base = np.frombuffer(segment.buf, dtype=np.uint8).__array_interface__['data'][0]
+        self._registered.append((segment, base))
+
+    def frame_buffer(self, shape: Tuple[int, ...], dtype: str = 'uint8') -> np.ndarray:
+        """在新建的共享内存段上分配图像数组，生产者直接写入，识别时不再复制；段在 close() 时删除"""
+        dtype = np.dtype(dtype)
+        segment = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._segments.append(segment)
+        self.register_segment(segment)
+        return np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+    def _locate(self, image: np.ndarray):
+        """数组位于已登记的段内时返回 (段, 字节偏移)"""
+        if not image.flags.c_contiguous:
+            return None
+        address = image.__array_interface__['data'][0]
+        for segment, base in self._registered:
+            if base <= address and address + image.nbytes <= base + segment.size:
+                return segment, address - base
+        return None
+
+    def _prepare(self, image: ImageInput, color: str):
+        if isinstance(image, SharedImage):
+            name = image.shm if isinstance(image.shm, str) else image.shm.name
+            meta = {'shm_name': name, 'shape': list(image.shape), 'dtype': str(np.dtype(image.dtype)),
+                    'offset': image.offset, 'color': color}
+            return PAYLOAD_SHM, meta, b'', None
+        if not isinstance(image, np.ndarray):
+            return super()._prepare(image, color)
+        located = self._locate(image)
+        if located is not None:
+            segment, offset = located
+            meta = {'shm_name': segment.name, 'shape': list(image.shape), 'dtype': str(image.dtype),
+                    'offset': offset, 'color': color}
+            return PAYLOAD_SHM, meta, b'', None
+        # 普通数组复制到暂存段
+        segment = self._acquire_segment(image.nbytes)
+        np.ndarray(image.shape, dtype=image.dtype, buffer=segment.buf)[...] = image
+        meta = {'shm_name': segment.name, 'shape': list(image.shape), 'dtype': str(image.dtype), 'color': color}
+        return PAYLOAD_SHM, meta, b'', lambda: self._free.append(segment)
+
+    def close(self):
+        """关闭连接并删除共享内存段"""
+        super().close()
+        for segment in self._segments:
+            try:
+                segment.close()
+            except BufferError:
+                # 调用方仍持有 frame_buffer() 返回的数组，映射随数组释放
+                pass
+            segment.unlink()
+        self._segments.clear()
+        self._free.clear()
+        self._registered.clear()
+
+if __name__ == "__main__":
+    import sys
+
+    # 用法: python paddleocr_binary_client.py host:port 图片...
+    host, _, port = sys.argv[1].partition(':')
+    with BinaryPaddleOCRClient(host, int(port or 8500)) as client:
+        print(client.ping())
+        paths = sys.argv[2:]
+        for index, result in client.ocr_stream(paths):
+            if isinstance(result, Exception):
+                print(f"{paths[index]}: 失败 {result}")
+            else:
+                print(f"{paths[index]}: {' '.join(client.extract_text_only(result))}")
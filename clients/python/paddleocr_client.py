@@ -4,36 +4,155 @@ PaddleOCR 服务 Python 客户端，仅支持文件和 URL 识别
 """
 
 import os
+import gzip
 import json
 import time
 import logging
+import mimetypes
 from typing import List, Dict, Union, Optional
 from pathlib import Path
 import requests
+from urllib3 import encode_multipart_formdata
 from PIL import Image
 import io
 
 logger = logging.getLogger(__name__)
 
+def _result_details(ocr_result: Dict) -> List[Dict]:
+    """取出识别结果中的文本行列表（响应格式为 data.details）"""
+    if not ocr_result.get('success', False):
+        return []
+    data = ocr_result.get('data') or {}
+    return data.get('details') or []
+
+def extract_text_only(ocr_result: Dict) -> List[str]:
+    """从 OCR 结果中提取纯文本列表"""
+    return [item.get('text', '') for item in _result_details(ocr_result)]
+
+def get_text_with_confidence(ocr_result: Dict) -> List[Dict]:
+    """从 OCR 结果中提取文本、置信度和边界框"""
+    results = []
+    for item in _result_details(ocr_result):
+        entry = {
+            'text': item.get('text', ''),
+            'confidence': item.get('confidence', 0.0),
+            'bbox': item.get('bbox', [])
+        }
+        # 多语言识别时附带每行的识别语言
+        if 'lang' in item:
+            entry['lang'] = item['lang']
+        results.append(entry)
+    return results
+
+# PIL 保存格式与 MIME 类型对照
+_ENCODING_FORMATS = {
+    'image/jpeg': ('JPEG', '.jpg'),
+    'image/png': ('PNG', '.png'),
+    'image/webp': ('WEBP', '.webp'),
+}
+
+def preshrink_image(file_path: str, profile: Dict) -> Optional[Dict]:
+    """
+    按服务端处理分辨率在本地缩小并重新编码图片
+
+    Args:
+        file_path: 图片文件路径
+        profile: 服务信息中的 processing 段
+
+    Returns:
+        {'content', 'filename', 'content_type', 'orig_width', 'orig_height'}，
+        原图无需缩小且编码已被服务端接受时返回 None
+    """
+    from PIL import ImageOps
+    max_size = profile.get('max_image_size')
+    encodings = [e for e in profile.get('preferred_encodings', []) if e in _ENCODING_FORMATS]
+    if not max_size or not encodings:
+        return None
+    with Image.open(file_path) as image:
+        source_type = Image.MIME.get(image.format)
+        # 服务端解码时会应用 EXIF 方向，原图尺寸以转正后的为准
+        image = ImageOps.exif_transpose(image)
+        orig_width, orig_height = image.size
+        if max(orig_width, orig_height) <= max_size and source_type in encodings:
+            return None
+        image.thumbnail((max_size, max_size), Image.LANCZOS)
+        content_type = encodings[0]
+        pil_format, suffix = _ENCODING_FORMATS[content_type]
+        save_kwargs = {}
+        if pil_format in ('JPEG', 'WEBP'):
+            save_kwargs['quality'] = profile.get('jpeg_quality', 90)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, pil_format, **save_kwargs)
+    return {
+        'content': buffer.getvalue(),
+        'filename': Path(file_path).stem + suffix,
+        'content_type': content_type,
+        'orig_width': orig_width,
+        'orig_height': orig_height,
+    }
+
+# 已压缩的图像编码，再做 gzip 收益很小，上传时不压缩
+_PRECOMPRESSED_TYPES = ('image/jpeg', 'image/png', 'image/webp')
+
+def build_upload_body(fields: Dict, filename: str, content: bytes, content_type: str,
+                      compress_min_size: Optional[int] = 1024):
+    """
+    构造文件上传的 multipart 请求体，未压缩格式（BMP、TIFF 等）按需 gzip
+
+    Args:
+        compress_min_size: 请求体达到该大小才压缩，None 表示不压缩
+
+    Returns:
+        (body, headers)
+    """
+    multipart_fields = {k: str(v) for k, v in fields.items()}
+    multipart_fields['file'] = (filename, content, content_type)
+    body, multipart_type = encode_multipart_formdata(multipart_fields)
+    headers = {'Content-Type': multipart_type}
+    if (compress_min_size is not None and len(body) >= compress_min_size
+            and content_type not in _PRECOMPRESSED_TYPES):
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return body, headers
+
+def build_json_body(payload: Dict, compress_min_size: Optional[int] = 1024):
+    """构造 JSON 请求体，超过阈值时 gzip，返回 (body, headers)"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if compress_min_size is not None and len(body) >= compress_min_size:
+        body = gzip.compress(body, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return body, headers
+
 class PaddleOCRClient:
     """PaddleOCR 服务客户端"""
     
-    def __init__(self, base_url: str = "http://localhost:8000", timeout: int = 60):
+    def __init__(self, base_url: str = "http://localhost:8000", timeout: int = 60,
+                 compress_min_size: Optional[int] = 1024, api_key: Optional[str] = None):
         """
         初始化客户端
         
         Args:
             base_url: 服务地址
             timeout: 请求超时时间（秒）
+            compress_min_size: 请求体超过该字节数时 gzip 压缩上传，None 表示不压缩；
+                响应压缩（gzip，安装 zstandard 时含 zstd）由 requests 自动协商与解压
+            api_key: 服务启用多租户时的 API Key，以 X-API-Key 请求头发送
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.compress_min_size = compress_min_size
         self.session = requests.Session()
+        self._processing_profile = None
         
         # 设置请求头
         self.session.headers.update({
             'User-Agent': 'PaddleOCR-Python-Client/1.0.0'
         })
+        if api_key:
+            self.session.headers['X-API-Key'] = api_key
         
         logger.info(f"PaddleOCR 客户端初始化完成，服务地址: {self.base_url}")
     
@@ -56,13 +175,24 @@ class PaddleOCRClient:
             logger.error(f"获取服务信息失败: {e}")
             raise
     
-    def ocr_from_file(self, file_path: str, lang: str = "ch") -> Dict:
+    def get_processing_profile(self) -> Dict:
+        """获取服务端处理分辨率与建议编码（缓存）"""
+        if self._processing_profile is None:
+            info = self.get_info()
+            self._processing_profile = info.get('data', {}).get('processing') or {}
+        return self._processing_profile
+    
+    def ocr_from_file(self, file_path: str, lang: str = "ch", preshrink: bool = False,
+                      **options) -> Dict:
         """
         从文件识别文字
         
         Args:
             file_path: 图片文件路径
-            lang: 语言代码 (ch, en, french, german, etc.)
+            lang: 语言代码 (ch, en, french, german, etc.)，auto 由服务端自动判定
+            preshrink: 上传前按服务端处理分辨率在本地缩小并重新编码，
+                边界框仍按原图坐标返回
+            options: 流水线参数，如 use_textline_orientation、det_limit_side_len
         
         Returns:
             OCR 识别结果
@@ -70,18 +200,28 @@ class PaddleOCRClient:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        with open(file_path, 'rb') as f:
-            files = {'file': (os.path.basename(file_path), f, 'image/*')}
-            data = {'lang': lang}
-            
-            response = self.session.post(
-                f"{self.base_url}/api/v1/ocr/file",
-                files=files,
-                data=data,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response.json()
+        data = {'lang': lang}
+        data.update({k: str(v).lower() if isinstance(v, bool) else v for k, v in options.items()})
+        shrunk = preshrink_image(file_path, self.get_processing_profile()) if preshrink else None
+        if shrunk is not None:
+            data['orig_width'] = shrunk['orig_width']
+            data['orig_height'] = shrunk['orig_height']
+            filename, content, content_type = shrunk['filename'], shrunk['content'], shrunk['content_type']
+        else:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            filename = os.path.basename(file_path)
+            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        
+        body, headers = build_upload_body(data, filename, content, content_type, self.compress_min_size)
+        response = self.session.post(
+            f"{self.base_url}/api/v1/ocr/file",
+            data=body,
+            headers=headers,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
     
     
     def ocr_from_url(self, image_url: str, lang: str = "ch") -> Dict:
@@ -100,9 +240,11 @@ class PaddleOCRClient:
             'lang': lang
         }
         
+        body, headers = build_json_body(payload, self.compress_min_size)
         response = self.session.post(
             f"{self.base_url}/api/v1/ocr/url",
-            json=payload,
+            data=body,
+            headers=headers,
             timeout=self.timeout
         )
         response.raise_for_status()
@@ -119,19 +261,7 @@ class PaddleOCRClient:
         Returns:
             文本列表
         """
-        if not ocr_result.get('success', False):
-            return []
-        
-        texts = []
-        for item in ocr_result.get('data', []):
-            if isinstance(item, list) and len(item) >= 2:
-                text = item[1]
-                if isinstance(text, list) and len(text) >= 1:
-                    texts.append(text[0])
-                elif isinstance(text, str):
-                    texts.append(text)
-        
-        return texts
+        return extract_text_only(ocr_result)
     
     def get_text_with_confidence(self, ocr_result: Dict) -> List[Dict]:
         """
@@ -143,31 +273,7 @@ class PaddleOCRClient:
         Returns:
             包含文本和置信度的列表
         """
-        if not ocr_result.get('success', False):
-            return []
-        
-        results = []
-        for item in ocr_result.get('data', []):
-            if isinstance(item, list) and len(item) >= 2:
-                bbox = item[0]
-                text_info = item[1]
-                
-                if isinstance(text_info, list) and len(text_info) >= 2:
-                    text = text_info[0]
-                    confidence = text_info[1]
-                    results.append({
-                        'text': text,
-                        'confidence': confidence,
-                        'bbox': bbox
-                    })
-                elif isinstance(text_info, str):
-                    results.append({
-                        'text': text_info,
-                        'confidence': 1.0,
-                        'bbox': bbox
-                    })
-        
-        return results
+        return get_text_with_confidence(ocr_result)
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+PaddleOCR 多节点 Python 客户端
+
+在多个服务实例之间按一致性哈希路由请求：按语言路由时每个节点只需常驻少数语言的
+识别模型，按图片内容路由时同一图片总落在同一节点，便于命中服务端缓存。
+后台线程定期探测 /api/v1/health，节点不健康或返回 429/503 时自动切换到哈希环上的下一个节点。
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import requests
+
+from paddleocr_client import PaddleOCRClient, extract_text_only, get_text_with_confidence
+
+logger = logging.getLogger(__name__)
+
+# 视为节点过载、需要切换节点的状态码
+FAILOVER_STATUS_CODES = (429, 503)
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件内容的 SHA-1，用作按图片路由的键"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class HashRing:
+    """带虚拟节点的一致性哈希环，增删节点时只影响相邻区间的键"""
+
+    def __init__(self, nodes: List[str], vnodes: int = 64):
+        self.vnodes = vnodes
+        self._ring = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str):
+        for i in range(self.vnodes):
+            bisect.insort(self._ring, (_hash(f"{node}#{i}"), node))
+
+    def remove(self, node: str):
+        self._ring = [item for item in self._ring if item[1] != node]
+
+    def nodes_for(self, key: str) -> Iterator[str]:
+        """按哈希环顺时针依次产出不重复的节点，首个为主节点，其后为故障转移顺序"""
+        if not self._ring:
+            return
+        start = bisect.bisect(self._ring, (_hash(key), ''))
+        seen = set()
+        for i in range(len(self._ring)):
+            node = self._ring[(start + i) % len(self._ring)][1]
+            if node not in seen:
+                seen.add(node)
+                yield node
+
+class _Node:
+    """单个服务节点的客户端与健康状态"""
+
+    def __init__(self, base_url: str, timeout: int, compress_min_size: Optional[int],
+                 api_key: Optional[str] = None):
+        self.base_url = base_url
+        self.client = PaddleOCRClient(base_url, timeout, compress_min_size, api_key)
+        self.healthy = True
+        # 过载或出错后的冷却截止时间，期间不作为首选节点
+        self.cooldown_until = 0.0
+        self.failures = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.healthy and time.time() >= self.cooldown_until
+
+    def info(self) -> Dict:
+        return {
+            'base_url': self.base_url,
+            'healthy': self.healthy,
+            'cooldown': max(self.cooldown_until - time.time(), 0.0),
+            'failures': self.failures,
+            'requests': self.requests,
+        }
+
+class ClusterPaddleOCRClient:
+    """PaddleOCR 多节点客户端"""
+
+    def __init__(self, endpoints: List[str], route_by: str = 'lang', timeout: int = 60,
+                 health_interval: float = 5.0, vnodes: int = 64, max_attempts: Optional[int] = None,
+                 cooldown: float = 10.0, compress_min_size: Optional[int] = 1024,
+                 api_key: Optional[str] = None):
+        """
+        初始化客户端
+
+        Args:
+            endpoints: 服务地址列表
+            route_by: 路由方式，lang 按语言、image 按图片内容（URL 识别时按 URL）
+            timeout: 单次请求超时时间（秒）
+            health_interval: 后台健康探测间隔（秒），0 表示不探测
+            vnodes: 每个节点在哈希环上的虚拟节点数
+            max_attempts: 单个请求最多尝试的节点数，默认为全部节点
+            cooldown: 节点过载或连接失败后暂停作为首选的时间（秒），服务返回 Retry-After 时以其为准
+            compress_min_size: 请求体超过该字节数时 gzip 压缩上传，None 表示不压缩
+            api_key: 服务启用多租户时的 API Key
+        """
+        if not endpoints:
+            raise ValueError("至少需要一个服务地址")
+        if route_by not in ('lang', 'image'):
+            raise ValueError(f"不支持的路由方式: {route_by}")
+        self.route_by = route_by
+        self.cooldown = cooldown
+        self.nodes = {url.rstrip('/'): _Node(url.rstrip('/'), timeout, compress_min_size, api_key)
+                      for url in endpoints}
+        self.ring = HashRing(list(self.nodes), vnodes)
+        self.max_attempts = max_attempts or len(self.nodes)
+        self.health_interval = health_interval
+        self._stop = threading.Event()
+        self._health_thread = None
+        if health_interval > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, name='ocr-cluster-health',
+                                                   daemon=True)
+            self._health_thread.start()
+
+    def close(self):
+        """停止健康探测并关闭所有连接"""
+        self._stop.set()
+        for node in self.nodes.values():
+            node.client.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.probe_health()
+
+    def probe_health(self) -> Dict[str, bool]:
+        """探测所有节点的健康状态并更新"""
+        states = {}
+        for url, node in self.nodes.items():
+            healthy = node.client.check_health()
+            if healthy != node.healthy:
+                logger.info(f"节点 {url} 状态变为{'健康' if healthy else '不健康'}")
+            node.healthy = healthy
+            states[url] = healthy
+        return states
+
+    def _mark_failed(self, node: _Node, retry_after: Optional[str] = None, down: bool = False):
+        delay = self.cooldown
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                pass
+        with node.lock:
+            node.failures += 1
+            node.cooldown_until = time.time() + delay
+            if down:
+                # 连接失败时直接标记不健康，待健康探测恢复
+                node.healthy = False
+
+    def route(self, key: str) -> List[str]:
+        """返回该键的节点尝试顺序：可用节点按哈希环顺序在前，其余节点在后"""
+        ordered = list(self.ring.nodes_for(key))
+        available = [url for url in ordered if self.nodes[url].available()]
+        unavailable = [url for url in ordered if url not in available]
+        return (available + unavailable)[:self.max_attempts]
+
+    def _call(self, key: str, call: Callable[[PaddleOCRClient], Dict]) -> Dict:
+        """按路由顺序调用，过载或连接失败时切换到下一个节点"""
+        last_error = None
+        for url in self.route(key):
+            node = self.nodes[url]
+            with node.lock:
+                node.requests += 1
+            try:
+                return call(node.client)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in FAILOVER_STATUS_CODES:
+                    raise
+                logger.warning(f"节点 {url} 返回 {status}，切换节点")
+                self._mark_failed(node, e.response.headers.get('Retry-After'))
+                last_error = e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                logger.warning(f"节点 {url} 请求失败: {e}，切换节点")
+                self._mark_failed(node, down=True)
+                last_error = e
+        raise RuntimeError(f"所有节点均不可用: {last_error}") from last_error
+
+    def _lang_key(self, lang: Union[str, List[str]]) -> str:
+        return lang if isinstance(lang, str) else ','.join(lang)
+
+    def ocr_from_file(self, file_path: str, lang: Union[str, List[str]] = "ch",
+                      preshrink: bool = False, **options) -> Dict:
+        """从文件识别文字，参数同 PaddleOCRClient.ocr_from_file"""
+        key = file_digest(file_path) if self.route_by == 'image' else self._lang_key(lang)
+        lang_value = self._lang_key(lang)
+        return self._call(key, lambda client: client.ocr_from_file(
+            file_path, lang_value, preshrink=preshrink, **options))
+
+    def ocr_from_url(self, image_url: str, lang: Union[str, List[str]] = "ch") -> Dict:
+        """从 URL 识别文字"""
+        key = image_url if self.route_by == 'image' else self._lang_key(lang)
+        lang_value = self._lang_key(lang)
+        return self._call(key, lambda client: client.ocr_from_url(image_url, lang_value))
+
+    def get_cluster_info(self) -> List[Dict]:
+        """各节点健康状态与请求计数"""
+        return [node.info() for node in self.nodes.values()]
+
+    def extract_text_only(self, ocr_result: Dict) -> List[str]:
+        """从 OCR 结果中提取纯文本"""
+        return extract_text_only(ocr_result)
+
+    def get_text_with_confidence(self, ocr_result: Dict) -> List[Dict]:
+        """获取带置信度的文本结果"""
+        return get_text_with_confidence(ocr_result)
+
+if __name__ == "__main__":
+    import sys
+
+    # 用法: python paddleocr_cluster_client.py http://host1:8000,http://host2:8001 图片...
+    with ClusterPaddleOCRClient(sys.argv[1].split(','), health_interval=0) as client:
+        print(client.probe_health())
+        for path in sys.argv[2:]:
+            print(path, ' '.join(client.extract_text_only(client.ocr_from_file(path))))
+        for node in client.get_cluster_info():
+            print(node)
@@ -119,9 +119,11 @@ PaddleOCR 独立服务管理脚本
 import os
 import sys
 import subprocess
+import io
 import time
 import platform
 import json
+import argparse
 import requests
 from pathlib import Path
 
@@ -241,6 +243,18 @@ class ServiceManager:
         model_dir = self.script_dir / "models"
         logging.info(f"检查模型目录: {model_dir}")
         
+        # 已安装离线模型包时按其清单检查
+        bundle_manifest = model_dir / INSTALLED_BUNDLE_MANIFEST
+        if bundle_manifest.exists():
+            manifest = json.loads(bundle_manifest.read_text(encoding='utf-8'))
+            missing = [model['model_name'] for model in manifest['models']
+                       if not (self._resolve_path(model['target']) / 'inference.yml').is_file()]
+            if missing:
+                logging.warning(f"离线模型包 {manifest['version']} 中的模型缺失: {', '.join(missing)}")
+                return False
+            logging.info(f"已安装离线模型包 {manifest['version']}，{len(manifest['models'])} 个模型")
+            return True
+        
         if not model_dir.exists():
             logging.warning("模型目录不存在，首次启动需要下载模型")
             return False
@@ -294,6 +308,9 @@ class ServiceManager:
             return False
         
         models_exist = self.check_models_downloaded()
+        if self._load_service_config().get('ocr', {}).get('offline') and not models_exist:
+            logging.error("离线模式下本地模型不完整，请先执行 manage.py models install")
+            return False
         if not models_exist:
             logging.warning("首次启动需要下载模型文件，这可能需要几分钟时间...")
             logging.warning("   模型将从 Hugging Face 或 BOS 下载并缓存到本地")
@@ -443,6 +460,542 @@ class ServiceManager:
         else:
             logging.error("服务未运行")
     
+    def _load_service_config(self, config_file='config.yaml'):
+        """读取服务配置（不导入服务模块，避免在主进程中加载 paddle）"""
+        import yaml
+        config = {
+            'ocr': {
+                'default_lang': 'ch',
+                'supported_formats': ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'],
+            }
+        }
+        config_path = Path(config_file)
+        if not config_path.is_absolute():
+            config_path = self.script_dir / config_path
+        if config_path.exists():
+            with open(config_path, 'r', encoding='utf-8') as f:
+                user_config = yaml.safe_load(f) or {}
+            for section, values in user_config.items():
+                if isinstance(values, dict):
+                    config.setdefault(section, {}).update(values)
+                else:
+                    config[section] = values
+        return config
+
+    def _collect_image_files(self, sources, supported_formats):
+        """收集待识别图片：目录递归遍历，@list.txt 为文件列表，其余视为单个文件"""
+        files = []
+        for source in sources:
+            if source.startswith('@'):
+                with open(source[1:], 'r', encoding='utf-8') as f:
+                    files.extend(line.strip() for line in f if line.strip())
+            elif os.path.isdir(source):
+                for root, dirs, names in os.walk(source):
+                    dirs.sort()
+                    for name in sorted(names):
+                        if Path(name).suffix.lower() in supported_formats:
+                            files.append(os.path.join(root, name))
+            else:
+                files.append(source)
+        # 去重并保持顺序
+        seen = set()
+        unique = []
+        for file_path in files:
+            file_path = os.path.abspath(file_path)
+            if file_path not in seen:
+                seen.add(file_path)
+                unique.append(file_path)
+        return unique
+
+    def ocr_dir(self, argv):
+        """离线批量识别目录中的图片，直接加载模型而不经过 HTTP"""
+        parser = argparse.ArgumentParser(
+            prog='manage.py ocr-dir',
+            description='离线批量 OCR：进程池 + 批量推理，结果写入 JSONL 或 Parquet')
+        parser.add_argument('sources', nargs='+', help='图片目录、图片文件或 @文件列表')
+        parser.add_argument('-o', '--output', default='ocr_results.jsonl',
+                            help='输出文件，扩展名 .jsonl 或 .parquet')
+        parser.add_argument('--lang', default=None,
+                            help='识别语言，多个语言用逗号分隔（只检测一次），auto 为自动判定，默认取配置 default_lang')
+        parser.add_argument('--gpu', action='store_true', help='使用 GPU 推理')
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 4),
+                            help='工作进程数（每个进程各自加载一份模型）')
+        parser.add_argument('--batch-size', type=int, default=8, help='每次推理的图片数')
+        parser.add_argument('--checkpoint', default=None,
+                            help='已完成文件清单，默认 <output>.done')
+        parser.add_argument('--no-resume', action='store_true', help='忽略已有检查点，重新处理全部文件')
+        parser.add_argument('--report-every', type=float, default=10.0, help='吞吐量汇报间隔（秒）')
+        parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+        args = parser.parse_args(argv)
+
+        config = self._load_service_config(args.config)
+        # 与服务接口相同的语言校验，在启动工作进程前报错，而不是在每个进程加载模型时失败
+        if str(self.script_dir) not in sys.path:
+            sys.path.insert(0, str(self.script_dir))
+        from paddleocr_service import OCRServiceConfig, parse_langs
+        try:
+            langs = parse_langs(args.lang, OCRServiceConfig(str(self._resolve_path(args.config))).config['ocr'])
+        except ValueError as e:
+            logging.error(f"--lang 无效: {e}")
+            return False
+        lang = langs[0] if len(langs) == 1 else langs
+        supported_formats = config['ocr'].get('supported_formats', [])
+        output_path = Path(args.output).resolve()
+        output_format = 'parquet' if output_path.suffix.lower() == '.parquet' else 'jsonl'
+        checkpoint_path = Path(args.checkpoint or f"{output_path}.done").resolve()
+
+        files = self._collect_image_files(args.sources, supported_formats)
+        done = set()
+        if checkpoint_path.exists():
+            if args.no_resume:
+                checkpoint_path.unlink()
+            else:
+                with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                    done = {line.rstrip('\n') for line in f if line.strip()}
+        pending = [f for f in files if f not in done]
+        logging.info(f"待识别图片: {len(pending)} 张（共 {len(files)} 张，已完成 {len(files) - len(pending)} 张）")
+        if not pending:
+            logging.info("没有需要处理的图片")
+            return True
+
+        writer = _OCRResultWriter(output_path, output_format, append=bool(done))
+        batches = [pending[i:i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
+        processed = failed = 0
+        start = last_report = time.time()
+        last_processed = 0
+
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+        import multiprocessing
+        ctx = multiprocessing.get_context('spawn')
+        try:
+            with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx,
+                                     initializer=_ocr_dir_worker_init,
+                                     initargs=(args.config, lang, args.gpu)) as executor, \
+                    open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+                batch_iter = iter(batches)
+                in_flight = set()
+                # 限制在途批次数量，避免一次性提交全部任务占用内存
+                for batch in batch_iter:
+                    in_flight.add(executor.submit(_ocr_dir_worker_run, batch))
+                    if len(in_flight) >= args.workers * 2:
+                        break
+                while in_flight:
+                    finished, in_flight = wait(in_flight, timeout=args.report_every,
+                                               return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        records = future.result()
+                        writer.write(records)
+                        for record in records:
+                            checkpoint.write(record['file'] + '\n')
+                            processed += 1
+                            if not record['success']:
+                                failed += 1
+                        checkpoint.flush()
+                        next_batch = next(batch_iter, None)
+                        if next_batch is not None:
+                            in_flight.add(executor.submit(_ocr_dir_worker_run, next_batch))
+                    now = time.time()
+                    if now - last_report >= args.report_every or not in_flight:
+                        overall = processed / max(now - start, 1e-6)
+                        recent = (processed - last_processed) / max(now - last_report, 1e-6)
+                        logging.info(f"进度 {processed}/{len(pending)}，失败 {failed}，"
+                                     f"吞吐 {recent:.2f} 张/秒（平均 {overall:.2f} 张/秒）")
+                        last_report, last_processed = now, processed
+        except KeyboardInterrupt:
+            logging.warning("已中断，已完成的文件记录在检查点中，重新执行即可继续")
+            return False
+        finally:
+            writer.close()
+
+        elapsed = time.time() - start
+        logging.info(f"批量识别完成: {processed} 张，失败 {failed} 张，耗时 {elapsed:.1f} 秒，"
+                     f"平均 {processed / max(elapsed, 1e-6):.2f} 张/秒")
+        logging.info(f"结果文件: {writer.path}")
+        return failed == 0
+
+    def tune(self, argv):
+        """在样例图片上测试 CPU 线程数、MKLDNN、识别批大小与工作进程数组合，并写回最优配置"""
+        import itertools
+        cpu_count = os.cpu_count() or 1
+        default_threads = sorted({t for t in (1, 2, 4, 8, 16, cpu_count) if t <= cpu_count})
+        parser = argparse.ArgumentParser(
+            prog='manage.py tune',
+            description='CPU 推理调优：测试各配置的吞吐与延迟，并把最优配置写入 config.yaml')
+        parser.add_argument('sources', nargs='*', default=['temp'], help='样例图片目录、文件或 @文件列表')
+        parser.add_argument('--lang', default=None, help='识别语言，默认取配置 default_lang')
+        parser.add_argument('--threads', default=','.join(map(str, default_threads)),
+                            help='待测的每进程 CPU 线程数，逗号分隔')
+        parser.add_argument('--mkldnn', default='on,off', help='待测的 MKLDNN 开关，逗号分隔')
+        parser.add_argument('--batch-sizes', default='6,16', help='待测的识别批大小，逗号分隔')
+        parser.add_argument('--workers', default=None,
+                            help='待测的工作进程数，逗号分隔，默认 1,2,4,... 且进程数×线程数不超过 CPU 核数')
+        parser.add_argument('--max-images', type=int, default=50, help='参与测试的最多图片数')
+        parser.add_argument('--max-p95-ms', type=float, default=None,
+                            help='p95 延迟上限，超过的配置不参与评选')
+        parser.add_argument('--report', default='tune_report.json', help='测试结果输出文件')
+        parser.add_argument('--dry-run', action='store_true', help='只输出结果，不修改配置文件')
+        parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+        args = parser.parse_args(argv)
+
+        config = self._load_service_config(args.config)
+        lang = args.lang or config['ocr'].get('default_lang', 'ch')
+        # 相对路径按脚本目录解析，与配置文件一致
+        sources = ['@' + str(self._resolve_path(source[1:])) if source.startswith('@')
+                   else str(self._resolve_path(source)) for source in args.sources]
+        files = self._collect_image_files(sources, config['ocr'].get('supported_formats', []))
+        files = [f for f in files if os.path.isfile(f)][:args.max_images]
+        if not files:
+            logging.error(f"没有找到样例图片: {args.sources}")
+            return False
+        thread_options = [int(t) for t in args.threads.split(',')]
+        mkldnn_options = [m.strip().lower() in ('on', 'true', '1') for m in args.mkldnn.split(',')]
+        batch_sizes = [int(b) for b in args.batch_sizes.split(',')]
+        if args.workers:
+            worker_options = [int(w) for w in args.workers.split(',')]
+        else:
+            worker_options = [w for w in (1, 2, 4, 8, 16, 32) if w <= cpu_count]
+        combos = [(w, t, m) for w, t, m in itertools.product(worker_options, thread_options, mkldnn_options)
+                  if args.workers or w * t <= cpu_count]
+        logging.info(f"样例图片 {len(files)} 张，共 {len(combos) * len(batch_sizes)} 种配置，CPU 核数 {cpu_count}")
+
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+        import multiprocessing
+        ctx = multiprocessing.get_context('spawn')
+        results = []
+        for workers, threads, mkldnn in combos:
+            # 调优时每个进程同一时刻只处理一个请求，关闭跨请求批处理使 rec_batch_size 生效
+            overrides = {
+                'ocr': {'cpu_threads': threads, 'enable_mkldnn': mkldnn, 'use_gpu': False},
+                'performance': {'rec_batching': {'enabled': False}},
+            }
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                         initializer=_ocr_dir_worker_init,
+                                         initargs=(args.config, lang, False, overrides)) as executor:
+                    for batch_size in batch_sizes:
+                        # 预热：每个进程至少处理一张图片
+                        warmup = [executor.submit(_tune_worker_run, files[i % len(files)], batch_size)
+                                  for i in range(workers * 2)]
+                        for future in warmup:
+                            future.result()
+                        latencies = []
+                        queue = iter(files)
+                        in_flight = set()
+                        start = time.time()
+                        # 在途请求数等于进程数，延迟不含排队时间
+                        for path in itertools.islice(queue, workers):
+                            in_flight.add(executor.submit(_tune_worker_run, path, batch_size))
+                        while in_flight:
+                            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                latencies.append(future.result())
+                                path = next(queue, None)
+                                if path is not None:
+                                    in_flight.add(executor.submit(_tune_worker_run, path, batch_size))
+                        elapsed = time.time() - start
+                        latencies.sort()
+                        result = {
+                            'workers': workers,
+                            'cpu_threads': threads,
+                            'enable_mkldnn': mkldnn,
+                            'rec_batch_size': batch_size,
+                            'images': len(latencies),
+                            'throughput': len(latencies) / max(elapsed, 1e-6),
+                            'latency_p50_ms': latencies[len(latencies) // 2] * 1000,
+                            'latency_p95_ms': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+                        }
+                        results.append(result)
+                        logging.info(f"workers={workers} threads={threads} mkldnn={mkldnn} batch={batch_size}: "
+                                     f"{result['throughput']:.2f} 张/秒，p50 {result['latency_p50_ms']:.0f} ms，"
+                                     f"p95 {result['latency_p95_ms']:.0f} ms")
+            except Exception as e:
+                logging.error(f"配置 workers={workers} threads={threads} mkldnn={mkldnn} 测试失败: {e}")
+            except KeyboardInterrupt:
+                logging.warning("已中断，使用已完成的测试结果")
+                break
+
+        candidates = [r for r in results
+                      if args.max_p95_ms is None or r['latency_p95_ms'] <= args.max_p95_ms]
+        if not candidates:
+            logging.error("没有满足条件的配置")
+            return False
+        best = max(candidates, key=lambda r: r['throughput'])
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'cpu_count': cpu_count, 'images': len(files), 'lang': lang,
+                       'results': results, 'best': best}, f, ensure_ascii=False, indent=2)
+        logging.info(f"最优配置: workers={best['workers']} cpu_threads={best['cpu_threads']} "
+                     f"enable_mkldnn={best['enable_mkldnn']} rec_batch_size={best['rec_batch_size']}，"
+                     f"{best['throughput']:.2f} 张/秒")
+        logging.info(f"测试结果已写入 {args.report}")
+        if not args.dry_run:
+            config_path = Path(args.config)
+            if not config_path.is_absolute():
+                config_path = self.script_dir / config_path
+            values = {
+                ('server', 'workers'): best['workers'],
+                ('ocr', 'cpu_threads'): best['cpu_threads'],
+                ('ocr', 'enable_mkldnn'): best['enable_mkldnn'],
+            }
+            # 启用跨请求批处理时 rec_batch_size 不生效，保留批处理配置，不写回批大小
+            if config.get('performance', {}).get('rec_batching', {}).get('enabled', True):
+                logging.info("已启用跨请求批处理，rec_batch_size 不写回")
+            else:
+                values[('ocr', 'pipeline_defaults', 'rec_batch_size')] = best['rec_batch_size']
+            update_yaml_values(config_path, values)
+            logging.info(f"最优配置已写入 {config_path}")
+        return True
+
+    def quant_compare(self, argv):
+        """在标注数据集上对比 fp32 与 int8 模型的精度、速度与内存"""
+        parser = argparse.ArgumentParser(
+            prog='manage.py quant-compare',
+            description='对比不同推理精度：字符准确率、框召回率 (IoU>=0.5)、延迟与内存')
+        parser.add_argument('label_file', help='PPOCRLabel 格式的 Label.txt')
+        parser.add_argument('--image-dir', default=None, help='图片根目录，默认相对 Label.txt 所在目录解析')
+        parser.add_argument('--lang', default=None, help='识别语言，默认取配置 default_lang')
+        parser.add_argument('--precisions', default='fp32,int8', help='待对比的精度，逗号分隔')
+        parser.add_argument('--max-images', type=int, default=None, help='参与对比的最多图片数')
+        parser.add_argument('--report', default='quant_report.json', help='对比结果输出文件')
+        parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+        args = parser.parse_args(argv)
+
+        config = self._load_service_config(args.config)
+        lang = args.lang or config['ocr'].get('default_lang', 'ch')
+        samples = _load_label_file(args.label_file, args.image_dir)[:args.max_images]
+        if not samples:
+            logging.error(f"标注文件为空: {args.label_file}")
+            return False
+        paths = [sample['path'] for sample in samples]
+        logging.info(f"标注图片 {len(samples)} 张，语言 {lang}")
+
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+        ctx = multiprocessing.get_context('spawn')
+        report = {'lang': lang, 'images': len(samples), 'results': {}}
+        for precision in [p.strip() for p in args.precisions.split(',') if p.strip()]:
+            # 每种精度在独立进程中加载，内存统计互不干扰
+            overrides = {'ocr': {'precision': {lang: precision}, 'use_gpu': False}}
+            try:
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx,
+                                         initializer=_ocr_dir_worker_init,
+                                         initargs=(args.config, lang, False, overrides)) as executor:
+                    memory = executor.submit(_quant_worker_memory).result()
+                    executor.submit(_quant_worker_eval, paths[:1]).result()
+                    outputs = executor.submit(_quant_worker_eval, paths).result()
+            except Exception as e:
+                logging.error(f"精度 {precision} 测试失败: {e}")
+                continue
+            latencies = sorted(o['latency'] for o in outputs)
+            result = _score_predictions(samples, outputs)
+            result.update({
+                'latency_mean_ms': sum(latencies) / len(latencies) * 1000,
+                'latency_p50_ms': latencies[len(latencies) // 2] * 1000,
+                'latency_p95_ms': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000,
+                'model_memory_mb': memory['model_bytes'] / 1024 / 1024,
+                'rss_mb': memory['rss_bytes'] / 1024 / 1024,
+            })
+            report['results'][precision] = result
+            logging.info(f"{precision}: 字符准确率 {result['char_accuracy']:.4f}，框召回率 {result['box_recall']:.4f}，"
+                         f"延迟 p50 {result['latency_p50_ms']:.1f} ms / p95 {result['latency_p95_ms']:.1f} ms，"
+                         f"模型内存 {result['model_memory_mb']:.0f} MB")
+
+        results = report['results']
+        if 'fp32' in results:
+            base = results['fp32']
+            for precision, result in results.items():
+                if precision == 'fp32':
+                    continue
+                result['speedup'] = base['latency_mean_ms'] / max(result['latency_mean_ms'], 1e-6)
+                result['char_accuracy_delta'] = result['char_accuracy'] - base['char_accuracy']
+                result['box_recall_delta'] = result['box_recall'] - base['box_recall']
+                result['memory_saving_mb'] = base['model_memory_mb'] - result['model_memory_mb']
+                logging.info(f"{precision} 相对 fp32: 加速 {result['speedup']:.2f}x，"
+                             f"字符准确率 {result['char_accuracy_delta']:+.4f}，"
+                             f"框召回率 {result['box_recall_delta']:+.4f}，"
+                             f"节省内存 {result['memory_saving_mb']:.0f} MB")
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logging.info(f"对比结果已写入 {args.report}")
+        return bool(results)
+
+    def bench(self, argv):
+        """分阶段基准测试：bench run [-o 结果.json] [--stub] / bench compare 基线.json 当前.json"""
+        if str(self.script_dir) not in sys.path:
+            sys.path.insert(0, str(self.script_dir))
+        import benchmark
+        return benchmark.main(argv) == 0
+
+    def models(self, argv):
+        """离线模型包：models pack -o bundle.tar / models verify [bundle.tar] / models install bundle.tar"""
+        parser = argparse.ArgumentParser(
+            prog='manage.py models',
+            description='打包、校验、安装配置中引用的模型，用于无网络环境部署')
+        subparsers = parser.add_subparsers(dest='action', required=True)
+        pack_parser = subparsers.add_parser('pack', help='把配置中的模型打成带校验和的版本化模型包')
+        pack_parser.add_argument('-o', '--output', required=True, help='输出文件，.tar.gz/.tgz 时压缩')
+        pack_parser.add_argument('--version', default=None, help='模型包版本，默认为打包时间')
+        pack_parser.add_argument('--source', action='append', default=[],
+                                 help='额外的模型查找目录（其下为 <模型名>/inference.yml），可多次指定')
+        pack_parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+        verify_parser = subparsers.add_parser('verify', help='校验模型包，未指定时校验已安装的模型')
+        verify_parser.add_argument('bundle', nargs='?', default=None, help='模型包文件')
+        verify_parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+        install_parser = subparsers.add_parser('install', help='校验并安装模型包')
+        install_parser.add_argument('bundle', help='模型包文件')
+        install_parser.add_argument('--enable-offline', action='store_true',
+                                    help='安装后在配置中开启 ocr.offline，只从本地加载模型')
+        install_parser.add_argument('--config', default='config.yaml', help='服务配置文件')
+        args = parser.parse_args(argv)
+
+        config = self._load_service_config(args.config)
+        if args.action == 'pack':
+            return self._pack_models(config, args)
+        if args.action == 'verify':
+            if args.bundle:
+                return _verify_model_bundle(args.bundle, config['ocr']) is not None
+            return self._verify_installed_models(config)
+        return self._install_models(config, args)
+
+    def _resolve_path(self, path):
+        path = Path(path)
+        return path if path.is_absolute() else self.script_dir / path
+
+    def _pack_models(self, config, args):
+        import tarfile
+        ocr_config = config['ocr']
+        model_root = ocr_config.get('model_dir', './models')
+        search_dirs = ([self._resolve_path(model_root)] + [Path(d) for d in args.source]
+                       + [_paddlex_model_cache()])
+        entries = []
+        missing = []
+        for index, model in enumerate(_configured_models(ocr_config)):
+            if model['model_dir']:
+                source = self._resolve_path(model['model_dir'])
+                target = model['model_dir']
+            else:
+                source = next((d / model['model_name'] for d in search_dirs
+                               if (d / model['model_name'] / 'inference.yml').is_file()), None)
+                target = f"{model_root.rstrip('/')}/{model['model_name']}"
+            if source is None or not (source / 'inference.yml').is_file():
+                missing.append(f"{model['model_name']} ({', '.join(model['roles'])})")
+                continue
+            files = {}
+            for file_path in sorted(p for p in source.rglob('*') if p.is_file()):
+                files[file_path.relative_to(source).as_posix()] = {
+                    'sha256': _sha256_file(file_path),
+                    'size': file_path.stat().st_size,
+                }
+            entries.append(dict(model, target=target, source=source,
+                                archive_path=f"models/{index:02d}_{model['model_name']}", files=files))
+            logging.info(f"{model['model_name']}: {source}，{len(files)} 个文件")
+        if missing:
+            logging.error(f"以下模型在本地未找到，请先联网启动一次服务或用 --source 指定目录: {'; '.join(missing)}")
+            return False
+
+        manifest = {
+            'format': MODEL_BUNDLE_FORMAT,
+            'version': args.version or time.strftime('%Y%m%d%H%M%S'),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'model_dir': model_root,
+            'models': [{k: v for k, v in entry.items() if k != 'source'} for entry in entries],
+        }
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        mode = 'w:gz' if output.name.endswith(('.tar.gz', '.tgz')) else 'w'
+        manifest_bytes = json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8')
+        with tarfile.open(output, mode) as tar:
+            info = tarfile.TarInfo(MODEL_BUNDLE_MANIFEST)
+            info.size = len(manifest_bytes)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(manifest_bytes))
+            for entry in entries:
+                for rel in entry['files']:
+                    tar.add(entry['source'] / rel, arcname=f"{entry['archive_path']}/{rel}", recursive=False)
+        digest = _sha256_file(output)
+        Path(f"{output}.sha256").write_text(f"{digest}  {output.name}\n", encoding='utf-8')
+        size_mb = output.stat().st_size / 1024 / 1024
+        logging.info(f"模型包 {output} 版本 {manifest['version']}，{len(entries)} 个模型，{size_mb:.1f} MB")
+        logging.info(f"SHA-256: {digest}（已写入 {output}.sha256）")
+        return True
+
+    def _verify_installed_models(self, config):
+        """校验已安装模型包的文件完整性及其是否覆盖当前配置"""
+        manifest_path = self._resolve_path(config['ocr'].get('model_dir', './models')) / INSTALLED_BUNDLE_MANIFEST
+        if not manifest_path.exists():
+            logging.error(f"未安装模型包: {manifest_path} 不存在")
+            return False
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        ok = _check_bundle_coverage(manifest, config['ocr'])
+        for model in manifest['models']:
+            target = self._resolve_path(model['target'])
+            for rel, meta in model['files'].items():
+                path = target / rel
+                if not path.is_file():
+                    logging.error(f"缺少文件: {path}")
+                    ok = False
+                elif _sha256_file(path) != meta['sha256']:
+                    logging.error(f"校验和不一致: {path}")
+                    ok = False
+        if ok:
+            logging.info(f"已安装模型包版本 {manifest['version']}，{len(manifest['models'])} 个模型校验通过")
+        return ok
+
+    def _install_models(self, config, args):
+        import shutil
+        import tarfile
+        import tempfile
+        manifest = _verify_model_bundle(args.bundle, config['ocr'])
+        if manifest is None:
+            return False
+        model_root = self._resolve_path(config['ocr'].get('model_dir', './models')).resolve()
+        # 清单中的安装位置必须位于模型目录之内，防止构造的模型包覆盖或删除其他目录
+        targets = []
+        for model in manifest['models']:
+            target = self._resolve_path(model['target']).resolve()
+            if not _path_within(target, model_root):
+                logging.error(f"模型 {model['model_name']} 的安装位置不在模型目录 {model_root} 内: {model['target']}")
+                return False
+            targets.append(target)
+        model_root.mkdir(parents=True, exist_ok=True)
+        # 解压到模型目录下的临时目录，与目标同一文件系统，替换时只需重命名
+        staging = Path(tempfile.mkdtemp(prefix='.bundle-', dir=model_root))
+        try:
+            with tarfile.open(args.bundle, 'r:*') as tar:
+                for member in tar:
+                    if member.isfile():
+                        destination = (staging / member.name).resolve()
+                        if not _path_within(destination, staging.resolve()):
+                            raise ValueError(f"模型包成员路径越界: {member.name}")
+                        destination.parent.mkdir(parents=True, exist_ok=True)
+                        with tar.extractfile(member) as src, open(destination, 'wb') as dst:
+                            shutil.copyfileobj(src, dst)
+            for model, target in zip(manifest['models'], targets):
+                source = (staging / model['archive_path']).resolve()
+                if not _path_within(source, staging.resolve()):
+                    raise ValueError(f"模型包路径越界: {model['archive_path']}")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                backup = target.with_name(f"{target.name}.old")
+                if backup.exists():
+                    shutil.rmtree(backup)
+                if target.exists():
+                    target.rename(backup)
+                source.rename(target)
+                if backup.exists():
+                    shutil.rmtree(backup)
+                logging.info(f"已安装 {model['model_name']} -> {target}")
+        except ValueError as e:
+            logging.error(str(e))
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        (model_root / INSTALLED_BUNDLE_MANIFEST).write_text(
+            json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+        logging.info(f"模型包版本 {manifest['version']} 安装完成")
+        if args.enable_offline:
+            update_yaml_values(self._resolve_path(args.config), {('ocr', 'offline'): True})
+            logging.info("已开启离线模式 (ocr.offline)，服务只从本地目录加载模型")
+        return True
+
     def full_setup(self):
         """完整安装流程"""
         logging.info("开始完整安装流程...")
@@ -473,6 +1026,434 @@ class ServiceManager:
         logging.info(f"   • 测试服务: {self.python_cmd} manage.py test")
         return True
 
+# 离线批量识别工作进程状态（每个进程各自持有一份模型）
+_OCR_WORKER = {}
+
+def _ocr_dir_worker_init(config_file, lang, use_gpu, overrides=None):
+    """工作进程初始化：直接加载 OCRModelManager 模型，overrides 覆盖部分配置"""
+    script_dir = str(Path(__file__).parent)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    from paddleocr_service import OCRServiceConfig, OCRModelManager
+    if not os.path.isabs(config_file):
+        config_file = os.path.join(script_dir, config_file)
+    service_config = OCRServiceConfig(config_file)
+    if overrides:
+        service_config._deep_update(service_config.config, overrides)
+    config = service_config.config
+    manager = OCRModelManager(config)
+    if lang == 'auto':
+        # 自动语言识别按需加载判定出的语言，这里只预加载探测语言
+        model_langs = config['ocr']['auto_lang'].get('probe_langs') or [config['ocr']['default_lang']]
+    else:
+        model_langs = [lang] if isinstance(lang, str) else lang
+    for model_lang in model_langs:
+        manager.get_model(model_lang, use_gpu)
+    _OCR_WORKER.update(config=config, manager=manager, lang=lang, use_gpu=use_gpu)
+
+def _ocr_dir_worker_run(paths):
+    """识别一批图片，返回每张图片的结果记录"""
+    from paddleocr_service import format_ocr_result, load_image, parse_pipeline_options
+    config = _OCR_WORKER['config']
+    lang = _OCR_WORKER['lang']
+    manager = _OCR_WORKER['manager']
+    use_gpu = _OCR_WORKER['use_gpu']
+    options = parse_pipeline_options(None, config['ocr'])
+
+    records = {}
+    images, image_paths = [], []
+    for path in paths:
+        try:
+            images.append(load_image(path, config['ocr']))
+        except Exception as e:
+            records[path] = {'file': path, 'success': False, 'error': str(e)}
+            continue
+        image_paths.append(path)
+
+    if images:
+        try:
+            results = list(manager.predict(images, lang, use_gpu, options))
+        except Exception:
+            # 整批失败时逐张重试，避免一张坏图拖累整批
+            results = []
+            for image in images:
+                try:
+                    results.append(manager.predict(image, lang, use_gpu, options)[0])
+                except Exception as e:
+                    results.append(e)
+        for path, result in zip(image_paths, results):
+            if isinstance(result, Exception):
+                records[path] = {'file': path, 'success': False, 'error': str(result)}
+                continue
+            record = format_ocr_result(result, lang)
+            record.pop('timestamp', None)
+            record['file'] = path
+            records[path] = record
+    return [records[path] for path in paths]
+
+def _tune_worker_run(path, rec_batch_size):
+    """调优：按单个请求的方式识别一张图片，返回耗时（秒）"""
+    from paddleocr_service import load_image, parse_pipeline_options
+    config = _OCR_WORKER['config']
+    options = parse_pipeline_options({'rec_batch_size': rec_batch_size}, config['ocr'])
+    start = time.perf_counter()
+    image = load_image(path, config['ocr'])
+    _OCR_WORKER['manager'].predict(image, _OCR_WORKER['lang'], _OCR_WORKER['use_gpu'], options)
+    return time.perf_counter() - start
+
+def _quant_worker_eval(paths):
+    """精度对比：逐张识别并计时，返回检测框、文本与耗时"""
+    from paddleocr_service import load_image, parse_pipeline_options
+    config = _OCR_WORKER['config']
+    manager = _OCR_WORKER['manager']
+    options = parse_pipeline_options(None, config['ocr'])
+    outputs = []
+    for path in paths:
+        image = load_image(path, config['ocr'])
+        start = time.perf_counter()
+        result = manager.predict(image, _OCR_WORKER['lang'], _OCR_WORKER['use_gpu'], options)[0]
+        elapsed = time.perf_counter() - start
+        outputs.append({
+            'latency': elapsed,
+            'texts': list(result['rec_texts']),
+            'polys': [poly.tolist() for poly in result['rec_polys']],
+        })
+    return outputs
+
+def _quant_worker_memory():
+    """精度对比：已加载子模型的内存估计（字节）与进程 RSS"""
+    import psutil
+    manager = _OCR_WORKER['manager']
+    with manager.model_lock:
+        models = sum(m.memory_estimate or 0 for m in manager.submodels.values())
+    return {'model_bytes': models, 'rss_bytes': psutil.Process().memory_info().rss}
+
+def _polygon_iou(poly_a, poly_b):
+    """两个凸四边形的 IoU"""
+    import cv2
+    import numpy as np
+    a = np.asarray(poly_a, dtype=np.float32).reshape(-1, 2)
+    b = np.asarray(poly_b, dtype=np.float32).reshape(-1, 2)
+    a, b = cv2.convexHull(a), cv2.convexHull(b)
+    inter, _ = cv2.intersectConvexConvex(a, b)
+    union = cv2.contourArea(a) + cv2.contourArea(b) - inter
+    return inter / union if union > 0 else 0.0
+
+def _edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def _load_label_file(label_file, image_dir=None):
+    """读取 PPOCRLabel 格式的 Label.txt：每行 图片路径\\t[{transcription, points, difficult}]"""
+    label_dir = Path(label_file).resolve().parent
+    samples = []
+    with open(label_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            image_path, annotations = line.rstrip('\n').split('\t', 1)
+            candidates = [Path(image_path)] if os.path.isabs(image_path) else [
+                Path(root) / image_path for root in (image_dir, label_dir, label_dir.parent) if root]
+            path = next((c for c in candidates if c.exists()), candidates[0])
+            # 难例与不可识别（###）区域不参与评估
+            boxes = [{'text': a['transcription'], 'points': a['points']}
+                     for a in json.loads(annotations)
+                     if not a.get('difficult') and a.get('transcription') != '###']
+            samples.append({'path': str(path), 'boxes': boxes})
+    return samples
+
+def _score_predictions(samples, outputs, iou_threshold=0.5):
+    """按 IoU 贪心匹配预测框与标注框，统计框召回率与字符准确率"""
+    total_boxes = matched_boxes = total_chars = errors = 0
+    for sample, output in zip(samples, outputs):
+        pairs = []
+        for gi, gt in enumerate(sample['boxes']):
+            for pi, poly in enumerate(output['polys']):
+                iou = _polygon_iou(gt['points'], poly)
+                if iou >= iou_threshold:
+                    pairs.append((iou, gi, pi))
+        pairs.sort(reverse=True)
+        gt_used, pred_used, matches = set(), set(), {}
+        for _, gi, pi in pairs:
+            if gi not in gt_used and pi not in pred_used:
+                gt_used.add(gi)
+                pred_used.add(pi)
+                matches[gi] = output['texts'][pi]
+        for gi, gt in enumerate(sample['boxes']):
+            total_boxes += 1
+            total_chars += len(gt['text'])
+            if gi in matches:
+                matched_boxes += 1
+            # 未匹配的标注框按整行识别错误计
+            errors += _edit_distance(gt['text'], matches.get(gi, ''))
+    return {
+        'box_recall': matched_boxes / max(total_boxes, 1),
+        'char_accuracy': max(1 - errors / max(total_chars, 1), 0.0),
+        'boxes': total_boxes,
+        'chars': total_chars,
+    }
+
+# 离线模型包格式版本、包内清单与安装后清单的文件名
+MODEL_BUNDLE_FORMAT = 1
+MODEL_BUNDLE_MANIFEST = 'manifest.json'
+INSTALLED_BUNDLE_MANIFEST = 'bundle_manifest.json'
+
+def _sha256_file(path, chunk_size=1024 * 1024):
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _path_within(path, root):
+    """path 是否位于 root 之内（不含 root 本身），两者均应已 resolve"""
+    return root in path.parents
+
+def _paddlex_model_cache():
+    """PaddleX 自动下载模型的缓存目录"""
+    cache_home = os.environ.get('PADDLE_PDX_CACHE_HOME') or str(Path.home() / '.paddlex')
+    return Path(cache_home) / 'official_models'
+
+def _configured_models(ocr_config):
+    """
+    配置中引用的全部模型（检测、方向分类、各语言识别、登记版本与量化模型）
+
+    Returns:
+        [{'model_name', 'model_dir', 'roles'}]，按 (model_name, model_dir) 去重；
+        model_dir 为 None 时按模型名加载
+    """
+    models = {}
+
+    def add(role, model_name, model_dir=None):
+        if not model_name:
+            return
+        entry = models.setdefault((model_name, model_dir or None), {
+            'model_name': model_name, 'model_dir': model_dir or None, 'roles': []})
+        entry['roles'].append(role)
+
+    add('det', ocr_config.get('det_model', 'PP-OCRv5_server_det'))
+    add('textline_orientation', ocr_config.get('textline_orientation_model', 'PP-LCNet_x1_0_textline_ori'))
+    add('doc_orientation', ocr_config.get('doc_orientation_model', 'PP-LCNet_x1_0_doc_ori'))
+    add('doc_unwarping', ocr_config.get('doc_unwarping_model', 'UVDoc'))
+    for lang, model_name in (ocr_config.get('rec_models') or {}).items():
+        add(f'rec:{lang}', model_name)
+    for lang, versions in (ocr_config.get('model_versions') or {}).items():
+        for version, spec in (versions or {}).items():
+            add(f'rec:{lang}@{version}', spec.get('model_name'), spec.get('model_dir'))
+    quantized = ocr_config.get('quantized_models') or {}
+    if quantized.get('det'):
+        add('det@int8', quantized['det'].get('model_name'), quantized['det'].get('model_dir'))
+    for lang, spec in (quantized.get('rec') or {}).items():
+        add(f'rec:{lang}@int8', spec.get('model_name'), spec.get('model_dir'))
+    return list(models.values())
+
+def _check_bundle_coverage(manifest, ocr_config):
+    """检查模型包是否包含当前配置引用的全部模型"""
+    bundled = {(m['model_name'], m.get('model_dir')) for m in manifest.get('models', [])}
+    missing = [m for m in _configured_models(ocr_config) if (m['model_name'], m['model_dir']) not in bundled]
+    for model in missing:
+        logging.error(f"模型包缺少配置中的模型: {model['model_name']} ({', '.join(model['roles'])})")
+    return not missing
+
+def _verify_model_bundle(bundle_path, ocr_config):
+    """
+    校验模型包：整包 SHA-256（存在 .sha256 文件时）、逐文件校验和、成员与清单一致、覆盖当前配置
+
+    Returns:
+        校验通过时返回清单，否则返回 None
+    """
+    import hashlib
+    import tarfile
+    bundle_path = Path(bundle_path)
+    if not bundle_path.is_file():
+        logging.error(f"模型包不存在: {bundle_path}")
+        return None
+    checksum_file = Path(f"{bundle_path}.sha256")
+    if checksum_file.exists():
+        expected = checksum_file.read_text(encoding='utf-8').split()[0]
+        if _sha256_file(bundle_path) != expected:
+            logging.error(f"模型包校验和与 {checksum_file.name} 不一致")
+            return None
+    else:
+        logging.warning(f"未找到 {checksum_file.name}，仅校验包内各文件")
+    ok = True
+    with tarfile.open(bundle_path, 'r:*') as tar:
+        try:
+            manifest = json.load(tar.extractfile(MODEL_BUNDLE_MANIFEST))
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"模型包清单无效: {e}")
+            return None
+        if manifest.get('format') != MODEL_BUNDLE_FORMAT:
+            logging.error(f"不支持的模型包格式: {manifest.get('format')}")
+            return None
+        expected = {}
+        for model in manifest['models']:
+            for rel, meta in model['files'].items():
+                expected[f"{model['archive_path']}/{rel}"] = meta
+        seen = set()
+        for member in tar:
+            if member.name == MODEL_BUNDLE_MANIFEST:
+                continue
+            parts = Path(member.name).parts
+            if member.name not in expected or not member.isfile() or Path(member.name).is_absolute() or '..' in parts:
+                logging.error(f"模型包含有清单外的成员: {member.name}")
+                ok = False
+                continue
+            digest = hashlib.sha256()
+            with tar.extractfile(member) as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            if digest.hexdigest() != expected[member.name]['sha256']:
+                logging.error(f"文件校验和不一致: {member.name}")
+                ok = False
+            seen.add(member.name)
+        for name in set(expected) - seen:
+            logging.error(f"模型包缺少文件: {name}")
+            ok = False
+    ok = _check_bundle_coverage(manifest, ocr_config) and ok
+    if ok:
+        logging.info(f"模型包 {bundle_path.name} 版本 {manifest['version']}，"
+                     f"{len(manifest['models'])} 个模型、{len(expected)} 个文件校验通过")
+    return manifest if ok else None
+
+def _format_yaml_scalar(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, str):
+        return f"'{value}'"
+    return str(value)
+
+def update_yaml_values(path, updates):
+    """
+    按行修改 YAML 配置中的标量值，保留注释与原有格式
+
+    Args:
+        path: 配置文件路径
+        updates: {('ocr', 'cpu_threads'): 4, ...}，缺失的键追加到所属段末尾
+    """
+    import re
+    key_pattern = re.compile(r'^(\s*)([A-Za-z_][\w-]*):(\s*)([^#\n]*?)(\s*#.*)?$')
+    lines = Path(path).read_text(encoding='utf-8').splitlines() if Path(path).exists() else []
+    pending = dict(updates)
+    # 各键路径最后一行的位置与缩进，用于在段末尾插入缺失的键
+    section_end = {}
+    stack = []
+    for index, line in enumerate(lines):
+        match = key_pattern.match(line)
+        if not match or line.lstrip().startswith('#'):
+            if line.strip() and not line.lstrip().startswith('#'):
+                # 列表项等属于当前段
+                for depth in range(1, len(stack) + 1):
+                    section_end[tuple(k for _, k in stack[:depth])] = index
+            continue
+        indent = len(match.group(1))
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        stack.append((indent, match.group(2)))
+        key_path = tuple(k for _, k in stack)
+        for depth in range(1, len(stack) + 1):
+            section_end[key_path[:depth]] = index
+        if key_path in pending and match.group(4):
+            value = _format_yaml_scalar(pending.pop(key_path))
+            new_line = f"{match.group(1)}{match.group(2)}:{match.group(3) or ' '}{value}"
+            comment = match.group(5)
+            if comment:
+                # 注释保持原来的列位置
+                column = match.start(5) + len(comment) - len(comment.lstrip())
+                new_line += ' ' * max(column - len(new_line), 1) + comment.lstrip()
+            lines[index] = new_line
+    # 缺失的键：插入到已存在的最深一级父段末尾，并补齐中间各级
+    for key_path, value in pending.items():
+        depth = len(key_path) - 1
+        while depth > 0 and key_path[:depth] not in section_end:
+            depth -= 1
+        new_lines = [f"{'  ' * d}{key_path[d]}:" for d in range(depth, len(key_path) - 1)]
+        new_lines.append(f"{'  ' * (len(key_path) - 1)}{key_path[-1]}: {_format_yaml_scalar(value)}")
+        insert_at = section_end[key_path[:depth]] + 1 if depth else len(lines)
+        lines[insert_at:insert_at] = new_lines
+        last = insert_at + len(new_lines) - 1
+        for other, end in section_end.items():
+            if end >= insert_at:
+                section_end[other] = end + len(new_lines)
+        for d in range(1, len(key_path)):
+            section_end[key_path[:d]] = max(section_end.get(key_path[:d], last), last)
+    Path(path).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+class _OCRResultWriter:
+    """批量识别结果写入器，支持 JSONL 与 Parquet"""
+
+    PARQUET_COLUMNS = ['file', 'success', 'lang', 'text', 'word_count',
+                       'avg_confidence', 'details', 'error']
+
+    def __init__(self, path, output_format, append=False):
+        self.output_format = output_format
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if output_format == 'parquet':
+            try:
+                import pyarrow
+                import pyarrow.parquet
+            except ImportError:
+                raise RuntimeError("输出 Parquet 需要安装 pyarrow: pip install pyarrow")
+            self._pa = pyarrow
+            self._pq = pyarrow.parquet
+            # 显式声明列类型，避免首批结果全成功、全失败或无文本时推断出 null/int 列导致后续分块写入失败
+            self._schema = pyarrow.schema([
+                ('file', pyarrow.string()),
+                ('success', pyarrow.bool_()),
+                ('lang', pyarrow.string()),
+                ('text', pyarrow.string()),
+                ('word_count', pyarrow.int64()),
+                ('avg_confidence', pyarrow.float64()),
+                ('details', pyarrow.string()),
+                ('error', pyarrow.string()),
+            ])
+            # Parquet 无法追加，断点续跑时写入新的分片文件
+            if append and self.path.exists():
+                index = 1
+                while True:
+                    candidate = self.path.with_name(f"{self.path.stem}.part{index}{self.path.suffix}")
+                    if not candidate.exists():
+                        break
+                    index += 1
+                self.path = candidate
+            self._writer = None
+        else:
+            self._file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, records):
+        if self.output_format == 'parquet':
+            rows = {column: [] for column in self.PARQUET_COLUMNS}
+            for record in records:
+                for column in self.PARQUET_COLUMNS:
+                    value = record.get(column)
+                    if column == 'details':
+                        value = json.dumps(value or [], ensure_ascii=False)
+                    elif column == 'avg_confidence' and value is not None:
+                        value = float(value)
+                    rows[column].append(value)
+            table = self._pa.table(rows, schema=self._schema)
+            if self._writer is None:
+                self._writer = self._pq.ParquetWriter(str(self.path), self._schema)
+            self._writer.write_table(table)
+        else:
+            for record in records:
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def close(self):
+        if self.output_format == 'parquet':
+            if self._writer is not None:
+                self._writer.close()
+        else:
+            self._file.close()
+
 def main():
     """主函数"""
     manager = ServiceManager()
@@ -489,9 +1470,15 @@ def main():
         logging.info("  status  - 查看状态")
         logging.info("  test    - 测试服务")
         logging.info("  install - 安装依赖")
+        logging.info("  ocr-dir - 离线批量识别目录 (ocr-dir <目录|文件|@列表> -o out.jsonl)")
+        logging.info("  tune    - CPU 推理调优并写回配置 (tune [样例目录]，默认 temp/)")
+        logging.info("  quant-compare - 对比 fp32/int8 模型精度与速度 (quant-compare Label.txt --lang en)")
+        logging.info("  bench   - 分阶段基准测试 (bench run -o base.json --stub / bench compare base.json new.json)")
+        logging.info("  models  - 离线模型包 (models pack -o bundle.tar / models verify bundle.tar / models install bundle.tar --enable-offline)")
         logging.info("\n示例:")
         logging.info("  python manage.py setup    # 完整安装")
         logging.info("  python manage.py start    # 启动服务")
+        logging.info("  python manage.py start --tune  # 先调优再启动服务")
         logging.info("  python manage.py status   # 查看状态")
         return
     
@@ -504,6 +1491,8 @@ def main():
             logging.error("依赖检查失败")
             return
         manager.create_directories()
+        if '--tune' in sys.argv[2:] and not manager.tune([]):
+            logging.warning("调优失败，使用现有配置启动")
         manager.start_service()
     elif command == "stop":
         manager.stop_service()
@@ -519,6 +1508,21 @@ def main():
         manager.show_status()
     elif command == "test":
         manager.test_service()
+    elif command == "ocr-dir":
+        if not manager.ocr_dir(sys.argv[2:]):
+            sys.exit(1)
+    elif command == "tune":
+        if not manager.tune(sys.argv[2:]):
+            sys.exit(1)
+    elif command == "quant-compare":
+        if not manager.quant_compare(sys.argv[2:]):
+            sys.exit(1)
+    elif command == "bench":
+        if not manager.bench(sys.argv[2:]):
+            sys.exit(1)
+    elif command == "models":
+        if not manager.models(sys.argv[2:]):
+            sys.exit(1)
     elif command == "install":
         if not manager.check_dependencies():
             logging.error("依赖检查失败")
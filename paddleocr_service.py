@@ -19,18 +19,44 @@ import logging
 import tempfile
 import uuid
 import base64
+import gzip
+import io
+import hmac
+import hashlib
+import math
+import functools
+import shutil
+import struct
 import yaml
+import copy
+import queue
+import random
+import socket
+import socketserver
+from multiprocessing import resource_tracker, shared_memory
+import atexit
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
+import threading
+from threading import Condition, Lock, RLock
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import cv2
 import numpy as np
 from PIL import Image
 import requests
+import psutil
 import paddle
-from paddleocr import PaddleOCR
+from werkzeug.wsgi import LimitedStream
+
+try:
+    import zstandard
+except ImportError:
+    # zstd 压缩为可选功能，未安装时仅支持 gzip
+    zstandard = None
 
 # 设置模型目录环境变量
 current_dir = Path(__file__).parent
@@ -49,8 +75,37 @@ logger.info(f"设置模型目录: {model_dir}")
 # 配置日志，日志文件强制写入 logs 目录
 LOG_DIR = current_dir / 'logs'
 LOG_DIR.mkdir(exist_ok=True)
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 LOG_FILE = LOG_DIR / 'paddleocr_service.log'
+ACCESS_LOG_FILE = LOG_DIR / 'access.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    仅把日志记录放入队列，格式化与文件写入都在后台监听线程完成
+
+    参数全为不可变的简单类型时保留延迟格式化，否则在入队前生成消息，避免对象之后被修改。
+    """
+
+    IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        args = record.args
+        if args and not isinstance(args, dict) and not all(isinstance(a, self.IMMUTABLE_TYPES) for a in args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+def _start_queue_logging(target_logger, handlers):
+    """为日志器挂上队列处理器，由后台线程写入各 handler"""
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    target_logger.addHandler(DeferredQueueHandler(log_queue))
+    return listener
+
 for handler in logging.root.handlers[:]:
     logging.root.removeHandler(handler)
 # 按天分割日志文件，保留30天
@@ -58,14 +113,71 @@ file_handler = TimedRotatingFileHandler(
     str(LOG_FILE), when='midnight', interval=1, backupCount=30, encoding='utf-8'
 )
 file_handler.suffix = "%Y-%m-%d.log"
-file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logging.basicConfig(
-    level=logging.INFO,
-    handlers=[file_handler, console_handler]
-)
+console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+# 请求线程只把日志记录放入队列，不在文件与控制台 I/O 上阻塞
+logging.root.setLevel(logging.INFO)
+_start_queue_logging(logging.root, [file_handler, console_handler])
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger(f"{__name__}.access")
+access_logger.propagate = False
+
+class JSONLineFormatter(logging.Formatter):
+    """结构化日志：消息为字典时输出一行 JSON"""
+
+    def format(self, record):
+        if isinstance(record.msg, dict):
+            return json.dumps(record.msg, ensure_ascii=False, default=str)
+        return super().format(record)
+
+_access_listener = None
+
+def configure_logging(logging_config):
+    """
+    按配置调整日志：日志级别与访问日志
+
+    访问日志为 JSON 行，按 sample_rate 采样，出错与慢请求始终记录。
+    """
+    global _access_listener
+    level = logging_config.get('level', 'INFO')
+    logging.root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    access_config = logging_config.get('access_log') or {}
+    if not access_config.get('enabled') or _access_listener is not None:
+        return
+    access_handler = TimedRotatingFileHandler(
+        str(ACCESS_LOG_FILE), when='midnight', interval=1, backupCount=30, encoding='utf-8'
+    )
+    access_handler.suffix = "%Y-%m-%d.log"
+    access_handler.setFormatter(JSONLineFormatter())
+    access_logger.setLevel(logging.INFO)
+    _access_listener = _start_queue_logging(access_logger, [access_handler])
+    # 访问日志已覆盖每个请求，werkzeug 的逐请求日志只保留警告以上
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+# 当前请求各阶段耗时（毫秒），仅在请求线程内有效
+_request_context = threading.local()
+
+def begin_stage_timings():
+    _request_context.stages = {}
+
+def end_stage_timings():
+    stages = getattr(_request_context, 'stages', None) or {}
+    _request_context.stages = None
+    return stages
+
+@contextmanager
+def stage_timer(name):
+    """记录当前请求某一阶段的耗时，不在请求上下文中时不做任何事"""
+    stages = getattr(_request_context, 'stages', None)
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
 
 class OCRServiceConfig:
     """服务配置类"""
@@ -81,23 +193,144 @@ class OCRServiceConfig:
                 'host': '0.0.0.0',
                 'port': 8000,
                 'debug': False,
-                'max_content_length': 50 * 1024 * 1024  # 50MB
+                'max_content_length': 50 * 1024 * 1024,  # 50MB
+                'admin_token': '',
+                'workers': 1,
+                'binary': {
+                    'enabled': False,
+                    'port': 8500,
+                    'max_in_flight': 8,
+                    'unix_socket': '',
+                    'unix_socket_mode': 0o660
+                },
+                'compression': {
+                    'enabled': True,
+                    'min_size': 1024,
+                    'gzip_level': 6,
+                    'zstd_level': 3
+                }
             },
             'ocr': {
                 'default_lang': 'ch',
                 'use_textline_orientation': True,
+                'use_doc_orientation_classify': True,
+                'use_doc_unwarping': True,
                 'use_gpu': False,
+                'cpu_threads': 8,
+                'enable_mkldnn': True,
                 'max_image_size': 4096,
-                'supported_formats': ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp']
+                'max_image_pixels': 100000000,
+                'reduced_decode': True,
+                'upload_encodings': ['image/jpeg', 'image/png', 'image/webp'],
+                'upload_jpeg_quality': 90,
+                'supported_formats': ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'],
+                'offline': False,
+                'det_model': 'PP-OCRv5_server_det',
+                'textline_orientation_model': 'PP-LCNet_x1_0_textline_ori',
+                'doc_orientation_model': 'PP-LCNet_x1_0_doc_ori',
+                'doc_unwarping_model': 'UVDoc',
+                'rec_models': {
+                    'ch': 'PP-OCRv5_server_rec',
+                    'chinese_cht': 'PP-OCRv5_server_rec',
+                    'japan': 'PP-OCRv5_server_rec',
+                    'en': 'en_PP-OCRv5_mobile_rec',
+                    'korean': 'korean_PP-OCRv5_mobile_rec',
+                    'latin': 'latin_PP-OCRv5_mobile_rec',
+                    'french': 'latin_PP-OCRv5_mobile_rec',
+                    'german': 'latin_PP-OCRv5_mobile_rec',
+                    'ru': 'eslav_PP-OCRv5_mobile_rec'
+                },
+                'max_langs_per_request': 3,
+                'auto_lang': {
+                    'enabled': True,
+                    'probe_langs': ['ch'],
+                    'sample_lines': 8,
+                    'min_confidence': 0.5,
+                    'scripts': {
+                        'han': 'ch',
+                        'kana': 'japan',
+                        'hangul': 'korean',
+                        'cyrillic': 'ru',
+                        'latin': 'en',
+                        'latin_ext': 'latin'
+                    }
+                },
+                'model_versions': {},
+                'active_versions': {},
+                'precision': {},
+                'quantized_models': {
+                    'det': None,
+                    'rec': {}
+                },
+                'video': {
+                    'formats': ['.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv'],
+                    'sample_fps': 2,
+                    'max_frames': 1800,
+                    'diff_size': 640,
+                    'diff_threshold': 24,
+                    'min_region_area': 100,
+                    'region_padding': 8,
+                    'scene_cut_distance': 16,
+                    'full_frame_ratio': 0.5
+                },
+                'pipeline_defaults': {
+                    'det_limit_side_len': 64,
+                    'det_limit_type': 'min',
+                    'det_box_thresh': 0.6,
+                    'rec_batch_size': 6
+                }
             },
             'performance': {
                 'preload_models': ['ch', 'en'],
                 'max_batch_size': 10,
                 'request_timeout': 60,
-                'cleanup_temp_files': True
+                'cleanup_temp_files': True,
+                'rec_batching': {
+                    'enabled': True,
+                    'max_batch': 32,
+                    'max_wait_ms': 3,
+                    'bucket_ratio': 2.0
+                },
+                'recycle': {
+                    'enabled': False,
+                    'max_rss_mb': 4096,
+                    'max_requests': 0,
+                    'drain_timeout': 60
+                },
+                'telemetry': {
+                    'enabled': True,
+                    'interval': 5
+                },
+                'model_swap': {
+                    'warmup_runs': 2,
+                    'drain_timeout': 60
+                },
+                'url_cache': {
+                    'enabled': True,
+                    'max_entries': 1024,
+                    'max_ttl': 86400
+                }
+            },
+            'tenants': {
+                'enabled': False,
+                'header': 'X-API-Key',
+                'allow_anonymous': True,
+                'inference_slots': 2,
+                'default': {
+                    'weight': 1,
+                    'rate': 0,
+                    'burst': 0,
+                    'max_concurrency': 0
+                },
+                'keys': {}
             },
             'logging': {
                 'level': 'INFO',
+                'access_log': {
+                    'enabled': True,
+                    'sample_rate': 0.1,
+                    'slow_ms': 2000
+                },
                 'max_log_size': 10 * 1024 * 1024,  # 10MB
                 'backup_count': 5
             }
@@ -109,7 +342,9 @@ class OCRServiceConfig:
                 self._deep_update(default_config, user_config)
         
         self.config = default_config
-        logger.info(f"配置加载完成: {self.config}")
+        logger.info("配置加载完成: %s", self.config_file)
+        # 完整配置只在 DEBUG 级别输出，%s 延迟格式化，未启用时不生成字符串
+        logger.debug("配置内容: %s", self.config)
     
     def _deep_update(self, base_dict, update_dict):
         """深度更新字典"""
@@ -119,61 +354,1052 @@ class OCRServiceConfig:
             else:
                 base_dict[key] = value
 
+# 可按请求覆盖的流水线参数：名称 -> (类型, 最小值, 最大值)
+PIPELINE_OPTION_SPECS = {
+    'use_textline_orientation': (bool, None, None),
+    'use_doc_orientation_classify': (bool, None, None),
+    'use_doc_unwarping': (bool, None, None),
+    'det_limit_side_len': (int, 16, 8192),
+    'det_box_thresh': (float, 0.0, 1.0),
+    'rec_batch_size': (int, 1, 256),
+}
+
+# 取值为枚举的流水线参数：名称 -> 可选值（第一个为默认值）
+PIPELINE_OPTION_CHOICES = {
+    'lang_mode': ('best', 'all'),
+}
+
+def parse_langs(value, ocr_config):
+    """
+    解析请求语言，支持单个语言、逗号分隔字符串或列表
+
+    Returns:
+        去重后的语言列表
+    """
+    if not value:
+        value = ocr_config['default_lang']
+    if isinstance(value, str):
+        value = value.split(',')
+    langs = []
+    for lang in value:
+        lang = str(lang).strip()
+        if lang and lang not in langs:
+            langs.append(lang)
+    if not langs:
+        langs = [ocr_config['default_lang']]
+    if 'auto' in langs:
+        if len(langs) > 1:
+            raise ValueError(f"auto 不能与其他语言同时指定: {langs}")
+        if not (ocr_config.get('auto_lang') or {}).get('enabled', True):
+            raise ValueError("未启用自动语言识别 (ocr.auto_lang)")
+        return langs
+    max_langs = ocr_config.get('max_langs_per_request', 3)
+    if len(langs) > max_langs:
+        raise ValueError(f"单次请求最多识别 {max_langs} 种语言: {langs}")
+    for lang in langs:
+        if lang not in ocr_config['rec_models']:
+            raise ValueError(f"不支持的语言: {lang}")
+    return langs
+
+# 文字体系的 Unicode 区段：(起, 止, 体系)
+SCRIPT_RANGES = (
+    (0x0041, 0x005A, 'latin'),
+    (0x0061, 0x007A, 'latin'),
+    (0x00C0, 0x024F, 'latin_ext'),
+    (0x0400, 0x04FF, 'cyrillic'),
+    (0x1100, 0x11FF, 'hangul'),
+    (0x3040, 0x30FF, 'kana'),
+    (0x3130, 0x318F, 'hangul'),
+    (0x31F0, 0x31FF, 'kana'),
+    (0x3400, 0x4DBF, 'han'),
+    (0x4E00, 0x9FFF, 'han'),
+    (0xAC00, 0xD7A3, 'hangul'),
+    (0xF900, 0xFAFF, 'han'),
+)
+
+def supported_languages(ocr_config):
+    """配置了识别模型的语言，启用自动识别时含 auto"""
+    langs = sorted(ocr_config['rec_models'])
+    if (ocr_config.get('auto_lang') or {}).get('enabled', True):
+        langs.append('auto')
+    return langs
+
+def char_script(char):
+    code = ord(char)
+    for start, end, script in SCRIPT_RANGES:
+        if start <= code <= end:
+            return script
+    return None
+
+def detect_script(lines, min_confidence=0.5):
+    """
+    按置信度加权统计文本行中各文字体系的字符数，判定主要文字体系
+
+    Args:
+        lines: [(文本, 置信度)]，低于 min_confidence 的行不参与统计
+
+    Returns:
+        (体系, {体系: 权重})，没有可判定的字符时体系为 None
+    """
+    scores = {}
+    for text, score in lines:
+        if score < min_confidence:
+            continue
+        for char in text:
+            script = char_script(char) if char.isalpha() else None
+            if script:
+                scores[script] = scores.get(script, 0.0) + score
+    if not scores:
+        return None, scores
+    groups = {
+        'cjk': scores.get('han', 0.0) + scores.get('kana', 0.0),
+        'latin': scores.get('latin', 0.0) + scores.get('latin_ext', 0.0),
+        'hangul': scores.get('hangul', 0.0),
+        'cyrillic': scores.get('cyrillic', 0.0),
+    }
+    group = max(groups, key=groups.get)
+    if group == 'cjk':
+        # 日文混用汉字与假名，假名占一成以上即按日文处理
+        script = 'kana' if scores.get('kana', 0.0) >= 0.1 * groups['cjk'] else 'han'
+    elif group == 'latin':
+        # 出现带重音等扩展拉丁字母时使用多语种拉丁识别模型
+        script = 'latin_ext' if scores.get('latin_ext', 0.0) > 0 else 'latin'
+    else:
+        script = group
+    return script, {k: round(v, 3) for k, v in scores.items()}
+
+def parse_pipeline_options(params, ocr_config, rec_batching=False):
+    """
+    从请求参数中解析流水线选项，未提供的选项取配置默认值
+
+    Args:
+        params: 表单或 JSON 参数（支持 get 方法的映射）
+        ocr_config: 配置中的 ocr 段
+        rec_batching: 是否启用跨请求识别批处理，启用时批大小由 performance.rec_batching.max_batch 决定，
+            请求不能再指定 rec_batch_size
+
+    Returns:
+        完整的选项字典
+    """
+    options = dict(ocr_config.get('pipeline_defaults', {}))
+    for name in ('use_textline_orientation', 'use_doc_orientation_classify', 'use_doc_unwarping'):
+        options.setdefault(name, ocr_config[name])
+    for name, (value_type, min_value, max_value) in PIPELINE_OPTION_SPECS.items():
+        raw = params.get(name) if params else None
+        if raw is None or raw == '':
+            continue
+        if value_type is bool:
+            if isinstance(raw, bool):
+                value = raw
+            elif str(raw).lower() in ('true', '1', 'yes', 'on'):
+                value = True
+            elif str(raw).lower() in ('false', '0', 'no', 'off'):
+                value = False
+            else:
+                raise ValueError(f"参数 {name} 应为布尔值: {raw}")
+        else:
+            try:
+                value = value_type(raw)
+            except (TypeError, ValueError):
+                raise ValueError(f"参数 {name} 类型错误: {raw}")
+            if not min_value <= value <= max_value:
+                raise ValueError(f"参数 {name} 超出范围 [{min_value}, {max_value}]: {value}")
+        if name == 'rec_batch_size' and rec_batching:
+            raise ValueError("已启用跨请求识别批处理 (performance.rec_batching)，"
+                             "识别批大小由 max_batch 决定，不能按请求指定 rec_batch_size")
+        options[name] = value
+    for name, choices in PIPELINE_OPTION_CHOICES.items():
+        raw = params.get(name) if params else None
+        if raw is None or raw == '':
+            options.setdefault(name, choices[0])
+        elif raw in choices:
+            options[name] = raw
+        else:
+            raise ValueError(f"参数 {name} 应为 {list(choices)} 之一: {raw}")
+    return options
+
+def _order_quad_points(points):
+    """将最小外接矩形的四个顶点排列为 左上、右上、右下、左下"""
+    points = sorted(points.tolist(), key=lambda p: p[0])
+    left, right = points[:2], points[2:]
+    top_left, bottom_left = sorted(left, key=lambda p: p[1])
+    top_right, bottom_right = sorted(right, key=lambda p: p[1])
+    return np.array([top_left, top_right, bottom_right, bottom_left], dtype=np.float32)
+
+# 文档方向分类标签 -> 转正所需的旋转，与 PaddleX doc_preprocessor 一致按标签角度逆时针旋转
+_DOC_ORIENTATION_ROTATIONS = {
+    '90': cv2.ROTATE_90_COUNTERCLOCKWISE,
+    '180': cv2.ROTATE_180,
+    '270': cv2.ROTATE_90_CLOCKWISE,
+}
+
+def _to_uint8(image):
+    """矫正模型可能输出浮点图像，转换为后续步骤使用的 uint8"""
+    image = np.asarray(image)
+    return image if image.dtype == np.uint8 else np.clip(image, 0, 255).astype(np.uint8)
+
+def rotate_by_label(image, label):
+    """按文档方向分类标签把整页图像转正"""
+    rotation = _DOC_ORIENTATION_ROTATIONS.get(str(label))
+    return image if rotation is None else cv2.rotate(image, rotation)
+
+def crop_text_line(image, poly):
+    """按检测框的最小外接矩形透视裁剪文本行，竖排文本旋转为横排"""
+    rect = cv2.minAreaRect(np.asarray(poly, dtype=np.float32))
+    points = _order_quad_points(cv2.boxPoints(rect))
+    crop_w = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    crop_h = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    crop_w, crop_h = max(crop_w, 1), max(crop_h, 1)
+    target = np.float32([[0, 0], [crop_w, 0], [crop_w, crop_h], [0, crop_h]])
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(image, matrix, (crop_w, crop_h),
+                               borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if crop_h / crop_w >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+def sort_text_boxes(polys):
+    """按阅读顺序（自上而下、同一行自左而右）排列检测框"""
+    polys = sorted(polys, key=lambda p: (p[0][1], p[0][0]))
+    for i in range(len(polys) - 1):
+        for j in range(i, -1, -1):
+            if abs(polys[j + 1][0][1] - polys[j][0][1]) < 10 and polys[j + 1][0][0] < polys[j][0][0]:
+                polys[j], polys[j + 1] = polys[j + 1], polys[j]
+            else:
+                break
+    return polys
+
+class SubModel:
+    """
+    常驻内存的子模型（检测、方向分类或识别）
+
+    同一子模型可被多个语言流水线共享，通过引用计数决定何时释放。
+    """
+
+    def __init__(self, key, kind, model_name, device, model):
+        self.key = key
+        self.kind = kind
+        self.model_name = model_name
+        self.device = device
+        self.model = model
+        self.refs = 0
+        self.loaded_at = time.time()
+        self.precision = 'fp32'
+        # 加载前后进程 RSS 之差，作为该子模型常驻内存的估计值
+        self.memory_estimate = None
+        # 累计推理耗时，用于统计推理线程利用率
+        self.busy_time = 0.0
+        # 识别子模型开启跨请求批处理时的批处理器
+        self.batcher = None
+        # 推理预测器非线程安全，共享同一子模型的流水线共用一把锁
+        self.lock = Lock()
+
+    def predict(self, inputs, **kwargs):
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                return self.model.predict(inputs, **kwargs)
+            finally:
+                self.busy_time += time.perf_counter() - start
+
+    def info(self):
+        return {
+            'key': self.key,
+            'kind': self.kind,
+            'model_name': self.model_name,
+            'device': self.device,
+            'precision': self.precision,
+            'refs': self.refs,
+            'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat(),
+            'memory_estimate_mb': (round(self.memory_estimate / 1024 / 1024, 1)
+                                   if self.memory_estimate is not None else None),
+            'batching': self.batcher.info() if self.batcher else None
+        }
+
+class RecognitionBatcher:
+    """
+    跨请求的识别批处理器
+
+    并发请求对同一识别模型提交的文本行在短时间窗口内汇集，按宽高比排序分桶后
+    以大批量识别，减少补齐填充，再将结果分发回各自的请求。
+    """
+
+    def __init__(self, submodel, batching_config):
+        self.submodel = submodel
+        self.max_batch = batching_config.get('max_batch', 32)
+        self.max_wait = batching_config.get('max_wait_ms', 3) / 1000.0
+        self.bucket_ratio = batching_config.get('bucket_ratio', 2.0)
+        self._pending = []
+        self._cond = Condition()
+        self._running = True
+        self.stats = {
+            'batches': 0,
+            'crops': 0,
+            'requests': 0,
+            'padded_width': 0.0,
+            'actual_width': 0.0,
+        }
+        self._thread = threading.Thread(
+            target=self._dispatch_loop, name=f"rec-batcher-{submodel.model_name}", daemon=True)
+        self._thread.start()
+
+    def recognize(self, crops):
+        """提交文本行并等待识别结果，返回 (文本, 置信度) 列表"""
+        job = {
+            'crops': crops,
+            # 批次推理耗时按文本行数分摊给提交请求所属的租户
+            'tenant': get_request_tenant(),
+            'results': [None] * len(crops),
+            'remaining': len(crops),
+            'error': None,
+            'done': threading.Event(),
+        }
+        with self._cond:
+            if not self._running:
+                raise RuntimeError(f"识别批处理器已停止: {self.submodel.key}")
+            self._pending.append(job)
+            self._cond.notify()
+        job['done'].wait()
+        if job['error'] is not None:
+            raise job['error']
+        return job['results']
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _collect(self):
+        """等待首个任务，随后在等待窗口内继续汇集，直到凑满一批"""
+        with self._cond:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            deadline = time.time() + self.max_wait
+            while sum(len(job['crops']) for job in self._pending) < self.max_batch:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            jobs, self._pending = self._pending, []
+            return jobs
+
+    def _buckets(self, items):
+        """按宽高比排序并分桶：同桶内宽高比相差不超过 bucket_ratio 且不超过 max_batch"""
+        items.sort(key=lambda item: item[2])
+        bucket = []
+        for item in items:
+            if bucket and (len(bucket) >= self.max_batch or item[2] > bucket[0][2] * self.bucket_ratio):
+                yield bucket
+                bucket = []
+            bucket.append(item)
+        if bucket:
+            yield bucket
+
+    def _dispatch_loop(self):
+        while self._running or self._pending:
+            jobs = self._collect()
+            if not jobs:
+                continue
+            items = []
+            for job in jobs:
+                for index, crop in enumerate(job['crops']):
+                    h, w = crop.shape[:2]
+                    items.append((job, index, w / max(h, 1)))
+            for bucket in self._buckets(items):
+                crops = [job['crops'][index] for job, index, _ in bucket]
+                started = time.perf_counter()
+                try:
+                    rec_results = self.submodel.predict(crops, batch_size=len(crops))
+                    for (job, index, _), res in zip(bucket, rec_results):
+                        job['results'][index] = (res['rec_text'], float(res['rec_score']))
+                except Exception as e:
+                    for job, _, _ in bucket:
+                        job['error'] = e
+                share = (time.perf_counter() - started) / len(bucket)
+                for job, _, _ in bucket:
+                    if job['tenant'] is not None:
+                        job['tenant'].charge('rec_batch_seconds', share)
+                self.stats['batches'] += 1
+                self.stats['padded_width'] += bucket[-1][2] * len(bucket)
+                self.stats['actual_width'] += sum(ratio for _, _, ratio in bucket)
+                for job, _, _ in bucket:
+                    job['remaining'] -= 1
+                    if job['remaining'] == 0:
+                        job['done'].set()
+            self.stats['crops'] += len(items)
+            self.stats['requests'] += len(jobs)
+
+    def info(self):
+        stats = self.stats
+        return {
+            'batches': stats['batches'],
+            'crops': stats['crops'],
+            'requests': stats['requests'],
+            'avg_batch_size': stats['crops'] / max(stats['batches'], 1),
+            'padding_ratio': stats['padded_width'] / max(stats['actual_width'], 1e-6),
+        }
+
+class OCRPipeline:
+    """
+    由文档预处理、检测、方向分类、识别子模型组合而成的 OCR 流水线
+
+    子模型常驻内存，流水线参数按请求传入，不同参数的请求共用同一份权重。
+    文档方向分类、文档矫正与文本行方向分类为可选步骤，对应子模型在首次需要时加载。
+    """
+
+    def __init__(self, det, rec, loaders, lang, version='default', use_gpu=False):
+        self.det = det
+        self.rec = rec
+        self.lang = lang
+        self.version = version
+        self.use_gpu = use_gpu
+        self.precision = 'fp32'
+        # 可选子模型的加载函数：cls 文本行方向分类、doc_ori 文档方向分类、unwarp 文档矫正
+        self._loaders = loaders
+        self._optional = {}
+        self._optional_lock = Lock()
+        # 在途请求计数，模型热切换后旧流水线据此排空
+        self.in_flight = 0
+        self._idle = Condition()
+
+    def optional_submodel(self, kind):
+        """可选子模型在首个需要它的请求到来时加载"""
+        submodel = self._optional.get(kind)
+        if submodel is None:
+            with self._optional_lock:
+                submodel = self._optional.get(kind)
+                if submodel is None:
+                    submodel = self._optional[kind] = self._loaders[kind]()
+        return submodel
+
+    @property
+    def cls(self):
+        return self.optional_submodel('cls')
+
+    @property
+    def doc_ori(self):
+        return self.optional_submodel('doc_ori')
+
+    @property
+    def unwarp(self):
+        return self.optional_submodel('unwarp')
+
+    def submodels(self):
+        """当前流水线持有的子模型"""
+        with self._optional_lock:
+            return [self.det, self.rec] + list(self._optional.values())
+
+    def acquire(self):
+        with self._idle:
+            self.in_flight += 1
+
+    def release(self):
+        with self._idle:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout):
+        """等待在途请求全部完成，返回是否在超时前排空"""
+        deadline = time.time() + timeout
+        with self._idle:
+            while self.in_flight > 0:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def warmup(self, runs=1):
+        """用空白文本行预热识别模型，使首个真实请求不承担初始化开销"""
+        crop = np.full((48, 320, 3), 255, dtype=np.uint8)
+        for _ in range(runs):
+            self.rec.predict([crop], batch_size=1)
+
+    def preprocess(self, images, options):
+        """
+        文档预处理：按文档方向分类结果把整页转正，再做弯曲矫正
+
+        与 PaddleOCR 3.x 的 doc_preprocessor 一致，之后的检测框坐标相对于预处理后的图像。
+        """
+        if options.get('use_doc_orientation_classify'):
+            ori_results = self.doc_ori.predict(images, batch_size=len(images))
+            images = [rotate_by_label(image, res['label_names'][0]) for image, res in zip(images, ori_results)]
+        if options.get('use_doc_unwarping'):
+            unwarp_results = self.unwarp.predict(images, batch_size=len(images))
+            images = [_to_uint8(res['doctr_img']) for res in unwarp_results]
+        return images
+
+    def detect(self, images, options):
+        """文本检测，返回每张图像按阅读顺序排列的检测框"""
+        det_results = self.det.predict(
+            images,
+            batch_size=len(images),
+            limit_side_len=options.get('det_limit_side_len'),
+            limit_type=options.get('det_limit_type'),
+            box_thresh=options.get('det_box_thresh'),
+        )
+        return [sort_text_boxes([np.asarray(p) for p in res['dt_polys']]) for res in det_results]
+
+    def classify_orientation(self, crops, options):
+        """文本行方向分类，将倒置的文本行旋转 180 度"""
+        cls_results = self.cls.predict(crops, batch_size=options.get('rec_batch_size', 6))
+        for i, res in enumerate(cls_results):
+            if res['class_ids'][0] == 1:
+                crops[i] = cv2.rotate(crops[i], cv2.ROTATE_180)
+        return crops
+
+    def recognize(self, crops, options):
+        """文本识别，返回 (文本, 置信度) 列表"""
+        if self.rec.batcher is not None:
+            return self.rec.batcher.recognize(crops)
+        rec_results = self.rec.predict(crops, batch_size=options.get('rec_batch_size', 6))
+        return [(res['rec_text'], float(res['rec_score'])) for res in rec_results]
+
+    def extract_crops(self, images, options):
+        """
+        按需做文档预处理，检测并裁剪文本行，按需做文本行方向校正
+
+        Returns:
+            (crops, owners)，owners[i] 为第 i 个文本行所属的 (图像序号, 检测框)
+        """
+        images = self.preprocess(images, options)
+        all_polys = self.detect(images, options)
+        crops, owners = [], []
+        for index, (image, polys) in enumerate(zip(images, all_polys)):
+            for poly in polys:
+                crops.append(crop_text_line(image, poly))
+                owners.append((index, poly))
+        if crops and options.get('use_textline_orientation'):
+            crops = self.classify_orientation(crops, options)
+        return crops, owners
+
+    def predict(self, images, options=None):
+        """
+        识别单张或多张图像
+
+        Returns:
+            每张图像一个结果字典，包含 rec_texts、rec_scores、rec_polys
+        """
+        if isinstance(images, np.ndarray):
+            images = [images]
+        options = options or {}
+        with stage_timer('det'):
+            crops, owners = self.extract_crops(images, options)
+        with stage_timer('rec'):
+            recognized = self.recognize(crops, options) if crops else []
+
+        results = [{'rec_texts': [], 'rec_scores': [], 'rec_polys': []} for _ in images]
+        for (index, poly), (text, score) in zip(owners, recognized):
+            if not text:
+                continue
+            results[index]['rec_texts'].append(text)
+            results[index]['rec_scores'].append(score)
+            results[index]['rec_polys'].append(poly.astype(np.int32))
+        return results
+
 class OCRModelManager:
-    """OCR 模型管理器"""
+    """
+    OCR 模型管理器
+
+    检测与方向分类模型在所有语言间共享，每种语言只额外加载自己的识别模型。
+    """
+    
+    # 子模型类型与对应的 PaddleOCR 模块；paddleocr 在首次加载子模型时才导入，
+    # 离线模式据此在 PaddleX 导入时的模型源联网探测之前关闭探测
+    SUBMODEL_CLASSES = {
+        'det': 'TextDetection',
+        'cls': 'TextLineOrientationClassification',
+        'rec': 'TextRecognition',
+        'doc_ori': 'DocImgOrientationClassification',
+        'unwarp': 'TextImageUnwarping',
+    }
     
     def __init__(self, config):
         self.config = config
         self.models = {}
-        self.model_lock = Lock()
+        self.submodels = {}
+        self.model_lock = RLock()
+        # 已释放子模型的累计推理耗时，保证利用率统计单调
+        self.released_busy_time = 0.0
+        self._process = psutil.Process()
+        # 子模型加载在全局锁外进行，同一子模型的并发加载由各自的加载锁串行化
+        self._loading_locks = {}
+        # 识别模型版本注册表：语言 -> 版本名 -> {model_name, model_dir}
+        ocr_config = config['ocr']
+        self.model_versions = {lang: dict(versions)
+                               for lang, versions in (ocr_config.get('model_versions') or {}).items()}
+        self.active_versions = dict(ocr_config.get('active_versions') or {})
+        if ocr_config.get('offline'):
+            # 离线模式：模型只从本地目录加载，并关闭 PaddleX 导入时对模型托管源的联网探测
+            os.environ['PADDLE_PDX_DISABLE_MODEL_SOURCE_CHECK'] = 'True'
+        # 各语言最近一次版本切换的进度
+        self.swap_jobs = {}
+        # lang=auto 的判定结果与探测开销
+        self.auto_lang_stats = {
+            'requests': 0,
+            'decisions': {},
+            'fallbacks': 0,
+            'total_lines': 0,
+            'sampled_lines': 0,
+            'rerecognized_lines': 0,
+            'probe_seconds': 0.0,
+        }
         self.stats = {
             'models_loaded': 0,
+            'submodels_loaded': 0,
             'total_requests': 0,
             'successful_requests': 0,
             'failed_requests': 0,
             'start_time': time.time()
         }
+    
+    def _acquire_submodel(self, kind, model_name, device, model_dir=None, precision='fp32'):
+        """获取共享子模型并增加引用计数，未加载时加载"""
+        key = f"{kind}:{model_name}@{device}"
+        if model_dir:
+            key = f"{kind}:{model_name}({model_dir})@{device}"
+        if precision != 'fp32':
+            key = f"{key}/{precision}"
+        with self.model_lock:
+            submodel = self.submodels.get(key)
+            if submodel is not None:
+                submodel.refs += 1
+                return submodel
+            load_lock = self._loading_locks.setdefault(key, Lock())
+        with load_lock:
+            with self.model_lock:
+                submodel = self.submodels.get(key)
+                if submodel is not None:
+                    submodel.refs += 1
+                    return submodel
+            logger.info(f"加载子模型: {key}")
+            rss_before = self._process.memory_info().rss
+            # 未指定目录时模型由 PaddleX 自动下载到指定目录
+            kwargs = {'model_dir': model_dir} if model_dir else {}
+            if device == 'cpu':
+                # CPU 推理线程数与 MKLDNN 可由 manage.py tune 测得最优值
+                kwargs['cpu_threads'] = self.config['ocr'].get('cpu_threads', 8)
+                # int8 量化模型在 CPU 上依赖 MKLDNN 执行
+                kwargs['enable_mkldnn'] = self.config['ocr'].get('enable_mkldnn', True) or precision == 'int8'
+            import paddleocr
+            model_class = getattr(paddleocr, self.SUBMODEL_CLASSES[kind])
+            model = model_class(model_name=model_name, device=device, **kwargs)
+            submodel = SubModel(key, kind, model_name, device, model)
+            submodel.precision = precision
+            submodel.memory_estimate = max(self._process.memory_info().rss - rss_before, 0)
+            batching_config = self.config['performance'].get('rec_batching', {})
+            if kind == 'rec' and batching_config.get('enabled'):
+                submodel.batcher = RecognitionBatcher(submodel, batching_config)
+            with self.model_lock:
+                self.submodels[key] = submodel
+                self._loading_locks.pop(key, None)
+                self.stats['submodels_loaded'] += 1
+                submodel.refs += 1
+            return submodel
+    
+    def _release_submodel(self, submodel):
+        """减少子模型引用计数，归零时释放"""
+        with self.model_lock:
+            submodel.refs -= 1
+            if submodel.refs <= 0 and self.submodels.get(submodel.key) is submodel:
+                del self.submodels[submodel.key]
+                self.released_busy_time += submodel.busy_time
+                if submodel.batcher is not None:
+                    submodel.batcher.stop()
+                logger.info(f"释放子模型: {submodel.key}")
         
+    def _version_spec(self, lang, version=None):
+        """解析语言的识别模型版本，返回 (版本名, {model_name, model_dir})"""
+        version = version or self.active_versions.get(lang, 'default')
+        spec = self.model_versions.get(lang, {}).get(version)
+        if spec is None and version == 'default':
+            # 未登记版本的语言使用 ocr.rec_models 中的模型
+            model_name = self.config['ocr']['rec_models'].get(lang)
+            if not model_name:
+                raise ValueError(f"未配置语言 {lang} 的识别模型 (ocr.rec_models)")
+            spec = {'model_name': model_name}
+        if spec is None:
+            raise ValueError(f"语言 {lang} 没有版本 {version}")
+        return version, spec
+    
+    def register_model_version(self, lang, version, model_name, model_dir=None):
+        """登记语言的识别模型版本，不立即加载"""
+        with self.model_lock:
+            spec = {'model_name': model_name}
+            if model_dir:
+                spec['model_dir'] = model_dir
+            self.model_versions.setdefault(lang, {})[version] = spec
+    
+    def _precision(self, lang):
+        """语言的推理精度，int8 时使用 ocr.quantized_models 中的量化模型"""
+        precision = (self.config['ocr'].get('precision') or {}).get(lang, 'fp32')
+        if precision not in ('fp32', 'int8'):
+            raise ValueError(f"不支持的推理精度 {lang}: {precision}")
+        return precision
+    
+    def _model_path(self, model_dir):
+        if model_dir and not os.path.isabs(model_dir):
+            model_dir = os.path.join(os.path.dirname(__file__), model_dir)
+        return model_dir
+    
+    def _resolve_model_dir(self, model_name, model_dir=None):
+        """
+        解析子模型目录
+
+        离线模式下未指定目录的模型从 <ocr.model_dir>/<模型名> 加载（manage.py models install 的安装位置），
+        目录缺失时直接报错而不是交给 PaddleX 联网下载；非离线模式未指定目录时返回 None 由 PaddleX 下载
+        """
+        model_dir = self._model_path(model_dir)
+        if not self.config['ocr'].get('offline'):
+            return model_dir
+        if not model_dir:
+            model_dir = os.path.join(self._model_path(self.config['ocr'].get('model_dir', './models')), model_name)
+        if not os.path.isfile(os.path.join(model_dir, 'inference.yml')):
+            raise FileNotFoundError(f"离线模式下模型 {model_name} 不存在: {model_dir}，"
+                                    f"请先执行 python manage.py models install <模型包>")
+        return model_dir
+    
+    def _build_pipeline(self, lang, use_gpu, version=None):
+        """按版本与精度构建语言流水线并获取其子模型"""
+        # 设置设备
+        if use_gpu and paddle.device.is_compiled_with_cuda():
+            paddle.device.set_device('gpu')
+            device = 'gpu'
+            logger.info("使用 GPU 加速")
+        else:
+            paddle.device.set_device('cpu')
+            device = 'cpu'
+            logger.info("使用 CPU 推理")
+        
+        # 创建模型
+        model_dir = self.config['ocr'].get('model_dir', './models')
+        # 转换为绝对路径
+        if not os.path.isabs(model_dir):
+            model_dir = os.path.join(os.path.dirname(__file__), model_dir)
+        # 确保模型目录存在
+        os.makedirs(model_dir, exist_ok=True)
+        logger.info(f"使用模型目录: {model_dir}")
+        
+        ocr_config = self.config['ocr']
+        version, spec = self._version_spec(lang, version)
+        precision = self._precision(lang) if device == 'cpu' else 'fp32'
+        det_spec = {'model_name': ocr_config['det_model']}
+        if precision == 'int8':
+            quantized = ocr_config.get('quantized_models') or {}
+            spec = (quantized.get('rec') or {}).get(lang)
+            if not spec or not spec.get('model_dir'):
+                raise ValueError(f"语言 {lang} 配置为 int8，但未配置量化识别模型 (ocr.quantized_models.rec.{lang})")
+            version = f"{version}-int8"
+            # 未提供量化检测模型时检测仍使用 fp32
+            if quantized.get('det'):
+                det_spec = quantized['det']
+        det_precision = precision if det_spec.get('model_dir') else 'fp32'
+        det = self._acquire_submodel('det', det_spec['model_name'], device,
+                                     self._resolve_model_dir(det_spec['model_name'], det_spec.get('model_dir')),
+                                     det_precision)
+        try:
+            rec = self._acquire_submodel('rec', spec['model_name'], device,
+                                         self._resolve_model_dir(spec['model_name'], spec.get('model_dir')),
+                                         precision)
+        except Exception:
+            self._release_submodel(det)
+            raise
+        # 可选步骤的子模型同样在所有语言间共享，默认开启的步骤随流水线一起加载，避免首个请求承担加载延迟
+        optional = {
+            'cls': ('textline_orientation_model', 'use_textline_orientation'),
+            'doc_ori': ('doc_orientation_model', 'use_doc_orientation_classify'),
+            'unwarp': ('doc_unwarping_model', 'use_doc_unwarping'),
+        }
+        loaders = {kind: (lambda kind=kind, model=ocr_config[model_key]: self._acquire_submodel(
+                              kind, model, device, self._resolve_model_dir(model)))
+                   for kind, (model_key, _) in optional.items()}
+        pipeline = OCRPipeline(det, rec, loaders, lang, version, use_gpu)
+        pipeline.precision = precision
+        try:
+            for kind, (_, enabled_key) in optional.items():
+                if ocr_config[enabled_key]:
+                    pipeline.optional_submodel(kind)
+        except Exception:
+            self._release_pipeline(pipeline)
+            raise
+        return pipeline
+    
+    def _release_pipeline(self, pipeline):
+        for submodel in pipeline.submodels():
+            self._release_submodel(submodel)
+    
+    def _drain_and_release(self, pipeline, drain_timeout):
+        """等待已摘除的流水线在途请求结束后释放其子模型，超时只告警，仍然释放"""
+        if not pipeline.wait_idle(drain_timeout):
+            logger.warning(f"流水线 {pipeline.lang}/{pipeline.version} 排空超时，仍有 {pipeline.in_flight} 个在途请求")
+        self._release_pipeline(pipeline)
+    
     def get_model(self, lang='ch', use_gpu=None):
-        """获取 OCR 模型实例"""
+        """获取 OCR 流水线实例，加载在全局锁外进行，不阻塞其他语言的请求"""
         if use_gpu is None:
             use_gpu = self.config['ocr']['use_gpu']
             
         model_key = f"{lang}_{use_gpu}"
         
         with self.model_lock:
-            if model_key not in self.models:
-                logger.info(f"加载 OCR 模型: {model_key}")
-                
-                # 设置设备
-                if use_gpu and paddle.device.is_compiled_with_cuda():
-                    paddle.device.set_device('gpu')
-                    logger.info("使用 GPU 加速")
-                else:
-                    paddle.device.set_device('cpu')
-                    logger.info("使用 CPU 推理")
-                
-                # 创建模型
-                model_dir = self.config['ocr'].get('model_dir', './models')
-                # 转换为绝对路径
-                if not os.path.isabs(model_dir):
-                    model_dir = os.path.join(os.path.dirname(__file__), model_dir)
-                # 确保模型目录存在
-                os.makedirs(model_dir, exist_ok=True)
-                logger.info(f"使用模型目录: {model_dir}")
-                
-                self.models[model_key] = PaddleOCR(
-                    use_textline_orientation=self.config['ocr']['use_textline_orientation'],
-                    lang=lang,
-                    det_model_dir=None,  # 让 PaddleOCR 自动下载到指定目录
-                    rec_model_dir=None,
-                    cls_model_dir=None
-                )
-                
+            pipeline = self.models.get(model_key)
+            if pipeline is not None:
+                return pipeline
+            load_lock = self._loading_locks.setdefault(model_key, Lock())
+        with load_lock:
+            with self.model_lock:
+                pipeline = self.models.get(model_key)
+                if pipeline is not None:
+                    return pipeline
+            logger.info(f"加载 OCR 模型: {model_key}")
+            pipeline = self._build_pipeline(lang, use_gpu)
+            with self.model_lock:
+                self.models[model_key] = pipeline
+                self._loading_locks.pop(model_key, None)
                 self.stats['models_loaded'] += 1
-                logger.info(f"OCR 模型加载完成: {model_key}")
+            logger.info(f"OCR 模型加载完成: {model_key}")
+            return pipeline
+    
+    def acquire_model(self, lang='ch', use_gpu=None):
+        """获取流水线并登记在途请求，用完须调用 pipeline.release()"""
+        while True:
+            pipeline = self.get_model(lang, use_gpu)
+            with self.model_lock:
+                # 获取与登记之间流水线可能已被切换或卸载，此时重新获取
+                if pipeline in self.models.values():
+                    pipeline.acquire()
+                    return pipeline
+    
+    def swap_model_version(self, lang, version, background=True):
+        """
+        切换语言的识别模型版本
+
+        在后台加载并预热新版本，就绪后原子替换已加载的流水线，
+        旧流水线在在途请求完成后释放。尚未加载的语言只更新活动版本。
+        """
+        self._version_spec(lang, version)
+        with self.model_lock:
+            job = self.swap_jobs.get(lang)
+            if job is not None and job['status'] in ('loading', 'draining'):
+                raise RuntimeError(f"语言 {lang} 正在切换到版本 {job['version']}")
+            job = {
+                'version': version,
+                'previous_version': self.active_versions.get(lang, 'default'),
+                'status': 'loading',
+                'started_at': datetime.now().isoformat(),
+            }
+            self.swap_jobs[lang] = job
+        if background:
+            threading.Thread(target=self._run_swap, args=(lang, version, job),
+                             name=f"model-swap-{lang}", daemon=True).start()
+        else:
+            self._run_swap(lang, version, job)
+        return job
+    
+    def _run_swap(self, lang, version, job):
+        swap_config = self.config['performance'].get('model_swap', {})
+        with self.model_lock:
+            targets = {key: pipeline.use_gpu for key, pipeline in self.models.items()
+                       if pipeline.lang == lang}
+        new_pipelines = {}
+        try:
+            start = time.time()
+            for key, use_gpu in targets.items():
+                new_pipelines[key] = self._build_pipeline(lang, use_gpu, version)
+            job['load_seconds'] = time.time() - start
+            start = time.time()
+            for pipeline in new_pipelines.values():
+                pipeline.warmup(swap_config.get('warmup_runs', 2))
+            job['warmup_seconds'] = time.time() - start
+        except Exception as e:
+            logger.error(f"模型版本 {lang}/{version} 加载失败: {e}")
+            for pipeline in new_pipelines.values():
+                self._release_pipeline(pipeline)
+            job.update(status='failed', error=str(e), finished_at=datetime.now().isoformat())
+            return
+        
+        with self.model_lock:
+            old_pipelines = [self.models.get(key) for key in new_pipelines]
+            self.models.update(new_pipelines)
+            self.active_versions[lang] = version
+            job['status'] = 'draining'
+        logger.info(f"语言 {lang} 已切换到版本 {version}")
         
-        return self.models[model_key]
+        start = time.time()
+        drain_timeout = swap_config.get('drain_timeout', 60)
+        for pipeline in old_pipelines:
+            if pipeline is not None:
+                self._drain_and_release(pipeline, drain_timeout)
+        job['drain_seconds'] = time.time() - start
+        job.update(status='active', finished_at=datetime.now().isoformat())
+    
+    def predict(self, images, lang='ch', use_gpu=None, options=None):
+        """
+        识别单张或多张图像，lang 可为多个语言
+
+        多语言时只做一次检测与方向分类，各语言识别模型在同一批文本行上分别批量识别，
+        lang_mode 为 best 时每行取置信度最高的结果，为 all 时同时返回全部候选。
+        """
+        if lang == 'auto':
+            return self._predict_auto(images, use_gpu, options or {})
+        langs = [lang] if isinstance(lang, str) else list(lang)
+        options = options or {}
+        pipelines = []
+        try:
+            for l in langs:
+                pipelines.append(self.acquire_model(l, use_gpu))
+            if len(pipelines) == 1:
+                return pipelines[0].predict(images, options)
+            return self._predict_multi(images, langs, pipelines, options)
+        finally:
+            for pipeline in pipelines:
+                pipeline.release()
+    
+    def _predict_multi(self, images, langs, pipelines, options):
+        """多语言识别：共用一次检测，各语言分别识别后按 lang_mode 合并"""
+        if isinstance(images, np.ndarray):
+            images = [images]
+        with stage_timer('det'):
+            crops, owners = pipelines[0].extract_crops(images, options)
+        with stage_timer('rec'):
+            candidates = [pipeline.recognize(crops, options) if crops else [] for pipeline in pipelines]
+        keep_all = options.get('lang_mode') == 'all'
+
+        results = [{'rec_texts': [], 'rec_scores': [], 'rec_polys': [], 'rec_langs': []}
+                   for _ in images]
+        if keep_all:
+            for result in results:
+                result['rec_candidates'] = []
+        for line, (index, poly) in enumerate(owners):
+            line_candidates = [(candidates[i][line][0], candidates[i][line][1], l)
+                               for i, l in enumerate(langs)]
+            text, score, best_lang = max(line_candidates, key=lambda c: (bool(c[0]), c[1]))
+            if not text:
+                continue
+            result = results[index]
+            result['rec_texts'].append(text)
+            result['rec_scores'].append(score)
+            result['rec_polys'].append(poly.astype(np.int32))
+            result['rec_langs'].append(best_lang)
+            if keep_all:
+                result['rec_candidates'].append([
+                    {'lang': l, 'text': t, 'confidence': sc} for t, sc, l in line_candidates])
+        return results
+    
+    def _predict_auto(self, images, use_gpu, options):
+        """
+        自动语言识别：只做一次检测，用探测语言识别少量最长的文本行判定文字体系，
+        其余文本行只交给对应语言的识别模型；判定语言与探测语言相同时样本结果直接复用
+        """
+        if isinstance(images, np.ndarray):
+            images = [images]
+        ocr_config = self.config['ocr']
+        auto_config = ocr_config['auto_lang']
+        probe_langs = list(auto_config.get('probe_langs') or [ocr_config['default_lang']])
+        probes = []
+        extra = None
+        try:
+            for l in probe_langs:
+                probes.append(self.acquire_model(l, use_gpu))
+            with stage_timer('det'):
+                crops, owners = probes[0].extract_crops(images, options)
+            start = time.perf_counter()
+            # 宽高比越大的文本行字符越多，判定越可靠
+            sample = sorted(range(len(crops)), key=lambda i: crops[i].shape[1] / max(crops[i].shape[0], 1),
+                            reverse=True)[:auto_config.get('sample_lines', 8)]
+            with stage_timer('lang_probe'):
+                probe_results = [pipeline.recognize([crops[i] for i in sample], options) if sample else []
+                                 for pipeline in probes]
+            best = [max(((results[j][0], results[j][1], k) for k, results in enumerate(probe_results)),
+                        key=lambda c: (bool(c[0]), c[1])) for j in range(len(sample))]
+            script, scores = detect_script([(text, score) for text, score, _ in best],
+                                           auto_config.get('min_confidence', 0.5))
+            lang = (auto_config.get('scripts') or {}).get(script)
+            fallback = lang not in ocr_config['rec_models']
+            if fallback:
+                # 无法判定或对应语言未配置识别模型时使用首个探测语言
+                lang = probe_langs[0]
+            probe_seconds = time.perf_counter() - start
+
+            if lang in probe_langs:
+                probe_index = probe_langs.index(lang)
+                chosen = probes[probe_index]
+                lines = dict(zip(sample, probe_results[probe_index]))
+            else:
+                chosen = extra = self.acquire_model(lang, use_gpu)
+                lines = {}
+            remaining = [i for i in range(len(crops)) if i not in lines]
+            with stage_timer('rec'):
+                if remaining:
+                    lines.update(zip(remaining, chosen.recognize([crops[i] for i in remaining], options)))
+        finally:
+            for pipeline in probes:
+                pipeline.release()
+            if extra is not None:
+                extra.release()
+
+        rerecognized = 0 if lang in probe_langs else len(sample)
+        detection = {
+            'requested': 'auto',
+            'lang': lang,
+            'script': script,
+            'scores': scores,
+            'fallback': fallback,
+            'probe_langs': probe_langs,
+            'total_lines': len(crops),
+            'sampled_lines': len(sample),
+            'rerecognized_lines': rerecognized,
+            'probe_ms': round(probe_seconds * 1000, 3),
+        }
+        with self.model_lock:
+            stats = self.auto_lang_stats
+            stats['requests'] += 1
+            stats['decisions'][lang] = stats['decisions'].get(lang, 0) + 1
+            stats['fallbacks'] += int(fallback)
+            stats['total_lines'] += len(crops)
+            stats['sampled_lines'] += len(sample)
+            stats['rerecognized_lines'] += rerecognized
+            stats['probe_seconds'] += probe_seconds
+
+        results = [{'rec_texts': [], 'rec_scores': [], 'rec_polys': [], 'lang_detection': detection}
+                   for _ in images]
+        for line, (index, poly) in enumerate(owners):
+            text, score = lines[line]
+            if not text:
+                continue
+            results[index]['rec_texts'].append(text)
+            results[index]['rec_scores'].append(score)
+            results[index]['rec_polys'].append(poly.astype(np.int32))
+        return results
+    
+    def auto_lang_info(self):
+        """lang=auto 的累计判定分布与探测开销"""
+        with self.model_lock:
+            stats = dict(self.auto_lang_stats, decisions=dict(self.auto_lang_stats['decisions']))
+        stats['avg_probe_ms'] = stats['probe_seconds'] * 1000 / max(stats['requests'], 1)
+        # 探测额外识别的文本行占全部文本行的比例
+        stats['extra_rec_ratio'] = stats['rerecognized_lines'] / max(stats['total_lines'], 1)
+        stats['probe_seconds'] = round(stats['probe_seconds'], 3)
+        return stats
+    
+    def unload_model(self, lang, use_gpu=None):
+        """
+        卸载语言流水线，仅在子模型不再被其他语言引用时释放
+
+        与版本切换相同，先摘除使新请求不再命中，再在锁外等待在途请求结束（最长 model_swap.drain_timeout）后释放
+        """
+        if use_gpu is None:
+            use_gpu = self.config['ocr']['use_gpu']
+        with self.model_lock:
+            pipeline = self.models.pop(f"{lang}_{use_gpu}", None)
+        if pipeline is None:
+            return False
+        drain_timeout = self.config['performance'].get('model_swap', {}).get('drain_timeout', 60)
+        self._drain_and_release(pipeline, drain_timeout)
+        return True
     
     def preload_models(self):
         """预加载模型"""
@@ -189,168 +1415,973 @@ class OCRModelManager:
         
         logger.info("模型预加载完成")
     
+    def inference_busy_time(self):
+        """所有子模型（含已释放的）累计推理耗时（秒）"""
+        with self.model_lock:
+            return self.released_busy_time + sum(m.busy_time for m in self.submodels.values())
+    
     def get_model_info(self):
         """获取模型信息"""
+        with self.model_lock:
+            submodels = [submodel.info() for submodel in self.submodels.values()]
+            langs = set(self.config['ocr']['rec_models']) | set(self.model_versions)
+            versions = {}
+            for lang in sorted(langs):
+                available = set(self.model_versions.get(lang, {}))
+                if lang in self.config['ocr']['rec_models']:
+                    available.add('default')
+                versions[lang] = {
+                    'active': self.active_versions.get(lang, 'default'),
+                    'precision': (self.config['ocr'].get('precision') or {}).get(lang, 'fp32'),
+                    'available': sorted(available),
+                    'loaded': {key: p.version for key, p in self.models.items() if p.lang == lang},
+                    'swap': self.swap_jobs.get(lang)
+                }
         return {
             'loaded_models': list(self.models.keys()),
+            'versions': versions,
+            'submodels': submodels,
             'stats': self.stats
         }
 
+def resize_to_limit(image, max_size):
+    """按最长边限制缩放图像，未超限时原样返回"""
+    h, w = image.shape[:2]
+    if max(h, w) <= max_size:
+        return image
+    scale = max_size / max(h, w)
+    new_h, new_w = int(h * scale), int(w * scale)
+    return cv2.resize(image, (new_w, new_h))
+
+class ImageTooLargeError(ValueError):
+    """图像像素数超出配置的解码预算"""
+
+# 各图像格式对应的文件扩展名，用于与 supported_formats 对照
+IMAGE_FORMAT_EXTENSIONS = {
+    'jpeg': ('.jpg', '.jpeg'),
+    'png': ('.png',),
+    'bmp': ('.bmp',),
+    'tiff': ('.tiff', '.tif'),
+    'webp': ('.webp',),
+}
+
+# JPEG 缩小解码档位：(缩小倍数, imread 标志)，按倍数从大到小尝试
+JPEG_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+def _read_jpeg_size(f):
+    """扫描 JPEG 段，直到 SOFn 段读出宽高"""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0x01, 0xd8) or 0xd0 <= marker <= 0xd7:
+            continue
+        if marker in (0xd9, 0xda):
+            return None
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack('>HH', data[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+def _read_tiff_size(f, head):
+    """读取 TIFF 第一个 IFD 中的宽高标签"""
+    endian = '<' if head[:2] == b'II' else '>'
+    f.seek(4)
+    ifd_offset = struct.unpack(endian + 'I', f.read(4))[0]
+    f.seek(ifd_offset)
+    count_bytes = f.read(2)
+    if len(count_bytes) < 2:
+        return None
+    width = height = None
+    for _ in range(struct.unpack(endian + 'H', count_bytes)[0]):
+        entry = f.read(12)
+        if len(entry) < 12:
+            break
+        tag, field_type = struct.unpack(endian + 'HH', entry[:4])
+        if tag not in (256, 257):
+            continue
+        if field_type == 3:
+            value = struct.unpack(endian + 'H', entry[8:10])[0]
+        else:
+            value = struct.unpack(endian + 'I', entry[8:12])[0]
+        if tag == 256:
+            width = value
+        else:
+            height = value
+    if width is None or height is None:
+        return None
+    return width, height
+
+def _is_encoded_bytes(source):
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+def read_image_header(source):
+    """
+    根据文件头魔数识别真实格式并读取图像尺寸，不解码像素数据
+
+    Args:
+        source: 文件路径或已编码的图像字节
+
+    Returns:
+        (format, width, height)，无法识别时 format 为 None
+    """
+    with (io.BytesIO(source) if _is_encoded_bytes(source) else open(source, 'rb')) as f:
+        head = f.read(32)
+        size = None
+        if head[:3] == b'\xff\xd8\xff':
+            image_format = 'jpeg'
+            size = _read_jpeg_size(f)
+        elif head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            image_format = 'png'
+            size = struct.unpack('>II', head[16:24])
+        elif head[:2] == b'BM' and len(head) >= 26:
+            image_format = 'bmp'
+            if struct.unpack('<I', head[14:18])[0] == 12:
+                size = struct.unpack('<HH', head[18:22])
+            else:
+                width, height = struct.unpack('<ii', head[18:26])
+                size = (abs(width), abs(height))
+        elif head[:4] in (b'II*\x00', b'MM\x00*'):
+            image_format = 'tiff'
+            size = _read_tiff_size(f, head)
+        elif head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+            image_format = 'webp'
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                size = (width & 0x3fff, height & 0x3fff)
+            elif chunk == b'VP8L':
+                bits = struct.unpack('<I', head[21:25])[0]
+                size = ((bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1)
+            elif chunk == b'VP8X':
+                size = (int.from_bytes(head[24:27], 'little') + 1,
+                        int.from_bytes(head[27:30], 'little') + 1)
+        else:
+            return None, 0, 0
+    if not size:
+        raise ValueError(f"无法读取 {image_format} 图像尺寸，文件可能已损坏")
+    return image_format, int(size[0]), int(size[1])
+
+def probe_image(source, ocr_config):
+    """
+    解码前校验：按魔数确认格式受支持，并按像素预算拒绝超大图像
+
+    Returns:
+        (format, width, height)
+    """
+    image_format, width, height = read_image_header(source)
+    supported_formats = ocr_config['supported_formats']
+    if image_format is None or not any(
+            ext in supported_formats for ext in IMAGE_FORMAT_EXTENSIONS[image_format]):
+        suffix = 'unknown' if _is_encoded_bytes(source) else Path(source).suffix.lower()
+        raise ValueError(f"不支持的文件格式: {image_format or suffix}")
+    max_pixels = ocr_config.get('max_image_pixels')
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLargeError(f"图像像素数超出限制: {width}x{height} > {max_pixels}")
+    return image_format, width, height
+
+def decode_image(source, ocr_config):
+    """
+    校验并解码图像，尚未按 max_image_size 缩放
+
+    source 为文件路径或已编码的图像字节。JPEG 在目标尺寸允许时直接以 1/2、1/4、1/8
+    分辨率解码，避免全尺寸解码后再缩小。
+    """
+    image_format, width, height = probe_image(source, ocr_config)
+    max_size = ocr_config['max_image_size']
+    flag = cv2.IMREAD_COLOR
+    if image_format == 'jpeg' and ocr_config.get('reduced_decode', True):
+        for factor, reduced_flag in JPEG_REDUCED_DECODE_FLAGS:
+            if max(width, height) / factor >= max_size:
+                flag = reduced_flag
+                break
+    if _is_encoded_bytes(source):
+        image = cv2.imdecode(np.frombuffer(source, dtype=np.uint8), flag)
+    else:
+        image = cv2.imread(source, flag)
+    if image is None:
+        raise ValueError("无法读取图像文件")
+    return image
+
+def load_image(source, ocr_config):
+    """校验并解码图像，解码结果最长边不超过 max_image_size"""
+    return resize_to_limit(decode_image(source, ocr_config), ocr_config['max_image_size'])
+
+def image_from_pixels(pixels, ocr_config, color='bgr'):
+    """
+    校验调用方提供的原始像素（uint8，H×W、H×W×1/3/4），转换为 BGR 图像
+
+    BGR 三通道输入且无需缩放时直接使用原数组，不复制。
+    """
+    if pixels.dtype != np.uint8:
+        raise ValueError(f"像素类型应为 uint8: {pixels.dtype}")
+    if pixels.ndim == 3 and pixels.shape[2] == 1:
+        pixels = pixels[:, :, 0]
+    if pixels.ndim not in (2, 3) or (pixels.ndim == 3 and pixels.shape[2] not in (3, 4)):
+        raise ValueError(f"不支持的像素形状: {pixels.shape}")
+    height, width = pixels.shape[:2]
+    max_pixels = ocr_config.get('max_image_pixels')
+    if max_pixels and width * height > max_pixels:
+        raise ImageTooLargeError(f"图像像素数超出限制: {width}x{height} > {max_pixels}")
+    if pixels.ndim == 2:
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_GRAY2BGR)
+    elif pixels.shape[2] == 4:
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGBA2BGR if color == 'rgb' else cv2.COLOR_BGRA2BGR)
+    elif color == 'rgb':
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+    return resize_to_limit(pixels, ocr_config['max_image_size'])
+
+def parse_orig_size(params):
+    """
+    解析客户端上报的原图尺寸（客户端预缩小后上传时提供）
+
+    Returns:
+        (width, height)，未提供时返回 None
+    """
+    width, height = params.get('orig_width'), params.get('orig_height')
+    if width in (None, '') and height in (None, ''):
+        return None
+    try:
+        width, height = int(width), int(height)
+    except (TypeError, ValueError):
+        raise ValueError(f"原图尺寸应为整数: {width}x{height}")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"原图尺寸无效: {width}x{height}")
+    return width, height
+
+def scale_result_bboxes(formatted_result, image_shape, orig_size):
+    """将边界框从处理尺寸映射回原图尺寸"""
+    h, w = image_shape[:2]
+    scale_x, scale_y = orig_size[0] / w, orig_size[1] / h
+    for detail in formatted_result['details']:
+        detail['bbox'] = [[round(x * scale_x), round(y * scale_y)] for x, y in detail['bbox']]
+    formatted_result['image_size'] = {'width': orig_size[0], 'height': orig_size[1]}
+    return formatted_result
+
+def format_ocr_result(ocr_result, lang):
+    """将单张图像的预测结果转换为服务返回格式，lang 为列表时附带每行的识别语言"""
+    texts = ocr_result.get('rec_texts', [])
+    scores = ocr_result.get('rec_scores', [])
+    polys = ocr_result.get('rec_polys', [])
+    line_langs = ocr_result.get('rec_langs')
+    candidates = ocr_result.get('rec_candidates')
+    formatted_result = {
+        'success': True,
+        'timestamp': datetime.now().isoformat(),
+        'lang': lang if isinstance(lang, str) else ','.join(lang),
+        'text': ' '.join(texts),
+        'word_count': len(texts),
+        'avg_confidence': sum(scores) / len(scores) if scores else 0,
+        'details': []
+    }
+    if not isinstance(lang, str):
+        formatted_result['langs'] = list(lang)
+    if 'lang_detection' in ocr_result:
+        # lang=auto 时返回判定的语言及判定过程的开销
+        formatted_result['lang'] = ocr_result['lang_detection']['lang']
+        formatted_result['lang_detection'] = ocr_result['lang_detection']
+    for i, (text, score) in enumerate(zip(texts, scores)):
+        bbox = polys[i].tolist() if i < len(polys) else []
+        detail = {
+            'text': text,
+            'confidence': float(score),
+            'bbox': bbox
+        }
+        if line_langs is not None:
+            detail['lang'] = line_langs[i]
+        if candidates is not None:
+            detail['candidates'] = candidates[i]
+        formatted_result['details'].append(detail)
+    return formatted_result
+
+def dhash(gray, hash_size=8):
+    """灰度图的差异哈希（dHash），返回 hash_size * hash_size 位整数"""
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def _rects_intersect(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+def _rect_iou(a, b):
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def merge_rects(rects):
+    """合并相交的矩形 (x0, y0, x1, y1)，直到两两不相交"""
+    rects = list(rects)
+    while True:
+        merged = []
+        for rect in rects:
+            for i, other in enumerate(merged):
+                if _rects_intersect(rect, other):
+                    merged[i] = (min(rect[0], other[0]), min(rect[1], other[1]),
+                                 max(rect[2], other[2]), max(rect[3], other[3]))
+                    break
+            else:
+                merged.append(rect)
+        if len(merged) == len(rects):
+            return merged
+        rects = merged
+
+def changed_regions(prev_gray, gray, video_config):
+    """帧差分得到变化区域，坐标为差分图尺度下的 (x0, y0, x1, y1)"""
+    diff = cv2.absdiff(prev_gray, gray)
+    _, mask = cv2.threshold(diff, video_config['diff_threshold'], 255, cv2.THRESH_BINARY)
+    # 膨胀使同一行内相邻的变化字符连成一片
+    mask = cv2.dilate(mask, np.ones((5, 5), np.uint8), iterations=2)
+    contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+    rects = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w * h >= video_config['min_region_area']:
+            rects.append((x, y, x + w, y + h))
+    return merge_rects(rects)
+
+def iter_video_frames(file_path, sample_fps):
+    """
+    流式解码视频，按 sample_fps 抽帧，产出 (帧序号, 时间戳秒, 图像)
+
+    未抽中的帧只 grab 不解码，解码开销与抽帧数而非总帧数成正比。
+    """
+    capture = cv2.VideoCapture(file_path)
+    if not capture.isOpened():
+        raise ValueError("无法打开视频文件")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        if not fps or fps != fps or fps <= 0:
+            fps = 25.0
+        step = max(1, int(round(fps / sample_fps))) if sample_fps else 1
+        index = 0
+        while True:
+            with stage_timer('decode'):
+                if not capture.grab():
+                    break
+                frame = None
+                if index % step == 0:
+                    ok, frame = capture.retrieve()
+                    if not ok:
+                        break
+            if frame is not None:
+                yield index, index / fps, frame
+            index += 1
+    finally:
+        capture.release()
+
+def iter_image_frames(file_paths, fps, ocr_config):
+    """按顺序逐张解码帧序列图像，产出 (帧序号, 时间戳秒, 图像)"""
+    for index, file_path in enumerate(file_paths):
+        with stage_timer('decode'):
+            image = decode_image(file_path, ocr_config)
+        yield index, index / fps, image
+
+class VideoTextTracker:
+    """
+    逐帧跟踪视频中的文本，输出文本片段时间线
+
+    每帧与上一识别帧比较：差分无变化时视为重复帧直接跳过；dHash 距离达到切镜阈值或
+    变化面积过大时整帧识别；否则只裁剪识别变化区域（扩展到与其相交的已有文本行），
+    区域外的文本行沿用上次结果。识别量与画面内容的变化成正比，而不是与帧数成正比。
+    """
+
+    def __init__(self, recognize, video_config):
+        """
+        Args:
+            recognize: 识别函数，接收图像列表，返回每张图像的预测结果字典
+            video_config: ocr.video 配置
+        """
+        self.recognize = recognize
+        self.config = video_config
+        self.active = []
+        self.finished = []
+        self.prev_gray = None
+        self.prev_hash = None
+        self.stats = {'frames': 0, 'duplicate': 0, 'partial': 0, 'full': 0,
+                      'ocr_pixels': 0, 'frame_pixels': 0}
+
+    def _diff_view(self, frame):
+        """缩小后的灰度图用于哈希与差分，返回 (灰度图, 缩放比例)"""
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.config['diff_size'] / max(h, w))
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if scale < 1.0:
+            gray = cv2.resize(gray, (max(1, round(w * scale)), max(1, round(h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        # 轻度模糊抑制视频压缩噪声
+        return cv2.GaussianBlur(gray, (3, 3), 0), scale
+
+    def _expand_regions(self, rects, scale, width, height):
+        """变化区域映射回帧坐标并加边距，与其相交的已有文本行整行纳入，避免只识别半行"""
+        pad = self.config['region_padding']
+        regions = [(max(0, int(x0 / scale) - pad), max(0, int(y0 / scale) - pad),
+                    min(width, int(np.ceil(x1 / scale)) + pad), min(height, int(np.ceil(y1 / scale)) + pad))
+                   for x0, y0, x1, y1 in rects]
+        while True:
+            touched = [line['rect'] for line in self.active
+                       if any(_rects_intersect(line['rect'], r) for r in regions)]
+            grown = merge_rects(regions + [(max(0, x0 - pad), max(0, y0 - pad),
+                                            min(width, x1 + pad), min(height, y1 + pad))
+                                           for x0, y0, x1, y1 in touched])
+            if sorted(grown) == sorted(regions):
+                return regions
+            regions = grown
+
+    def feed(self, frame_index, timestamp, frame):
+        """处理一帧"""
+        self.stats['frames'] += 1
+        h, w = frame.shape[:2]
+        self.stats['frame_pixels'] += h * w
+        gray, scale = self._diff_view(frame)
+        frame_hash = dhash(gray)
+        regions = None
+        if (self.prev_gray is not None and self.prev_gray.shape == gray.shape
+                and bin(frame_hash ^ self.prev_hash).count('1') < self.config['scene_cut_distance']):
+            rects = changed_regions(self.prev_gray, gray, self.config)
+            if not rects:
+                # 与上一识别帧相比无变化；不更新参考帧，缓慢变化会逐步累积到阈值
+                self.stats['duplicate'] += 1
+                self._touch(self.active, frame_index, timestamp)
+                return
+            regions = self._expand_regions(rects, scale, w, h)
+            if sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions) > self.config['full_frame_ratio'] * w * h:
+                regions = None
+        self.prev_gray, self.prev_hash = gray, frame_hash
+
+        if regions is None:
+            self.stats['full'] += 1
+            regions = [(0, 0, w, h)]
+            affected, self.active = self.active, []
+        else:
+            self.stats['partial'] += 1
+            affected = [line for line in self.active
+                        if any(_rects_intersect(line['rect'], r) for r in regions)]
+            self.active = [line for line in self.active if line not in affected]
+        self.stats['ocr_pixels'] += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions)
+
+        results = self.recognize([frame[y0:y1, x0:x1] for x0, y0, x1, y1 in regions])
+        for (x0, y0, _, _), result in zip(regions, results):
+            langs = result.get('rec_langs')
+            for i, (text, score, poly) in enumerate(zip(result['rec_texts'], result['rec_scores'], result['rec_polys'])):
+                poly = np.asarray(poly) + (x0, y0)
+                rect = (int(poly[:, 0].min()), int(poly[:, 1].min()), int(poly[:, 0].max()), int(poly[:, 1].max()))
+                # 内容与位置都未变的文本行延续原片段
+                match = next((old for old in affected
+                              if old['text'] == text and _rect_iou(old['rect'], rect) >= 0.5), None)
+                if match is not None:
+                    affected.remove(match)
+                    match['confidence'] = max(match['confidence'], float(score))
+                else:
+                    match = {'text': text, 'confidence': float(score), 'start': timestamp,
+                             'first_frame': frame_index}
+                    if langs is not None:
+                        match['lang'] = langs[i]
+                match.update(bbox=poly.astype(np.int32).tolist(), rect=rect)
+                self.active.append(match)
+        # 未再出现的文本行在上一次可见时结束
+        self.finished.extend(affected)
+        self._touch(self.active, frame_index, timestamp)
+
+    @staticmethod
+    def _touch(lines, frame_index, timestamp):
+        for line in lines:
+            line['end'] = timestamp
+            line['last_frame'] = frame_index
+
+    def segments(self):
+        """按出现时间与位置排序的文本片段"""
+        lines = sorted(self.finished + self.active,
+                       key=lambda line: (line['start'], line['rect'][1], line['rect'][0]))
+        segments = []
+        for line in lines:
+            segment = {k: v for k, v in line.items() if k != 'rect'}
+            segment['start'] = round(segment['start'], 3)
+            segment['end'] = round(segment['end'], 3)
+            segments.append(segment)
+        return segments
+
+    def summary(self):
+        stats = dict(self.stats)
+        # 实际送入识别的像素占全部帧像素的比例，反映计算量随内容变化的程度
+        stats['ocr_pixel_ratio'] = round(stats['ocr_pixels'] / stats['frame_pixels'], 4) if stats['frame_pixels'] else 0.0
+        return stats
+
+def paddle_allocator_stats():
+    """Paddle 显存分配器统计，仅 GPU 可用；CPU 推理时返回 None"""
+    if not paddle.device.is_compiled_with_cuda() or not paddle.device.get_device().startswith('gpu'):
+        return None
+    cuda = paddle.device.cuda
+    return {
+        'allocated_mb': cuda.memory_allocated() / 1024 / 1024,
+        'max_allocated_mb': cuda.max_memory_allocated() / 1024 / 1024,
+        'reserved_mb': cuda.memory_reserved() / 1024 / 1024,
+        'max_reserved_mb': cuda.max_memory_reserved() / 1024 / 1024,
+    }
+
+class ResourceMonitor:
+    """
+    进程资源采样器
+
+    后台线程按固定间隔采集 RSS、CPU、线程数、文件描述符、临时目录占用等指标，
+    统计接口直接返回最近一次采样结果。推理利用率为采样间隔内推理耗时占比，
+    并按 1/5/15 分钟做类似系统负载的指数滑动平均。
+    """
+
+    LOAD_WINDOWS = (60, 300, 900)
+
+    def __init__(self, model_manager, temp_dir, telemetry_config):
+        self.model_manager = model_manager
+        self.temp_dir = temp_dir
+        self.interval = max(float(telemetry_config.get('interval', 5)), 0.5)
+        self.process = psutil.Process()
+        self.load = [0.0] * len(self.LOAD_WINDOWS)
+        self._last_busy = model_manager.inference_busy_time()
+        self._last_time = time.time()
+        self._snapshot = {}
+        self._stop = threading.Event()
+        # 首次调用 cpu_percent 仅建立基准
+        self.process.cpu_percent(None)
+        self._thread = threading.Thread(target=self._run, name='resource-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self):
+        return self._snapshot
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._snapshot = self._sample()
+            except Exception as e:
+                logger.warning(f"资源采样失败: {e}")
+
+    def _temp_dir_usage(self):
+        files, size = 0, 0
+        try:
+            for entry in os.scandir(self.temp_dir):
+                if entry.is_file(follow_symlinks=False):
+                    files += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+            free = shutil.disk_usage(self.temp_dir).free
+        except OSError:
+            return None
+        return {'path': self.temp_dir, 'files': files, 'size_mb': size / 1024 / 1024,
+                'disk_free_mb': free / 1024 / 1024}
+
+    def _sample(self):
+        now = time.time()
+        busy = self.model_manager.inference_busy_time()
+        elapsed = max(now - self._last_time, 1e-6)
+        utilization = max(busy - self._last_busy, 0.0) / elapsed
+        self._last_busy, self._last_time = busy, now
+        for i, window in enumerate(self.LOAD_WINDOWS):
+            decay = np.exp(-elapsed / window)
+            self.load[i] = self.load[i] * decay + utilization * (1 - decay)
+
+        with self.process.oneshot():
+            memory = self.process.memory_info()
+            cpu_percent = self.process.cpu_percent(None)
+            num_threads = self.process.num_threads()
+            open_fds = (self.process.num_fds() if hasattr(self.process, 'num_fds')
+                        else self.process.num_handles())
+        with self.model_manager.model_lock:
+            model_memory = {key: round(m.memory_estimate / 1024 / 1024, 1)
+                            for key, m in self.model_manager.submodels.items()
+                            if m.memory_estimate is not None}
+        try:
+            allocator = paddle_allocator_stats()
+        except Exception as e:
+            allocator = {'error': str(e)}
+        return {
+            'sampled_at': datetime.fromtimestamp(now).isoformat(),
+            'rss_mb': memory.rss / 1024 / 1024,
+            'vms_mb': memory.vms / 1024 / 1024,
+            'cpu_percent': cpu_percent,
+            'cpu_count': psutil.cpu_count(),
+            'num_threads': num_threads,
+            'open_fds': open_fds,
+            'temp_dir': self._temp_dir_usage(),
+            'model_memory_mb': model_memory,
+            'paddle_allocator': allocator,
+            'inference_utilization': utilization,
+            'inference_load': dict(zip(('1m', '5m', '15m'), self.load)),
+        }
+
+def set_request_tenant(tenant):
+    """设置当前请求线程所属的租户，推理槽位调度与用量统计据此归属"""
+    _request_context.tenant = tenant
+
+def get_request_tenant():
+    return getattr(_request_context, 'tenant', None)
+
+class TokenBucket:
+    """令牌桶：rate 为每秒补充的令牌数，burst 为桶容量"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def take(self, n=1):
+        """取令牌，成功返回 0，否则返回令牌补足还需等待的秒数"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return 0.0
+            return (n - self.tokens) / self.rate
+
+class Tenant:
+    """租户的配额、调度状态与用量"""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.weight = max(float(spec.get('weight', 1)), 0.01)
+        self.max_concurrency = spec.get('max_concurrency') or 0
+        rate = spec.get('rate') or 0
+        self.bucket = TokenBucket(rate, spec.get('burst') or rate) if rate > 0 else None
+        self.in_flight = 0
+        # 等待推理槽位的请求与加权公平调度的虚拟时间
+        self.queue = deque()
+        self.vtime = 0.0
+        self.usage = {
+            'requests': 0,
+            'rejected_rate': 0,
+            'rejected_concurrency': 0,
+            'images': 0,
+            'pixels': 0,
+            # 请求线程自身的 CPU 时间，不含识别批处理线程与 Paddle 算子内部线程
+            'request_thread_cpu_seconds': 0.0,
+            # 跨请求识别批次的推理耗时中按文本行数分摊给本租户的部分
+            'rec_batch_seconds': 0.0,
+            'inference_seconds': 0.0,
+            'queue_wait_seconds': 0.0,
+        }
+        self.usage_lock = Lock()
+
+    def charge(self, key, amount):
+        """由其他线程（识别批处理器）计入用量"""
+        with self.usage_lock:
+            self.usage[key] += amount
+
+    def info(self):
+        usage = dict(self.usage)
+        for key in ('request_thread_cpu_seconds', 'rec_batch_seconds', 'inference_seconds', 'queue_wait_seconds'):
+            usage[key] = round(usage[key], 3)
+        return {
+            'weight': self.weight,
+            'rate': self.bucket.rate if self.bucket else None,
+            'max_concurrency': self.max_concurrency or None,
+            'in_flight': self.in_flight,
+            'queued': len(self.queue),
+            'usage': usage,
+        }
+
+class TenantManager:
+    """
+    多租户：按 API Key 请求头识别租户，执行令牌桶限流与并发配额，并在租户间加权公平地分配推理槽位
+
+    推理槽位按开始时间公平排队（SFQ）：每个租户的虚拟时间按 图像像素 / 权重 推进，
+    槽位空出时派给虚拟时间最小的排队租户，突发流量只会排在自己的队列里。
+    """
+
+    def __init__(self, tenants_config):
+        self.enabled = tenants_config.get('enabled', False)
+        self.header = tenants_config.get('header', 'X-API-Key')
+        self.allow_anonymous = tenants_config.get('allow_anonymous', True)
+        self.anonymous = Tenant('anonymous', tenants_config.get('default') or {})
+        self.tenants = {'anonymous': self.anonymous}
+        self.keys = {}
+        for key, spec in (tenants_config.get('keys') or {}).items():
+            spec = spec or {}
+            # 未命名时用密钥摘要作名称，统计中不暴露密钥本身
+            name = spec.get('name') or f"key-{hashlib.sha1(str(key).encode('utf-8')).hexdigest()[:8]}"
+            if name not in self.tenants:
+                self.tenants[name] = Tenant(name, spec)
+            self.keys[str(key)] = self.tenants[name]
+        self.free_slots = max(1, tenants_config.get('inference_slots', 2))
+        self.total_slots = self.free_slots
+        self.vclock = 0.0
+        self.cond = Condition()
+
+    def resolve(self, api_key):
+        """
+        按 API Key 查找租户
+
+        Returns:
+            (租户, None) 或 (None, 错误信息)
+        """
+        if api_key:
+            tenant = self.keys.get(api_key)
+            if tenant is not None:
+                return tenant, None
+            return None, '无效的 API Key'
+        if self.allow_anonymous:
+            return self.anonymous, None
+        return None, f'缺少 API Key（请求头 {self.header}）'
+
+    def admit(self, tenant):
+        """
+        请求开始时检查并发配额与限流
+
+        Returns:
+            None 表示放行（之后须调用 finish），否则为 (错误信息, 错误类型, Retry-After 秒)
+        """
+        with self.cond:
+            if tenant.max_concurrency and tenant.in_flight >= tenant.max_concurrency:
+                tenant.usage['rejected_concurrency'] += 1
+                return f"租户 {tenant.name} 并发请求数已达上限 {tenant.max_concurrency}", 'ConcurrencyLimitExceeded', 1
+            tenant.in_flight += 1
+        wait = tenant.bucket.take() if tenant.bucket else 0.0
+        with self.cond:
+            if wait > 0:
+                tenant.in_flight -= 1
+                tenant.usage['rejected_rate'] += 1
+                return f"租户 {tenant.name} 请求速率超出限制", 'RateLimitExceeded', max(1, math.ceil(wait))
+            tenant.usage['requests'] += 1
+        return None
+
+    def finish(self, tenant, cpu_seconds):
+        """请求结束，cpu_seconds 为请求线程的 CPU 时间"""
+        with self.cond:
+            tenant.in_flight -= 1
+            tenant.usage['request_thread_cpu_seconds'] += cpu_seconds
+
+    def _dispatch(self):
+        """把空闲槽位派给虚拟开始时间最小的排队租户，调用方持有 self.cond"""
+        while self.free_slots > 0:
+            waiting = [t for t in self.tenants.values() if t.queue]
+            if not waiting:
+                return
+            tenant = min(waiting, key=lambda t: max(t.vtime, self.vclock))
+            entry = tenant.queue.popleft()
+            start_tag = max(tenant.vtime, self.vclock)
+            tenant.vtime = start_tag + entry['cost'] / tenant.weight
+            self.vclock = start_tag
+            entry['granted'] = True
+            self.free_slots -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def inference_slot(self, images):
+        """
+        占用一个推理槽位，未启用或不在租户请求中时直接执行
+
+        Args:
+            images: 本次送入推理的图像（ndarray 或列表），用于计算调度开销与用量
+        """
+        tenant = get_request_tenant() if self.enabled else None
+        if tenant is None:
+            yield
+            return
+        if isinstance(images, np.ndarray):
+            images = [images]
+        pixels = sum(image.shape[0] * image.shape[1] for image in images)
+        entry = {'cost': max(pixels / 1e6, 0.01), 'granted': False}
+        queued_at = time.perf_counter()
+        with self.cond:
+            tenant.queue.append(entry)
+            self._dispatch()
+            while not entry['granted']:
+                self.cond.wait()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            with self.cond:
+                tenant.usage['images'] += len(images)
+                tenant.usage['pixels'] += pixels
+                tenant.usage['queue_wait_seconds'] += started - queued_at
+                tenant.usage['inference_seconds'] += finished - started
+                self.free_slots += 1
+                self._dispatch()
+
+    def snapshot(self):
+        with self.cond:
+            return {
+                'inference_slots': self.total_slots,
+                'free_slots': self.free_slots,
+                'tenants': {name: tenant.info() for name, tenant in self.tenants.items()},
+            }
+
+def parse_cache_control(value):
+    """解析 Cache-Control 头为 {指令: 值}，无值指令的值为 True"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') if arg else True
+    return directives
+
+class URLResultCache:
+    """
+    URL 识别结果缓存，按 LRU 淘汰
+
+    与结果一同保存源站的 ETag / Last-Modified：Cache-Control max-age 有效期内直接返回，
+    过期后发送条件请求，源站返回 304 时复用结果，无需重新下载与识别。
+    no-store / private 的响应不缓存，no-cache 的响应每次都重新验证。
+    """
+
+    def __init__(self, cache_config):
+        self.enabled = cache_config.get('enabled', True)
+        self.max_entries = max(1, cache_config.get('max_entries', 1024))
+        # 源站 max-age 的上限（秒），避免结果长期不验证
+        self.max_ttl = cache_config.get('max_ttl', 86400)
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    def get(self, key):
+        """返回缓存项（移至最近使用），不存在时返回 None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def freshness(self, headers):
+        """按响应头计算新鲜期（秒），不可缓存时返回 None"""
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives or 'private' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0.0
+        max_age = directives.get('s-maxage', directives.get('max-age'))
+        try:
+            ttl = float(max_age) - float(headers.get('Age') or 0)
+        except (TypeError, ValueError):
+            ttl = 0.0
+        return min(max(ttl, 0.0), self.max_ttl)
+
+    def store(self, key, result, headers):
+        ttl = self.freshness(headers)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        # 既无有效期也无验证器时无法复用
+        if ttl is None or (ttl <= 0 and not etag and not last_modified):
+            return
+        entry = {
+            'result': result,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires': time.monotonic() + ttl,
+        }
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.stats['stores'] += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def refresh(self, key, entry, headers):
+        """304 后按新的响应头更新有效期与验证器"""
+        ttl = self.freshness(headers)
+        with self.lock:
+            if ttl is None:
+                self.entries.pop(key, None)
+                return
+            entry['expires'] = time.monotonic() + ttl
+            entry['etag'] = headers.get('ETag') or entry['etag']
+            entry['last_modified'] = headers.get('Last-Modified') or entry['last_modified']
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['revalidated'] + self.stats['misses']
+            return dict(self.stats, entries=len(self.entries), max_entries=self.max_entries,
+                        hit_rate=(self.stats['hits'] + self.stats['revalidated']) / max(lookups, 1))
+
 class OCRService:
     """OCR 服务类"""
     
     def __init__(self, config):
-        import threading
-        from queue import Queue
         self.config = config
         self.model_manager = OCRModelManager(config)
         self.temp_dir = tempfile.mkdtemp()
         logger.info(f"临时目录: {self.temp_dir}")
-        # 请求队列和结果字典
-        self._request_queue = Queue()
-        self._result_dict = {}
-        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
-        self._worker_thread.start()
-
-    def _worker(self):
-        while True:
-            req_id, file_path, lang, use_gpu = self._request_queue.get()
-            try:
-                result = self._process_image_file_inner(file_path, lang, use_gpu)
-            except Exception as e:
-                import traceback
-                result = {
-                    'success': False,
-                    'timestamp': datetime.now().isoformat(),
-                    'error': str(e),
-                    'error_type': type(e).__name__,
-                    'traceback': traceback.format_exc()
-                }
-            self._result_dict[req_id] = result
-            self._request_queue.task_done()
-
-    def _process_image_file_inner(self, file_path, lang='ch', use_gpu=None):
-        # 原有的 process_image_file 逻辑全部移到这里
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"文件不存在: {file_path}")
-        file_ext = Path(file_path).suffix.lower()
-        if file_ext not in self.config['ocr']['supported_formats']:
-            raise ValueError(f"不支持的文件格式: {file_ext}")
-        image = cv2.imread(file_path)
-        if image is None:
-            raise ValueError("无法读取图像文件")
-        h, w = image.shape[:2]
-        max_size = self.config['ocr']['max_image_size']
-        if max(h, w) > max_size:
-            scale = max_size / max(h, w)
-            new_h, new_w = int(h * scale), int(w * scale)
-            image = cv2.resize(image, (new_w, new_h))
-            temp_path = os.path.join(self.temp_dir, f"resized_{uuid.uuid4().hex}.jpg")
-            cv2.imwrite(temp_path, image)
-            file_path = temp_path
-        model = self.model_manager.get_model(lang, use_gpu)
-        result = model.predict(file_path)
-        self.model_manager.stats['total_requests'] += 1
-        if result and len(result) > 0:
-            ocr_result = result[0]
-            texts = ocr_result.get('rec_texts', [])
-            scores = ocr_result.get('rec_scores', [])
-            polys = ocr_result.get('rec_polys', [])
-            formatted_result = {
-                'success': True,
-                'timestamp': datetime.now().isoformat(),
-                'lang': lang,
-                'text': ' '.join(texts),
-                'word_count': len(texts),
-                'avg_confidence': sum(scores) / len(scores) if scores else 0,
-                'details': []
-            }
-            for i, (text, score) in enumerate(zip(texts, scores)):
-                bbox = polys[i].tolist() if i < len(polys) else []
-                formatted_result['details'].append({
-                    'text': text,
-                    'confidence': float(score),
-                    'bbox': bbox
-                })
-            return formatted_result
-        else:
-            return {
-                'success': False,
-                'timestamp': datetime.now().isoformat(),
-                'error': '未识别到文本',
-                'error_type': 'NoTextFound'
-            }
+        # 资源采样在后台线程进行，统计接口只读取最近一次结果
+        telemetry_config = config['performance'].get('telemetry', {})
+        self.resource_monitor = None
+        if telemetry_config.get('enabled', True):
+            self.resource_monitor = ResourceMonitor(self.model_manager, self.temp_dir, telemetry_config)
+        self.tenants = TenantManager(config.get('tenants') or {})
+        self.rec_batching = bool(config['performance'].get('rec_batching', {}).get('enabled'))
+        self.url_cache = URLResultCache(config['performance'].get('url_cache', {}))
 
-    def process_image_file(self, file_path, lang='ch', use_gpu=None):
-        # 请求队列串行化处理
-        import uuid, time
-        req_id = str(uuid.uuid4())
-        self._request_queue.put((req_id, file_path, lang, use_gpu))
-        # 等待结果
-        while req_id not in self._result_dict:
-            time.sleep(0.01)
-        result = self._result_dict.pop(req_id)
-        # 增强异常信息输出
-        if not result.get('success', True):
-            logger.error(f"OCR 处理异常: {result.get('error')}\nTraceback: {result.get('traceback')}")
-        return result
+    def process_image_file(self, file_path, lang='ch', use_gpu=None, options=None, orig_size=None):
+        """
+        处理图像文件
         
-    def process_image_file(self, file_path, lang='ch', use_gpu=None):
-        """处理图像文件"""
+        orig_size 为客户端预缩小前的原图尺寸 (宽, 高)，提供时边界框映射回原图坐标。
+        """
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"文件不存在: {file_path}")
             
-            # 检查文件格式
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext not in self.config['ocr']['supported_formats']:
-                raise ValueError(f"不支持的文件格式: {file_ext}")
-            
-            # 检查图像大小
-            image = cv2.imread(file_path)
-            if image is None:
-                raise ValueError("无法读取图像文件")
-            
-            h, w = image.shape[:2]
-            max_size = self.config['ocr']['max_image_size']
-            if max(h, w) > max_size:
-                scale = max_size / max(h, w)
-                new_h, new_w = int(h * scale), int(w * scale)
-                image = cv2.resize(image, (new_w, new_h))
-                temp_path = os.path.join(self.temp_dir, f"resized_{uuid.uuid4().hex}.jpg")
-                cv2.imwrite(temp_path, image)
-                file_path = temp_path
-            
-            # 获取模型并进行识别
-            model = self.model_manager.get_model(lang, use_gpu)
-            result = model.predict(file_path)
+            # 按文件头校验格式与像素预算，并以尽量低的分辨率解码
+            with stage_timer('decode'):
+                image = load_image(file_path, self.config['ocr'])
+        except Exception as e:
+            import traceback
+            self.model_manager.stats['failed_requests'] += 1
+            logger.error("图像处理失败: %s", e, exc_info=True)
+            return {
+                'success': False,
+                'timestamp': datetime.now().isoformat(),
+                'error': str(e),
+                'error_type': type(e).__name__,
+                'traceback': traceback.format_exc()
+            }
+        return self.process_image(image, lang, use_gpu, options, orig_size)
+    
+    def process_image(self, image, lang='ch', use_gpu=None, options=None, orig_size=None):
+        """识别已解码的 BGR 图像（最长边已按 max_image_size 限制），供文件、二进制接口共用"""
+        try:
+            # 获取模型并进行识别，未指定选项时使用配置默认值
+            if options is None:
+                options = parse_pipeline_options(None, self.config['ocr'])
+            with self.tenants.inference_slot(image):
+                result = self.model_manager.predict(image, lang, use_gpu, options)
             
             self.model_manager.stats['total_requests'] += 1
             
             if result and len(result) > 0:
-                ocr_result = result[0]
-                texts = ocr_result.get('rec_texts', [])
-                scores = ocr_result.get('rec_scores', [])
-                polys = ocr_result.get('rec_polys', [])
-                
-                formatted_result = {
-                    'success': True,
-                    'timestamp': datetime.now().isoformat(),
-                    'lang': lang,
-                    'text': ' '.join(texts),
-                    'word_count': len(texts),
-                    'avg_confidence': sum(scores) / len(scores) if scores else 0,
-                    'details': []
-                }
-                
-                for i, (text, score) in enumerate(zip(texts, scores)):
-                    bbox = polys[i].tolist() if i < len(polys) else []
-                    formatted_result['details'].append({
-                        'text': text,
-                        'confidence': float(score),
-                        'bbox': bbox
-                    })
-                
+                with stage_timer('format'):
+                    formatted_result = format_ocr_result(result[0], lang)
+                    if orig_size:
+                        scale_result_bboxes(formatted_result, image.shape, orig_size)
                 self.model_manager.stats['successful_requests'] += 1
                 return formatted_result
             else:
@@ -358,7 +2389,7 @@ class OCRService:
                 return {
                     'success': True,
                     'timestamp': datetime.now().isoformat(),
-                    'lang': lang,
+                    'lang': lang if isinstance(lang, str) else ','.join(lang),
                     'text': '',
                     'word_count': 0,
                     'avg_confidence': 0,
@@ -369,7 +2400,7 @@ class OCRService:
         except Exception as e:
             import traceback
             self.model_manager.stats['failed_requests'] += 1
-            logger.error(f"图像处理失败: {e}\n{traceback.format_exc()}")
+            logger.error("图像处理失败: %s", e, exc_info=True)
             return {
                 'success': False,
                 'timestamp': datetime.now().isoformat(),
@@ -379,12 +2410,41 @@ class OCRService:
             }
     
     
-    def process_url_image(self, image_url, lang='ch', use_gpu=None):
-        """处理 URL 图像"""
+    def _url_cache_key(self, image_url, lang, use_gpu, options):
+        """URL 结果缓存键：识别结果还取决于语言、设备、推理精度、流水线参数与当前模型版本"""
+        langs = [lang] if isinstance(lang, str) else list(lang)
+        if use_gpu is None:
+            use_gpu = self.config['ocr']['use_gpu']
+        # 与 _build_pipeline 一致：仅 CPU 推理时按语言使用配置的精度
+        on_gpu = bool(use_gpu) and paddle.device.is_compiled_with_cuda()
+        precisions = tuple('fp32' if on_gpu else self.model_manager._precision(l) for l in langs)
+        versions = tuple(self.model_manager.active_versions.get(l, 'default') for l in langs)
+        return (image_url, tuple(langs), on_gpu, precisions,
+                tuple(sorted((options or {}).items())), versions)
+    
+    def process_url_image(self, image_url, lang='ch', use_gpu=None, options=None):
+        """处理 URL 图像，结果按 URL 缓存并通过条件请求重新验证"""
+        cache = self.url_cache
+        key = self._url_cache_key(image_url, lang, use_gpu, options) if cache.enabled else None
+        entry = cache.get(key) if key is not None else None
         try:
+            if entry is not None and time.monotonic() < entry['expires']:
+                cache.count('hits')
+                return dict(entry['result'], url_cache='hit')
+            headers = {}
+            if entry is not None:
+                if entry['etag']:
+                    headers['If-None-Match'] = entry['etag']
+                if entry['last_modified']:
+                    headers['If-Modified-Since'] = entry['last_modified']
             # 下载图像
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
+            with stage_timer('download'):
+                response = requests.get(image_url, timeout=30, headers=headers)
+                response.raise_for_status()
+            if entry is not None and response.status_code == 304:
+                cache.refresh(key, entry, response.headers)
+                cache.count('revalidated')
+                return dict(entry['result'], url_cache='revalidated')
             
             # 保存临时文件
             temp_filename = f"{uuid.uuid4().hex}.jpg"
@@ -394,12 +2454,17 @@ class OCRService:
                 f.write(response.content)
             
             # 处理图像
-            result = self.process_image_file(temp_path, lang, use_gpu)
+            result = self.process_image_file(temp_path, lang, use_gpu, options)
             
             # 清理临时文件
             if os.path.exists(temp_path):
                 os.remove(temp_path)
             
+            if key is not None:
+                cache.count('misses')
+                if result.get('success'):
+                    cache.store(key, result, response.headers)
+                result = dict(result, url_cache='miss')
             return result
             
         except Exception as e:
@@ -412,6 +2477,58 @@ class OCRService:
                 'error_type': type(e).__name__
             }
     
+    def process_video(self, frames, lang='ch', use_gpu=None, options=None):
+        """
+        识别视频或有序帧序列，返回文本片段时间线
+
+        Args:
+            frames: (帧序号, 时间戳秒, 图像) 的迭代器，按需解码
+        """
+        video_config = self.config['ocr']['video']
+        if options is None:
+            options = parse_pipeline_options(None, self.config['ocr'])
+        def recognize(images):
+            with self.tenants.inference_slot(images):
+                return self.model_manager.predict(images, lang, use_gpu, options)
+
+        tracker = VideoTextTracker(recognize, video_config)
+        truncated = False
+        try:
+            for frame_index, timestamp, frame in frames:
+                if tracker.stats['frames'] >= video_config['max_frames']:
+                    truncated = True
+                    break
+                tracker.feed(frame_index, timestamp, resize_to_limit(frame, self.config['ocr']['max_image_size']))
+            self.model_manager.stats['total_requests'] += 1
+            self.model_manager.stats['successful_requests'] += 1
+            with stage_timer('format'):
+                segments = tracker.segments()
+            return {
+                'success': True,
+                'timestamp': datetime.now().isoformat(),
+                'lang': lang if isinstance(lang, str) else ','.join(lang),
+                'segment_count': len(segments),
+                'segments': segments,
+                'frames': tracker.summary(),
+                'truncated': truncated
+            }
+        except Exception as e:
+            import traceback
+            self.model_manager.stats['failed_requests'] += 1
+            logger.error("视频处理失败: %s", e, exc_info=True)
+            return {
+                'success': False,
+                'timestamp': datetime.now().isoformat(),
+                'error': str(e),
+                'error_type': type(e).__name__,
+                'traceback': traceback.format_exc()
+            }
+        finally:
+            # 提前结束时关闭生成器，释放视频句柄与临时文件
+            close = getattr(frames, 'close', None)
+            if close is not None:
+                close()
+    
     def process_batch_images(self, images, lang='ch', use_gpu=None):
         """批量处理图像"""
         max_batch_size = self.config['performance']['max_batch_size']
@@ -423,7 +2540,7 @@ class OCRService:
         
         results = []
         for i, image_data in enumerate(images):
-            logger.info(f"处理批量图像 {i+1}/{len(images)}")
+            logger.debug("处理批量图像 %d/%d", i + 1, len(images))
             result = self.process_base64_image(image_data, lang, use_gpu)
             results.append(result)
         
@@ -434,25 +2551,865 @@ class OCRService:
             'results': results
         }
 
+class RequestDecompressionMiddleware:
+    """
+    WSGI 中间件：解压 gzip / zstd 编码的请求体
+
+    请求体按块流式解压到临时文件（小于 1MB 时留在内存），解压后的大小受
+    max_content_length 限制，超出立即返回 413，防止压缩炸弹。
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, app, max_content_length):
+        self.app = app
+        self.max_content_length = max_content_length
+
+    def _open_decoder(self, encoding, stream):
+        if encoding in ('gzip', 'x-gzip'):
+            return gzip.GzipFile(fileobj=stream, mode='rb')
+        return zstandard.ZstdDecompressor().stream_reader(stream)
+
+    @staticmethod
+    def _error(start_response, status, error, error_type):
+        body = json.dumps({
+            'success': False,
+            'timestamp': datetime.now().isoformat(),
+            'error': error,
+            'error_type': error_type
+        }, ensure_ascii=False).encode('utf-8')
+        start_response(status, [('Content-Type', 'application/json'),
+                                ('Content-Length', str(len(body)))])
+        return [body]
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if not encoding or encoding == 'identity':
+            return self.app(environ, start_response)
+        if encoding not in ('gzip', 'x-gzip', 'zstd') or (encoding == 'zstd' and zstandard is None):
+            return self._error(start_response, '415 Unsupported Media Type',
+                               f'不支持的请求体编码: {encoding}', 'UnsupportedContentEncoding')
+
+        stream = environ['wsgi.input']
+        content_length = environ.get('CONTENT_LENGTH')
+        if content_length:
+            stream = LimitedStream(stream, int(content_length))
+        body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        size = 0
+        try:
+            with self._open_decoder(encoding, stream) as decoder:
+                while True:
+                    chunk = decoder.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if self.max_content_length and size > self.max_content_length:
+                        body.close()
+                        return self._error(start_response, '413 Request Entity Too Large',
+                                           f'解压后的请求体超过限制: > {self.max_content_length}',
+                                           'RequestEntityTooLarge')
+                    body.write(chunk)
+        except Exception as e:
+            body.close()
+            return self._error(start_response, '400 Bad Request',
+                               f'请求体解压失败: {e}', 'DecompressionError')
+        body.seek(0)
+        environ['wsgi.input'] = body
+        environ['CONTENT_LENGTH'] = str(size)
+        environ.pop('HTTP_CONTENT_ENCODING', None)
+        environ.pop('wsgi.input_terminated', None)
+        return self.app(environ, start_response)
+
+def _parse_accept_encoding(header):
+    """解析 Accept-Encoding，返回 {编码: q 值}"""
+    accepted = {}
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip().lower()] = q
+    return accepted
+
+def compress_response(response, accept_encoding, compression_config):
+    """按 Accept-Encoding 压缩超过阈值的 JSON / 文本响应，优先 zstd"""
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype == 'application/json' or response.mimetype.startswith('text/'))):
+        return response
+    data = response.get_data()
+    if len(data) < compression_config.get('min_size', 1024):
+        return response
+    accepted = _parse_accept_encoding(accept_encoding or '')
+    if zstandard is not None and accepted.get('zstd', 0) > 0:
+        level = compression_config.get('zstd_level', 3)
+        response.set_data(zstandard.ZstdCompressor(level=level).compress(data))
+        response.headers['Content-Encoding'] = 'zstd'
+    elif accepted.get('gzip', accepted.get('*', 0)) > 0:
+        level = compression_config.get('gzip_level', 6)
+        response.set_data(gzip.compress(data, compresslevel=level))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+class WorkerRecycleMonitor:
+    """
+    工作进程内的内存与请求数监控
+
+    每个请求结束后检查进程 RSS 与累计请求数，超过阈值时通知主进程启动替换进程；
+    收到排空指令后等待在途请求完成。
+    """
+
+    def __init__(self, recycle_config, notify):
+        self.max_rss = int(recycle_config.get('max_rss_mb', 0) * 1024 * 1024)
+        self.max_requests = recycle_config.get('max_requests', 0)
+        self.notify = notify
+        self.process = psutil.Process()
+        self.requests_served = 0
+        self.in_flight = 0
+        self.recycle_requested = False
+        self._cond = Condition()
+
+    def request_started(self):
+        with self._cond:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._cond:
+            self.in_flight -= 1
+            self.requests_served += 1
+            self._cond.notify_all()
+            if self.recycle_requested:
+                return
+            rss = self.process.memory_info().rss
+            reason = None
+            if self.max_rss and rss > self.max_rss:
+                reason = f"RSS {rss / 1024 / 1024:.0f}MB 超过上限 {self.max_rss / 1024 / 1024:.0f}MB"
+            elif self.max_requests and self.requests_served >= self.max_requests:
+                reason = f"已处理 {self.requests_served} 个请求，达到上限"
+            if reason is None:
+                return
+            self.recycle_requested = True
+        logger.warning(f"工作进程 {os.getpid()} 请求回收: {reason}")
+        self.notify(reason)
+
+    def wait_idle(self, timeout):
+        """等待在途请求全部完成，返回是否在超时前排空"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self.in_flight > 0:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+# 二进制推理接口：帧 = 长度 (u32) + 帧体，整数均为网络字节序
+BINARY_LENGTH = struct.Struct('!I')
+# 请求帧体头：请求号 (u64)、方法 (u8)、载荷类型 (u8)、元数据 JSON 长度 (u32)，其后为元数据与载荷
+BINARY_REQUEST = struct.Struct('!QBBI')
+# 响应帧体头：请求号 (u64)、状态 (u8)、元数据 JSON 长度 (u32)，其后为元数据与打包的识别结果
+BINARY_RESPONSE = struct.Struct('!QBI')
+BINARY_METHOD_OCR = 1
+BINARY_METHOD_PING = 2
+BINARY_PAYLOAD_ENCODED = 0  # 已编码的图像文件字节（JPEG/PNG 等）
+BINARY_PAYLOAD_PIXELS = 1   # 原始像素，元数据给出 shape、dtype，可选 color 为 bgr/rgb
+BINARY_PAYLOAD_SHM = 2      # 共享内存中的原始像素，元数据给出 shm_name、shape、dtype，可选 offset、color；仅本机套接字
+BINARY_STATUS_OK = 0
+BINARY_STATUS_BAD_REQUEST = 1
+BINARY_STATUS_ERROR = 2
+BINARY_STATUS_RATE_LIMITED = 3  # 租户限流或超出并发配额，元数据含 retry_after
+
+def read_binary_frame(reader, max_size):
+    """读取一帧，连接正常关闭时返回 None"""
+    head = reader.read(BINARY_LENGTH.size)
+    if not head:
+        return None
+    if len(head) < BINARY_LENGTH.size:
+        raise ConnectionError("帧头不完整")
+    length = BINARY_LENGTH.unpack(head)[0]
+    if length > max_size:
+        raise ValueError(f"帧长度超出限制: {length} > {max_size}")
+    body = reader.read(length)
+    if len(body) < length:
+        raise ConnectionError("帧体不完整")
+    return body
+
+def pack_ocr_lines(details):
+    """
+    按列打包识别结果：行数 N (u32)、N 个置信度 (f32)、N 个多边形点数 (u16)、
+    全部点坐标 (i32，x/y 交替)、N 个文本字节长度 (u32)、UTF-8 文本依次拼接
+    """
+    texts = [detail['text'].encode('utf-8') for detail in details]
+    polys = [detail['bbox'] for detail in details]
+    return b''.join([
+        BINARY_LENGTH.pack(len(details)),
+        np.asarray([detail['confidence'] for detail in details], dtype='>f4').tobytes(),
+        np.asarray([len(poly) for poly in polys], dtype='>u2').tobytes(),
+        np.asarray([c for poly in polys for point in poly for c in point], dtype='>i4').tobytes(),
+        np.asarray([len(text) for text in texts], dtype='>u4').tobytes(),
+        b''.join(texts),
+    ])
+
+def pack_binary_response(request_id, status, meta, details=()):
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    body = BINARY_RESPONSE.pack(request_id, status, len(meta_bytes)) + meta_bytes + pack_ocr_lines(details)
+    return BINARY_LENGTH.pack(len(body)) + body
+
+class BinaryProtocolMixin:
+    """
+    二进制接口的请求分发，TCP 与本机套接字服务共用
+
+    识别仍走 OCRService.process_image，与 REST 接口共享模型管理与跨请求批处理。
+    """
+
+    def init_protocol(self, ocr_service, binary_config, recycle_monitor=None):
+        self.ocr_service = ocr_service
+        self.max_in_flight = binary_config.get('max_in_flight', 8)
+        self.max_frame_size = ocr_service.config['server']['max_content_length']
+        self.recycle_monitor = recycle_monitor
+
+    def decode_payload(self, kind, meta, payload):
+        """按载荷类型得到 BGR 图像"""
+        ocr_config = self.ocr_service.config['ocr']
+        if kind == BINARY_PAYLOAD_ENCODED:
+            return load_image(payload, ocr_config)
+        if kind == BINARY_PAYLOAD_PIXELS:
+            shape = tuple(int(n) for n in meta['shape'])
+            dtype = np.dtype(meta.get('dtype', 'uint8'))
+            if int(np.prod(shape)) * dtype.itemsize != len(payload):
+                raise ValueError(f"像素数据长度与形状不符: {len(payload)} != {shape}x{dtype.itemsize}")
+            pixels = np.frombuffer(payload, dtype=dtype).reshape(shape)
+            return image_from_pixels(pixels, ocr_config, meta.get('color', 'bgr'))
+        raise ValueError(f"不支持的载荷类型: {kind}")
+
+    def recognize(self, kind, meta, payload, lang, use_gpu, options):
+        """解码载荷并识别"""
+        with stage_timer('decode'):
+            image = self.decode_payload(kind, meta, payload)
+        return self.ocr_service.process_image(image, lang, use_gpu, options)
+
+    def dispatch(self, body):
+        """处理一个请求帧体，返回完整的响应帧"""
+        request_id = 0
+        try:
+            if len(body) < BINARY_REQUEST.size:
+                raise ValueError("请求帧过短")
+            request_id, method, kind, meta_len = BINARY_REQUEST.unpack_from(body)
+            view = memoryview(body)[BINARY_REQUEST.size:]
+            meta = json.loads(bytes(view[:meta_len]) or b'{}')
+            if method == BINARY_METHOD_PING:
+                return pack_binary_response(request_id, BINARY_STATUS_OK, {'success': True, 'status': 'healthy', 'pid': os.getpid()})
+            if method != BINARY_METHOD_OCR:
+                raise ValueError(f"未知方法: {method}")
+            ocr_config = self.ocr_service.config['ocr']
+            langs = parse_langs(meta.get('lang'), ocr_config)
+            lang = langs[0] if len(langs) == 1 else langs
+            options = parse_pipeline_options(meta, ocr_config, self.ocr_service.rec_batching)
+            tenants = self.ocr_service.tenants
+            tenant = None
+            if tenants.enabled:
+                # 二进制接口没有请求头，API Key 放在元数据 api_key 中
+                tenant, error = tenants.resolve(meta.get('api_key'))
+                if error is not None:
+                    return pack_binary_response(request_id, BINARY_STATUS_BAD_REQUEST, {'success': False, 'error': error, 'error_type': 'Unauthorized'})
+                rejection = tenants.admit(tenant)
+                if rejection is not None:
+                    message, error_type, retry_after = rejection
+                    return pack_binary_response(request_id, BINARY_STATUS_RATE_LIMITED, {'success': False, 'error': message, 'error_type': error_type, 'retry_after': retry_after})
+                set_request_tenant(tenant)
+            cpu_start = time.thread_time()
+            try:
+                result = self.recognize(kind, meta, view[meta_len:], lang, bool(meta.get('use_gpu', False)), options)
+            finally:
+                if tenant is not None:
+                    tenants.finish(tenant, time.thread_time() - cpu_start)
+                    set_request_tenant(None)
+        except Exception as e:
+            # 每个请求都必须有响应，否则流水线客户端会一直等待
+            status = BINARY_STATUS_BAD_REQUEST if isinstance(e, (ValueError, KeyError, TypeError)) else BINARY_STATUS_ERROR
+            return pack_binary_response(request_id, status,
+                                        {'success': False, 'error': str(e), 'error_type': type(e).__name__})
+        details = result.pop('details', [])
+        result.pop('text', None)
+        result.pop('traceback', None)
+        # 多语言识别时的逐行语言与候选放在元数据中
+        if details and 'lang' in details[0]:
+            result['line_langs'] = [detail['lang'] for detail in details]
+        if details and 'candidates' in details[0]:
+            result['line_candidates'] = [detail['candidates'] for detail in details]
+        status = BINARY_STATUS_OK if result.get('success') else BINARY_STATUS_ERROR
+        return pack_binary_response(request_id, status, result, details)
+
+class BinaryOCRHandler(socketserver.BaseRequestHandler):
+    """
+    二进制接口连接处理
+
+    读循环持续读取请求帧，交给线程池并发处理，响应按完成顺序写回并带请求号，
+    客户端可在同一连接上流水线发送多个请求。在途请求达到 max_in_flight 时暂停读取，形成背压。
+    """
+
+    def handle(self):
+        server = self.server
+        if self.request.family in (socket.AF_INET, socket.AF_INET6):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        reader = self.request.makefile('rb')
+        write_lock = Lock()
+        slots = threading.BoundedSemaphore(server.max_in_flight)
+        try:
+            with ThreadPoolExecutor(max_workers=server.max_in_flight,
+                                    thread_name_prefix='ocr-binary') as executor:
+                while True:
+                    try:
+                        body = read_binary_frame(reader, server.max_frame_size)
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"二进制接口连接 {self.client_address} 读取失败: {e}")
+                        break
+                    if body is None:
+                        break
+                    slots.acquire()
+                    executor.submit(self._serve, body, write_lock, slots)
+        finally:
+            reader.close()
+
+    def _serve(self, body, write_lock, slots):
+        monitor = self.server.recycle_monitor
+        if monitor is not None:
+            monitor.request_started()
+        try:
+            response = self.server.dispatch(body)
+            with write_lock:
+                self.request.sendall(response)
+        except OSError:
+            # 客户端已断开
+            pass
+        except Exception as e:
+            logger.error("二进制接口请求处理失败: %s", e, exc_info=True)
+        finally:
+            slots.release()
+            if monitor is not None:
+                monitor.request_finished()
+
+class BinaryOCRServer(BinaryProtocolMixin, socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """TCP 二进制推理接口，每个连接一个读线程"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, ocr_service, binary_config, address=None, listen_socket=None, recycle_monitor=None):
+        """
+        Args:
+            address: (host, port)，与 listen_socket 二选一
+            listen_socket: 已绑定并监听的套接字（多进程模式由主进程创建后共享）
+        """
+        self.init_protocol(ocr_service, binary_config, recycle_monitor)
+        if listen_socket is not None:
+            socketserver.TCPServer.__init__(self, listen_socket.getsockname(), BinaryOCRHandler,
+                                            bind_and_activate=False)
+            self.socket.close()
+            self.socket = listen_socket
+        else:
+            socketserver.TCPServer.__init__(self, address, BinaryOCRHandler)
+
+def attach_shared_memory(name):
+    """
+    附加到客户端创建的共享内存段
+
+    段的生命周期归客户端所有：附加时不登记到本进程的 resource_tracker，
+    否则服务退出时会把仍在使用的段删除（Python 3.13 起直接用 track=False）。
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+class UnixBinaryOCRServer(BinaryProtocolMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    本机 Unix 域套接字上的二进制接口，协议同 TCP 接口，另支持共享内存载荷
+
+    共享内存载荷只传段名、形状与类型，服务端直接在段上构造 ndarray 视图识别，
+    BGR 三通道且不超过 max_image_size 时全程无复制、无编解码和磁盘读写。
+    """
+    daemon_threads = True
+
+    def __init__(self, ocr_service, binary_config, path, listen_socket=None, recycle_monitor=None):
+        """
+        Args:
+            path: 套接字文件路径
+            listen_socket: 已绑定并监听的套接字（多进程模式由主进程创建后共享）
+        """
+        self.init_protocol(ocr_service, binary_config, recycle_monitor)
+        if listen_socket is not None:
+            socketserver.UnixStreamServer.__init__(self, path, BinaryOCRHandler, bind_and_activate=False)
+            self.socket.close()
+            self.socket = listen_socket
+        else:
+            # 清理上次异常退出残留的套接字文件
+            if os.path.exists(path):
+                os.unlink(path)
+            socketserver.UnixStreamServer.__init__(self, path, BinaryOCRHandler)
+            os.chmod(path, binary_config.get('unix_socket_mode', 0o660))
+
+    def recognize(self, kind, meta, payload, lang, use_gpu, options):
+        if kind != BINARY_PAYLOAD_SHM:
+            return super().recognize(kind, meta, payload, lang, use_gpu, options)
+        segment = attach_shared_memory(meta['shm_name'])
+        try:
+            shape = tuple(int(n) for n in meta['shape'])
+            dtype = np.dtype(meta.get('dtype', 'uint8'))
+            offset = int(meta.get('offset', 0))
+            if offset < 0 or offset + int(np.prod(shape)) * dtype.itemsize > segment.size:
+                raise ValueError(f"共享内存段 {meta['shm_name']} 大小不足: {segment.size} < {offset} + {shape}x{dtype.itemsize}")
+            # 视图只作为临时对象传入，识别结束后即无引用，随后才能关闭映射
+            return self.ocr_service.process_image(
+                image_from_pixels(np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=offset),
+                                  self.ocr_service.config['ocr'], meta.get('color', 'bgr')),
+                lang, use_gpu, options)
+        finally:
+            try:
+                segment.close()
+            except BufferError:
+                logger.warning(f"共享内存段 {meta['shm_name']} 仍有引用，延迟到回收时关闭")
+
+def start_binary_servers(ocr_service, config, listen_socket=None, recycle_monitor=None, unix_socket=None):
+    """
+    按配置在后台线程启动二进制接口（TCP 与本机 Unix 域套接字），返回已启动的服务列表
+
+    listen_socket / unix_socket 为主进程共享的监听套接字，单进程模式下为 None，由此处绑定。
+    """
+    binary_config = config['server'].get('binary') or {}
+    servers = []
+    if binary_config.get('enabled'):
+        address = (config['server']['host'], binary_config.get('port', 8500))
+        server = BinaryOCRServer(ocr_service, binary_config, address, listen_socket, recycle_monitor)
+        servers.append(server)
+        logger.info(f"二进制接口监听 {address[0]}:{address[1]}")
+    unix_path = binary_config.get('unix_socket')
+    if unix_path and hasattr(socket, 'AF_UNIX'):
+        servers.append(UnixBinaryOCRServer(ocr_service, binary_config, unix_path, unix_socket, recycle_monitor))
+        logger.info(f"本机二进制接口监听 {unix_path}")
+    for server in servers:
+        threading.Thread(target=server.serve_forever, name='ocr-binary-accept', daemon=True).start()
+    return servers
+
+def _serve_worker(listen_socket, conn, config_file, binary_socket=None, unix_socket=None):
+    """
+    工作进程入口：预加载模型后在共享监听套接字上提供服务
+
+    与主进程通过管道通信：发送 ready / recycle，接收 drain。
+    """
+    import signal
+    from werkzeug.serving import make_server
+    # Ctrl+C 由主进程统一处理，工作进程等待排空指令
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    send_lock = Lock()
+
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (OSError, EOFError):
+                pass
+
+    app, config = create_app(config_file, on_recycle=lambda reason: send(('recycle', reason)))
+    server_config = config.config['server']
+    server = make_server(server_config['host'], server_config['port'], app,
+                         threaded=True, fd=listen_socket.fileno())
+    serve_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    serve_thread.start()
+    binary_servers = start_binary_servers(app.ocr_service, config.config, binary_socket,
+                                          app.recycle_monitor, unix_socket)
+    send(('ready', os.getpid()))
+    logger.info(f"工作进程 {os.getpid()} 已就绪")
+
+    try:
+        while conn.recv() != 'drain':
+            pass
+    except (EOFError, OSError):
+        # 主进程退出时同样排空后退出
+        pass
+    logger.info(f"工作进程 {os.getpid()} 停止接收新请求，等待在途请求完成")
+    server.shutdown()
+    for binary_server in binary_servers:
+        binary_server.shutdown()
+    drain_timeout = config.config['performance'].get('recycle', {}).get('drain_timeout', 60)
+    if not app.recycle_monitor.wait_idle(drain_timeout):
+        logger.warning(f"工作进程 {os.getpid()} 排空超时，仍有 {app.recycle_monitor.in_flight} 个在途请求")
+    logger.info(f"工作进程 {os.getpid()} 退出")
+
+class WorkerSupervisor:
+    """
+    多进程主控：绑定监听端口，管理工作进程并按需滚动替换
+
+    工作进程请求回收时，先启动替换进程并等待其模型预加载完成，
+    再让旧进程停止接收新请求、处理完在途请求后退出，服务不中断。
+    """
+
+    def __init__(self, config, config_file='config.yaml'):
+        import multiprocessing
+        self.config = config.config
+        self.config_file = config_file
+        self.ctx = multiprocessing.get_context('spawn')
+        server_config = self.config['server']
+        self.num_workers = max(1, server_config.get('workers', 1))
+        self.socket = socket.create_server((server_config['host'], server_config['port']),
+                                           backlog=128, reuse_port=False)
+        # 二进制接口的监听套接字同样由主进程创建并共享给工作进程
+        binary_config = server_config.get('binary') or {}
+        self.binary_socket = None
+        if binary_config.get('enabled'):
+            self.binary_socket = socket.create_server((server_config['host'], binary_config.get('port', 8500)),
+                                                      backlog=128, reuse_port=False)
+        self.unix_path = binary_config.get('unix_socket') if hasattr(socket, 'AF_UNIX') else None
+        self.unix_socket = None
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            self.unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.unix_socket.bind(self.unix_path)
+            os.chmod(self.unix_path, binary_config.get('unix_socket_mode', 0o660))
+            self.unix_socket.listen(128)
+        self.workers = {}
+        self._running = True
+
+    def _spawn(self, replaces=None):
+        """启动工作进程，replaces 为其将要替换的旧进程 pid"""
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(target=_serve_worker,
+                                   args=(self.socket, child_conn, self.config_file, self.binary_socket,
+                                         self.unix_socket),
+                                   daemon=False)
+        process.start()
+        child_conn.close()
+        self.workers[process.pid] = {
+            'process': process,
+            'conn': parent_conn,
+            'ready': False,
+            'retiring': False,
+            'replaces': replaces,
+            'replacement': None,
+        }
+        logger.info(f"启动工作进程 {process.pid}" + (f"（替换 {replaces}）" if replaces else ""))
+        return process.pid
+
+    def _drain(self, pid):
+        worker = self.workers.get(pid)
+        if worker and not worker['retiring']:
+            worker['retiring'] = True
+            try:
+                worker['conn'].send('drain')
+            except (OSError, EOFError):
+                pass
+
+    def _handle_message(self, pid, message):
+        kind, payload = message
+        worker = self.workers[pid]
+        if kind == 'ready':
+            worker['ready'] = True
+            old_pid = worker['replaces']
+            if old_pid in self.workers:
+                logger.info(f"替换进程 {pid} 已就绪，排空旧进程 {old_pid}")
+                self._drain(old_pid)
+        elif kind == 'recycle':
+            if not self._running or worker['retiring'] or worker['replacement']:
+                return
+            logger.info(f"工作进程 {pid} 请求回收: {payload}")
+            worker['replacement'] = self._spawn(replaces=pid)
+
+    def _reap(self):
+        """回收已退出的工作进程，异常退出的按需补充"""
+        for pid, worker in list(self.workers.items()):
+            if worker['process'].is_alive():
+                continue
+            worker['process'].join()
+            worker['conn'].close()
+            del self.workers[pid]
+            logger.info(f"工作进程 {pid} 已退出 (exitcode={worker['process'].exitcode})")
+            if not self._running:
+                continue
+            replacement = self.workers.get(worker['replacement'])
+            if not worker['retiring'] and replacement is None:
+                logger.warning(f"工作进程 {pid} 异常退出，重新启动")
+                self._spawn()
+            elif replacement is not None and not replacement['ready']:
+                # 替换进程尚未就绪而旧进程已退出，直接视为普通工作进程
+                replacement['replaces'] = None
+
+    def _stop(self, signum=None, frame=None):
+        self._running = False
+
+    def run(self):
+        import signal
+        from multiprocessing.connection import wait as wait_connections
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.num_workers):
+            self._spawn()
+        while self._running:
+            conns = {worker['conn']: pid for pid, worker in self.workers.items()}
+            for conn in wait_connections(list(conns), timeout=1.0):
+                pid = conns[conn]
+                try:
+                    self._handle_message(pid, conn.recv())
+                except (EOFError, OSError):
+                    pass
+            self._reap()
+        logger.info("正在停止所有工作进程...")
+        for pid in list(self.workers):
+            self._drain(pid)
+        for worker in list(self.workers.values()):
+            worker['process'].join()
+        self.socket.close()
+        if self.binary_socket is not None:
+            self.binary_socket.close()
+        if self.unix_socket is not None:
+            self.unix_socket.close()
+            os.unlink(self.unix_path)
+
+def profile_call(func, *args, limit=30):
+    """
+    以 cProfile 运行函数，返回 (函数结果, 按累计耗时排序的前 limit 项)
+
+    仅统计调用线程，跨请求识别批处理线程中的推理耗时体现在等待结果的调用上。
+    """
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        result = func(*args)
+    finally:
+        profiler.disable()
+    total = time.perf_counter() - start
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, name), (cc, nc, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{name} ({os.path.basename(filename)}:{lineno})",
+            'ncalls': nc,
+            'primitive_calls': cc,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+    return result, {'total_ms': round(total * 1000, 3), 'functions': rows[:limit]}
+
+# 栈顶位于这些模块时视为空闲等待（锁、队列、套接字），采样时默认忽略
+IDLE_FRAME_FILES = ('threading.py', 'queue.py', 'selectors.py', 'socket.py', 'socketserver.py',
+                    'connection.py', 'ssl.py')
+# 栈顶为这些函数时同样视为空闲（如日志队列监听线程的阻塞出队）
+IDLE_FRAME_FUNCTIONS = (('handlers.py', 'dequeue'),)
+
+def sample_stacks(seconds, interval, include_idle=False):
+    """
+    统计式采样所有线程的调用栈
+
+    Returns:
+        {折叠栈: 采样次数}，折叠栈格式为 线程名;外层函数;...;内层函数，可直接用于火焰图
+    """
+    own_id = threading.get_ident()
+    counts = {}
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            top_file = os.path.basename(frame.f_code.co_filename)
+            if not include_idle and (top_file in IDLE_FRAME_FILES
+                                     or (top_file, frame.f_code.co_name) in IDLE_FRAME_FUNCTIONS):
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            key = ';'.join(reversed(stack))
+            counts[key] = counts.get(key, 0) + 1
+        time.sleep(interval)
+    return counts
+
+def admin_token_error(server_config, headers):
+    """
+    校验管理接口令牌（X-Admin-Token 或 Authorization: Bearer）
+
+    Returns:
+        通过时返回 None，否则返回 (错误信息, 错误类型, HTTP 状态码)
+    """
+    expected = server_config.get('admin_token')
+    if not expected:
+        return '管理接口未启用（未配置 server.admin_token）', 'AdminDisabled', 403
+    token = headers.get('X-Admin-Token', '')
+    authorization = headers.get('Authorization', '')
+    if not token and authorization.startswith('Bearer '):
+        token = authorization[len('Bearer '):]
+    if not hmac.compare_digest(token.encode('utf-8'), str(expected).encode('utf-8')):
+        return '管理令牌无效', 'Unauthorized', 401
+    return None
+
 # 创建 Flask 应用
-def create_app():
-    """创建 Flask 应用"""
+def create_app(config_file='config.yaml', on_recycle=None):
+    """
+    创建 Flask 应用
+    
+    Args:
+        config_file: 配置文件路径
+        on_recycle: 多进程模式下工作进程需要回收时的回调
+    """
     
     # 加载配置
-    config = OCRServiceConfig()
+    config = OCRServiceConfig(config_file)
+    configure_logging(config.config['logging'])
     
     # 创建应用
     app = Flask(__name__)
     CORS(app)
     
+    # 采样访问日志：先于压缩注册，after_request 倒序执行，记录的是最终响应大小
+    access_config = config.config['logging'].get('access_log') or {}
+    if access_config.get('enabled'):
+        sample_rate = access_config.get('sample_rate', 0.1)
+        slow_ms = access_config.get('slow_ms', 2000)
+        
+        @app.before_request
+        def start_access_timer():
+            request.environ['ocr.start_time'] = time.perf_counter()
+            begin_stage_timings()
+        
+        @app.after_request
+        def write_access_log(response):
+            duration = (time.perf_counter() - request.environ.get('ocr.start_time', time.perf_counter())) * 1000
+            stages = end_stage_timings()
+            if response.status_code >= 500:
+                reason = 'error'
+            elif duration >= slow_ms:
+                reason = 'slow'
+            elif random.random() < sample_rate:
+                reason = 'sample'
+            else:
+                return response
+            access_logger.info({
+                'ts': datetime.now().isoformat(),
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration, 2),
+                'bytes': response.calculate_content_length(),
+                'remote': request.remote_addr,
+                'pid': os.getpid(),
+                'reason': reason,
+                'stages_ms': {name: round(ms, 2) for name, ms in stages.items()},
+            })
+            return response
+    
     # 设置最大文件大小
     app.config['MAX_CONTENT_LENGTH'] = config.config['server']['max_content_length']
     
+    # 请求体解压与响应压缩
+    compression_config = config.config['server'].get('compression', {})
+    if compression_config.get('enabled', True):
+        app.wsgi_app = RequestDecompressionMiddleware(
+            app.wsgi_app, config.config['server']['max_content_length'])
+        
+        @app.after_request
+        def compress(response):
+            return compress_response(response, request.headers.get('Accept-Encoding'), compression_config)
+    
     # 创建 OCR 服务
     ocr_service = OCRService(config.config)
     
     # 预加载模型
     ocr_service.model_manager.preload_models()
+    app.ocr_service = ocr_service
+    
+    # 多进程模式下跟踪在途请求与内存，超限时通知主进程滚动替换
+    app.recycle_monitor = None
+    if on_recycle is not None:
+        app.recycle_monitor = WorkerRecycleMonitor(
+            config.config['performance'].get('recycle', {}), on_recycle)
+        
+        @app.before_request
+        def track_request_start():
+            app.recycle_monitor.request_started()
+        
+        @app.teardown_request
+        def track_request_end(exc):
+            app.recycle_monitor.request_finished()
+    
+    # 多租户：识别接口按 API Key 限流、限并发，推理槽位在租户间加权公平分配
+    tenants = ocr_service.tenants
+    if tenants.enabled:
+        @app.before_request
+        def admit_tenant():
+            if not request.path.startswith('/api/v1/ocr/'):
+                return None
+            tenant, error = tenants.resolve(request.headers.get(tenants.header))
+            if error is not None:
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': error, 'error_type': 'Unauthorized'}), 401
+            rejection = tenants.admit(tenant)
+            if rejection is not None:
+                message, error_type, retry_after = rejection
+                response = jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': message, 'error_type': error_type})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+            request.environ['ocr.tenant'] = tenant
+            request.environ['ocr.cpu_start'] = time.thread_time()
+            set_request_tenant(tenant)
+            return None
+        
+        @app.teardown_request
+        def release_tenant(exc):
+            tenant = request.environ.pop('ocr.tenant', None)
+            if tenant is not None:
+                tenants.finish(tenant, time.thread_time() - request.environ['ocr.cpu_start'])
+                set_request_tenant(None)
+    
+    def admin_required(view):
+        """管理接口装饰器，要求有效的管理令牌"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            error = admin_token_error(config.config['server'], request.headers)
+            if error is not None:
+                message, error_type, status = error
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': message, 'error_type': error_type}), status
+            return view(*args, **kwargs)
+        return wrapper
+    
+    # 同一时刻只允许一个 cProfile 请求与一个采样任务
+    profile_lock = Lock()
+    sampler_lock = Lock()
+    
+    def run_profiled(params, func, *args):
+        """
+        按请求参数 profile=1 以 cProfile 运行识别，需要管理令牌
+
+        Returns:
+            (结果, 性能剖析数据或 None, 错误响应或 None)
+        """
+        if str(params.get('profile', '')).lower() not in ('1', 'true'):
+            return func(*args), None, None
+        error = admin_token_error(config.config['server'], request.headers)
+        if error is not None:
+            message, error_type, status = error
+            return None, None, (jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': message, 'error_type': error_type}), status)
+        if not profile_lock.acquire(blocking=False):
+            return None, None, (jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '已有请求正在进行性能剖析', 'error_type': 'ProfilerBusy'}), 409)
+        try:
+            result, profile = profile_call(func, *args, limit=int(params.get('profile_limit', 30)))
+        finally:
+            profile_lock.release()
+        return result, profile, None
     
     @app.route('/api/v1/health', methods=['GET'])
     def health_check():
@@ -486,13 +3443,21 @@ def create_app():
                 'description': '高性能多语言 OCR 服务',
                 'author': 'PaddleOCR Team',
                 'status': status,
-                'supported_languages': ['ch', 'en'],
+                'supported_languages': supported_languages(config.config['ocr']),
                 'supported_formats': config.config['ocr']['supported_formats'],
+                # 客户端可据此在上传前本地缩小并重新编码，识别效果不变
+                'processing': {
+                    'max_image_size': config.config['ocr']['max_image_size'],
+                    'max_image_pixels': config.config['ocr'].get('max_image_pixels'),
+                    'preferred_encodings': config.config['ocr']['upload_encodings'],
+                    'jpeg_quality': config.config['ocr']['upload_jpeg_quality']
+                },
                 'api_endpoints': {
                     'GET /api/v1/health': '健康检查',
                     'GET /api/v1/info': '服务信息',
                     'POST /api/v1/ocr/file': '文件上传识别',
                     'POST /api/v1/ocr/url': 'URL 图像识别',
+                    'POST /api/v1/ocr/video': '视频 / 帧序列识别',
                     'GET /api/v1/models': '模型信息',
                     'GET /api/v1/stats': '统计信息'
                 }
@@ -508,27 +3473,44 @@ def create_app():
             file = request.files['file']
             if file.filename == '':
                 return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '未选择文件', 'error_type': 'FileNotSelected'}), 400
-            lang = request.form.get('lang', config.config['ocr']['default_lang'])
             use_gpu = request.form.get('use_gpu', '').lower() == 'true'
+            try:
+                langs = parse_langs(request.form.get('lang'), config.config['ocr'])
+                lang = langs[0] if len(langs) == 1 else langs
+                options = parse_pipeline_options(request.form, config.config['ocr'], ocr_service.rec_batching)
+                orig_size = parse_orig_size(request.form)
+            except ValueError as e:
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': 'InvalidOption'}), 400
             temp_filename = f"{uuid.uuid4().hex}_{file.filename}"
             temp_path = os.path.join(ocr_service.temp_dir, temp_filename)
-            file.save(temp_path)
+            with stage_timer('upload'):
+                file.save(temp_path)
             # 新增详细调试日志
             if not os.path.exists(temp_path):
                 logger.error(f"文件保存失败: {temp_path}")
                 return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '文件保存失败', 'error_type': 'FileSaveError'}), 500
-            import cv2
-            img = cv2.imread(temp_path)
-            if img is None:
-                logger.error(f"cv2 无法读取上传的图片: {temp_path}")
+            # 仅读取文件头校验格式和尺寸，避免在此处完整解码
+            try:
+                probe_image(temp_path, config.config['ocr'])
+            except ImageTooLargeError as e:
+                os.remove(temp_path)
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': 'ImageTooLarge'}), 413
+            except (ValueError, struct.error) as e:
+                os.remove(temp_path)
+                logger.error(f"无法识别上传的图片: {temp_path}: {e}")
                 return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '图片格式不被支持或已损坏', 'error_type': 'ImageReadError'}), 500
-            result = ocr_service.process_image_file(temp_path, lang, use_gpu)
+            result, profile, error_response = run_profiled(
+                request.form, ocr_service.process_image_file, temp_path, lang, use_gpu, options, orig_size)
             if os.path.exists(temp_path):
                 os.remove(temp_path)
+            if error_response is not None:
+                return error_response
+            if profile is not None:
+                result['profile'] = profile
             if result.get('success', False):
                 return jsonify({'success': True, 'timestamp': datetime.now().isoformat(), 'data': result})
             else:
-                logger.error(f"OCR 识别失败: {result}")
+                logger.error("OCR 识别失败: %s", result.get('error'))
                 return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': result.get('error', '识别失败'), 'error_type': result.get('error_type', 'Unknown')}), 500
         except Exception as e:
             import traceback
@@ -544,9 +3526,19 @@ def create_app():
             if not data or 'url' not in data:
                 return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '缺少图像 URL', 'error_type': 'NoURL'}), 400
             image_url = data['url']
-            lang = data.get('lang', config.config['ocr']['default_lang'])
             use_gpu = data.get('use_gpu', False)
-            result = ocr_service.process_url_image(image_url, lang, use_gpu)
+            try:
+                langs = parse_langs(data.get('lang'), config.config['ocr'])
+                lang = langs[0] if len(langs) == 1 else langs
+                options = parse_pipeline_options(data, config.config['ocr'], ocr_service.rec_batching)
+            except ValueError as e:
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': 'InvalidOption'}), 400
+            result, profile, error_response = run_profiled(
+                data, ocr_service.process_url_image, image_url, lang, use_gpu, options)
+            if error_response is not None:
+                return error_response
+            if profile is not None:
+                result['profile'] = profile
             if result.get('success', False):
                 return jsonify({'success': True, 'timestamp': datetime.now().isoformat(), 'data': result})
             else:
@@ -557,11 +3549,119 @@ def create_app():
 
 
 
+    @app.route('/api/v1/ocr/video', methods=['POST'])
+    def ocr_video():
+        """
+        视频或帧序列识别
+
+        表单字段: file 为视频文件，或 frames 为按顺序上传的多张帧图像（二选一）；
+        sample_fps 覆盖视频抽帧频率，fps 为帧序列的帧率（用于计算时间戳，默认 1）
+        """
+        try:
+            video_config = config.config['ocr']['video']
+            video = request.files.get('file')
+            frame_files = [f for f in request.files.getlist('frames') if f.filename]
+            if (video is None or video.filename == '') and not frame_files:
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '未找到视频文件或帧序列', 'error_type': 'FileNotFound'}), 400
+            use_gpu = request.form.get('use_gpu', '').lower() == 'true'
+            try:
+                langs = parse_langs(request.form.get('lang'), config.config['ocr'])
+                lang = langs[0] if len(langs) == 1 else langs
+                options = parse_pipeline_options(request.form, config.config['ocr'], ocr_service.rec_batching)
+                sample_fps = float(request.form.get('sample_fps', video_config['sample_fps']))
+                fps = float(request.form.get('fps', 1))
+                if sample_fps < 0 or fps <= 0:
+                    raise ValueError(f"帧率无效: sample_fps={sample_fps}, fps={fps}")
+            except ValueError as e:
+                return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': 'InvalidOption'}), 400
+
+            if frame_files:
+                def saved_frames():
+                    # 逐帧落盘、解码后即删除，同一时刻只保留一帧
+                    for storage in frame_files:
+                        path = os.path.join(ocr_service.temp_dir, f"{uuid.uuid4().hex}_{os.path.basename(storage.filename)}")
+                        with stage_timer('upload'):
+                            storage.save(path)
+                        try:
+                            yield path
+                        finally:
+                            if os.path.exists(path):
+                                os.remove(path)
+                frames = iter_image_frames(saved_frames(), fps, config.config['ocr'])
+                result = ocr_service.process_video(frames, lang, use_gpu, options)
+            else:
+                ext = os.path.splitext(video.filename)[1].lower()
+                if ext not in video_config['formats']:
+                    return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': f'不支持的视频格式: {ext}', 'error_type': 'UnsupportedFormat'}), 400
+                temp_path = os.path.join(ocr_service.temp_dir, f"{uuid.uuid4().hex}{ext}")
+                with stage_timer('upload'):
+                    video.save(temp_path)
+                try:
+                    result = ocr_service.process_video(iter_video_frames(temp_path, sample_fps), lang, use_gpu, options)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+            if result.get('success', False):
+                return jsonify({'success': True, 'timestamp': datetime.now().isoformat(), 'data': result})
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': result.get('error', '识别失败'), 'error_type': result.get('error_type', 'Unknown')}), 500
+        except Exception as e:
+            logger.error(f"视频处理失败: {e}", exc_info=True)
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': type(e).__name__}), 500
+
     @app.route('/api/v1/models', methods=['GET'])
     def get_models():
         """获取模型信息"""
         return jsonify({'success': True, 'timestamp': datetime.now().isoformat(), 'data': ocr_service.model_manager.get_model_info()})
 
+    @app.route('/api/v1/admin/models/<lang>/version', methods=['POST'])
+    @admin_required
+    def swap_model_version(lang):
+        """
+        切换语言的识别模型版本（管理接口）
+
+        JSON 字段: version，可选 model_name / model_dir 登记新版本，wait 为 true 时等待切换完成
+        """
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        if not version:
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '缺少 version', 'error_type': 'InvalidOption'}), 400
+        manager = ocr_service.model_manager
+        if data.get('model_name'):
+            manager.register_model_version(lang, version, data['model_name'], data.get('model_dir'))
+        wait = str(data.get('wait', '')).lower() == 'true'
+        try:
+            job = manager.swap_model_version(lang, version, background=not wait)
+        except ValueError as e:
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': 'InvalidOption'}), 400
+        except RuntimeError as e:
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': str(e), 'error_type': 'SwapInProgress'}), 409
+        if wait and job['status'] == 'failed':
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': job.get('error'), 'error_type': 'ModelLoadError', 'data': job}), 500
+        return jsonify({'success': True, 'timestamp': datetime.now().isoformat(), 'data': job}), 200 if wait else 202
+
+    @app.route('/api/v1/admin/profile/sample', methods=['GET'])
+    @admin_required
+    def sample_profile():
+        """
+        对所有线程做统计式采样（管理接口），返回折叠栈文本，可直接用于 flamegraph.pl / speedscope
+
+        参数: seconds 采样时长（默认 10，最长 120），interval_ms 采样间隔（默认 10），idle=1 包含空闲线程
+        """
+        try:
+            seconds = min(float(request.args.get('seconds', 10)), 120.0)
+            interval = max(float(request.args.get('interval_ms', 10)), 1.0) / 1000
+        except ValueError:
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': 'seconds 与 interval_ms 应为数字', 'error_type': 'InvalidOption'}), 400
+        include_idle = request.args.get('idle', '').lower() in ('1', 'true')
+        if not sampler_lock.acquire(blocking=False):
+            return jsonify({'success': False, 'timestamp': datetime.now().isoformat(), 'error': '已有采样任务在运行', 'error_type': 'ProfilerBusy'}), 409
+        try:
+            counts = sample_stacks(seconds, interval, include_idle)
+        finally:
+            sampler_lock.release()
+        body = ''.join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+        return app.response_class(body, mimetype='text/plain')
+
     @app.route('/api/v1/stats', methods=['GET'])
     def get_stats():
         """获取统计信息"""
@@ -570,24 +3670,52 @@ def create_app():
         stats['success_rate'] = (
             stats['successful_requests'] / max(stats['total_requests'], 1) * 100
         )
+        if ocr_service.resource_monitor is not None:
+            stats['resources'] = ocr_service.resource_monitor.snapshot()
+        if ocr_service.tenants.enabled:
+            stats['tenants'] = ocr_service.tenants.snapshot()
+        if ocr_service.url_cache.enabled:
+            stats['url_cache'] = ocr_service.url_cache.snapshot()
+        if ocr_service.model_manager.auto_lang_stats['requests']:
+            stats['auto_lang'] = ocr_service.model_manager.auto_lang_info()
         return jsonify({'success': True, 'timestamp': datetime.now().isoformat(), 'data': stats})
     
     return app, config
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='PaddleOCR 独立服务')
+    parser.add_argument('--config', default='config.yaml', help='配置文件路径')
+    parser.add_argument('--host', help='监听地址，覆盖 server.host')
+    parser.add_argument('--port', type=int, help='监听端口，覆盖 server.port，便于在同一台机器上启动多个实例')
+    args = parser.parse_args()
+    
     print("🚀 启动 PaddleOCR 独立服务")
     print("=" * 50)
     
-    app, config = create_app()
-    
+    config = OCRServiceConfig(args.config)
     server_config = config.config['server']
+    if args.host:
+        server_config['host'] = args.host
+    if args.port:
+        server_config['port'] = args.port
+    recycle_config = config.config['performance'].get('recycle', {})
     
     print(f"📡 服务地址: http://{server_config['host']}:{server_config['port']}")
     print(f"📖 API 文档: http://{server_config['host']}:{server_config['port']}/api/v1/info")
-    print("✅ 服务启动完成!")
     
-    app.run(
-        host=server_config['host'],
-        port=server_config['port'],
-        debug=server_config['debug']
-    )
+    if recycle_config.get('enabled') or server_config.get('workers', 1) > 1:
+        # 多进程模式：主进程管理工作进程，按内存/请求数滚动替换
+        print(f"✅ 多进程模式启动，工作进程数: {max(1, server_config.get('workers', 1))}")
+        WorkerSupervisor(config, args.config).run()
+    else:
+        app, _ = create_app(args.config)
+        for binary_server in start_binary_servers(app.ocr_service, config.config):
+            print(f"📦 二进制接口: {binary_server.server_address}")
+        print("✅ 服务启动完成!")
+        
+        app.run(
+            host=server_config['host'],
+            port=server_config['port'],
+            debug=server_config['debug']
+        )